@@ -7,8 +7,9 @@ from . import langsci
 from . import glossa
 from . import cldf
 from .base import Repository, Glottolog
+from .snapshot import load_snapshot
 
-assert langsci and glossa and cldf
+assert langsci and glossa and cldf and load_snapshot
 PROVIDERS = {r.id: r for r in Repository.__subclasses__() if r.id}
 
 
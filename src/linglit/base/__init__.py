@@ -1,7 +1,12 @@
+import json
 import typing
+import hashlib
 import pathlib
+import weakref
 import functools
+import threading
 import collections
+import collections.abc
 
 import attr
 from pyigt import IGT
@@ -9,8 +14,11 @@ from pycldf.sources import Source
 from pyglottolog import Glottolog as API
 
 from linglit.util import clean_translation
+from linglit import storage
 
-__all__ = ['Glottolog', 'Record', 'Repository', 'Publication', 'Example']
+__all__ = [
+    'Glottolog', 'Record', 'Repository', 'Publication', 'Example', 'AbbreviationTable',
+    'iter_released']
 
 
 class Glottolog:
@@ -85,6 +93,55 @@ class Record:
         return int(self.ID)
 
 
+class AbbreviationTable(collections.abc.Mapping):
+    """
+    An immutable table of gloss abbreviations, mapping abbreviations to their labels.
+
+    Abbreviation tables are typically shared by many examples, e.g. all examples of a glossa
+    article. Thus, tables are interned: There is only one instance per distinct content (as long as
+    it is referenced), identified by a hash of the content - which allows serializations to store
+    each table once and refer to it by `id`.
+
+    >>> AbbreviationTable({'PL': 'plural'}) is AbbreviationTable([('PL', 'plural')])
+    True
+    """
+    __slots__ = ['id', '_items', '__weakref__']
+    _interned = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(cls, items=()):
+        if isinstance(items, cls):
+            return items
+        items = collections.OrderedDict(items)
+        id_ = hashlib.md5(
+            json.dumps(list(items.items()), ensure_ascii=False).encode('utf8')).hexdigest()
+        with cls._lock:
+            res = cls._interned.get(id_)
+            if res is None:
+                res = super().__new__(cls)
+                res.id, res._items = id_, items
+                cls._interned[id_] = res
+        return res
+
+    def __reduce__(self):  # Unpickled tables are interned, too.
+        return self.__class__, (list(self._items.items()),)
+
+    def __getitem__(self, item):
+        return self._items[item]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return '<{} {} {}>'.format(self.__class__.__name__, self.id, dict(self._items))
+
+
 @attr.s
 class Example:
     ID = attr.ib()
@@ -97,7 +154,11 @@ class Example:
     Source = attr.ib(validator=attr.validators.instance_of(list))
     Language_ID = attr.ib(default=None)  # Assigned after initialization based on Language_Name
     Source_Path = attr.ib(default=None)
-    Abbreviations = attr.ib(default=attr.Factory(collections.OrderedDict))
+    # Converted on assignment, too, since providers may assign abbreviations after initialization:
+    Abbreviations = attr.ib(
+        default=attr.Factory(AbbreviationTable),
+        converter=AbbreviationTable,
+        on_setattr=attr.setters.convert)
     Local_ID = attr.ib(default=None)
     Meta_Language_ID = attr.ib(default=None)
     Corpus_Ref = attr.ib(default=None)
@@ -132,22 +193,58 @@ class Example:
         res += str(self.as_igt())
         return res
 
+    @property
+    def Abbreviations_ID(self) -> typing.Optional[str]:
+        """
+        The ID of the - shared - abbreviation table of the example, if it isn't empty.
+        """
+        return self.Abbreviations.id if self.Abbreviations else None
+
     def as_igt(self):
         return IGT(
             id=self.ID,
             phrase=self.Analyzed_Word,
             gloss=self.Gloss,
             translation=self.Translated_Text,
-            abbrs=self.Abbreviations,
+            abbrs=dict(self.Abbreviations),  # IGT may add abbreviations from the translation.
         )
 
 
 class Publication:
+    """
+    A publication, providing access to the references, citations and examples extracted from it.
+
+    Extracted data is cached on the publication - e.g. in the `examples` property. To keep memory
+    use bounded when iterating over a whole repository, consumers can
+    - use the `stream_*` methods, which yield data without caching it,
+    - drop the cached data of a publication when done with it, by calling `release` or using the
+      publication as context manager:
+
+    >>> for pub in repos.iter_publications():
+    ...     with pub:
+    ...         process(pub.examples)
+    """
+    #: Names of attributes holding cached data, which is dropped by `release`.
+    cached_attributes = ['references', 'cited', 'cited_references', 'examples']
+
     def __init__(self, record: Record, d: typing.Union[str, pathlib.Path], repos=None):
         self.record = record
         self.dir = pathlib.Path(d)
         self.repos = repos
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def release(self):
+        """
+        Drop the cached data of the publication - which will be recomputed when accessed again.
+        """
+        for name in self.cached_attributes:
+            self.__dict__.pop(name, None)
+
     def __str__(self):
         return "{0.creators} {0.year}. {0.title}".format(self.record)
 
@@ -159,9 +256,45 @@ class Publication:
     def has_open_license(self) -> bool:
         return self.record.has_open_license
 
+    def iter_input_paths(self) -> typing.Generator[pathlib.Path, None, None]:
+        """
+        The files from which data of the publication is extracted.
+        """
+        if not self.dir.is_dir():  # A single - possibly compressed - file.
+            yield self.dir
+        else:
+            yield from sorted(p for p in self.dir.glob('**/*') if p.is_file())
+
+    @functools.cached_property
+    def fingerprint(self) -> str:
+        """
+        A hash of the input data, i.e. changing whenever data extracted from the publication may.
+        """
+        res = hashlib.md5()
+        for data in self.iter_fingerprint_data():
+            res.update(data)
+        return res.hexdigest()
+
+    def iter_fingerprint_data(self) -> typing.Generator[bytes, None, None]:
+        """
+        The data from which the `fingerprint` is computed - by default the input files.
+        """
+        for p in self.iter_input_paths():
+            yield p.name.encode('utf8')
+            yield storage.read_bytes(p)
+
     @functools.cached_property
     def cited_references(self) -> typing.List[Source]:
-        return [ref for ref in self.references.values() if ref.id in self.cited]
+        return list(self.stream_cited_references())
+
+    def stream_cited_references(self) -> typing.Generator[Source, None, None]:
+        """
+        Like `cited_references`, but without caching the references of the publication.
+        """
+        cited = self.cited  # Computed first, since this may require reading the references, too.
+        for ref in self.stream_references():
+            if ref.id in cited:
+                yield ref
 
     @functools.cached_property
     def id(self) -> str:
@@ -174,12 +307,19 @@ class Publication:
 
     @functools.cached_property
     def references(self) -> typing.OrderedDict[str, Source]:
-        res = collections.OrderedDict()
+        return collections.OrderedDict((src.id, src) for src in self.stream_references())
+
+    def stream_references(self) -> typing.Generator[Source, None, None]:
+        """
+        Like `references`, but yielding the sources one by one, without caching them.
+        """
+        if 'references' in self.__dict__:  # Computed already, e.g. in a worker thread.
+            yield from self.references.values()
+            return
         for src in self.iter_references():
             sid = '{}:{}'.format(self.id, src.id)
             src['isreferencedby'] = self.id
-            res[sid] = Source(src.genre, sid, _check_id=False, **src)
-        return res
+            yield Source(src.genre, sid, _check_id=False, **src)
 
     def iter_references(self) -> typing.Generator[Source, None, None]:  # pragma: no cover
         raise NotImplementedError()
@@ -202,7 +342,15 @@ class Publication:
 
     @functools.cached_property
     def examples(self):
-        res = []
+        return list(self.stream_examples())
+
+    def stream_examples(self) -> typing.Generator[Example, None, None]:
+        """
+        Like `examples`, but yielding the examples one by one, without caching them.
+        """
+        if 'examples' in self.__dict__:  # Computed already, e.g. in a worker thread.
+            yield from self.examples
+            return
         for ex in self.iter_examples():
             ex.ID = '{}-{}'.format(self.id, ex.ID)
             refs = []
@@ -216,16 +364,27 @@ class Publication:
             else:
                 refs.append((self.id, ex.Local_ID))
             ex.Source = refs
-            res.append(ex)
-        return res
+            yield ex
 
     def iter_examples(self) -> typing.Generator[Example, None, None]:  # pragma: no cover
         raise NotImplementedError()
 
 
+def iter_released(pubs: typing.Iterable[Publication]) -> typing.Generator[Publication, None, None]:
+    """
+    Iterate over publications, releasing the cached data of each one before moving on to the next,
+    so that at most one publication's data is held in memory at a time.
+    """
+    for pub in pubs:
+        with pub:
+            yield pub
+
+
 class Repository:
     id = None
     lname_map = {}
+    # Formats - see `linglit.storage` - supported by the `compress` option of `create`:
+    compressions = []
 
     def __init__(self, d):
         self.dir = pathlib.Path(d)
@@ -0,0 +1,170 @@
+"""
+A corpus-wide citation graph, linking publications to the works they cite.
+
+References of different publications are identified as the same work if they agree in the hash of
+title, year and first creator (see `linglit.bibtex.hash`), and are then known under one merged key,
+computed like the keys of merged bibliographies (see `linglit.bibtex.make_key`).
+
+The graph is stored in a compact adjacency format: For each publication, the cited works and the
+citation counts are stored as consecutive pairs of integers in one array of unsigned integers,
+preceded by a JSON header listing works and publications.
+"""
+import json
+import array
+import struct
+import typing
+import pathlib
+import collections
+
+from linglit.base import Publication
+from linglit import bibtex
+
+__all__ = ['CitationGraph']
+
+HEADER_SIZE = struct.Struct('<Q')
+
+
+class CitationGraph:
+    """
+    Usage:
+
+    >>> graph = CitationGraph('citations.bin')
+    >>> for pub in repos.iter_publications():
+    ...     graph.update(pub)
+    >>> graph.save()
+    >>> graph.most_cited(10)
+    """
+    def __init__(self, path: typing.Union[str, pathlib.Path]):
+        self.path = pathlib.Path(path)
+        self.works = []  # Merged reference keys, indexed by work number.
+        self._hashes = {}  # Maps identifying hash of a work to its number.
+        self._keys = {}  # Maps merged reference key to work number.
+        self.fingerprints = {}  # Maps publication ID to fingerprint of the data in the graph.
+        self.adjacency = {}  # Maps publication ID to array of (work number, count) pairs.
+        self._citing = None
+        if self.path.exists():
+            with self.path.open('rb') as f:
+                header = json.loads(f.read(HEADER_SIZE.unpack(f.read(HEADER_SIZE.size))[0]))
+                for key, h in header['works']:
+                    self._add_work(key, tuple(h))
+                for pid, fingerprint, length in header['publications']:
+                    self.fingerprints[pid] = fingerprint
+                    self.adjacency[pid] = array.array('I')
+                    self.adjacency[pid].fromfile(f, 2 * length)
+
+    def save(self):
+        header = json.dumps(dict(
+            works=[[key, h] for key, h in zip(self.works, self._hashes)],
+            publications=[
+                [pid, self.fingerprints[pid], len(adj) // 2]
+                for pid, adj in self.adjacency.items()],
+        )).encode('utf8')
+        with self.path.open('wb') as f:
+            f.write(HEADER_SIZE.pack(len(header)))
+            f.write(header)
+            for adj in self.adjacency.values():
+                adj.tofile(f)
+
+    def _add_work(self, key, h) -> int:
+        if h not in self._hashes:
+            self._hashes[h] = len(self.works)
+            self.works.append(key)
+            self._keys[key] = self._hashes[h]
+        return self._hashes[h]
+
+    def _work(self, src) -> int:
+        entry = src.entry
+        h = bibtex.hash(entry)
+        if not (h[0] and (h[1] or h[2])):
+            # Not enough information to identify the work across publications:
+            h = ('', '', '', src.id)
+        if h in self._hashes:
+            return self._hashes[h]
+        key, i = bibtex.make_key(entry), 1
+        while key in self._keys:  # Disambiguate keys of distinct works.
+            i += 1
+            key = '{}:{}'.format(bibtex.make_key(entry), i)
+        return self._add_work(key, h)
+
+    def update(self, pub: Publication, force: bool = False) -> bool:
+        """
+        (Re-)compute the citations of a publication, unless they are up-to-date.
+
+        :return: Flag signaling whether the citations were (re-)computed.
+        """
+        if not force and self.fingerprints.get(pub.id) == pub.fingerprint:
+            return False
+        counts = collections.Counter()
+        for sid, n in pub.cited.items():
+            if sid in pub.references:
+                counts[self._work(pub.references[sid])] += n
+        self.adjacency[pub.id] = array.array(
+            'I', [i for item in sorted(counts.items()) for i in item])
+        self.fingerprints[pub.id] = pub.fingerprint
+        self._citing = None
+        return True
+
+    def prune(self, keep: typing.Iterable[str], prefix: str = '') -> int:
+        """
+        Remove publications - with IDs starting with `prefix` - which are not listed in `keep`.
+        """
+        obsolete = {pid for pid in self.adjacency if pid.startswith(prefix)} - set(keep)
+        for pid in obsolete:
+            del self.adjacency[pid]
+            del self.fingerprints[pid]
+        self._citing = None
+        return len(obsolete)
+
+    def cited(self, pid: str) -> typing.Dict[str, int]:
+        """
+        The works cited by a publication, with citation counts.
+        """
+        adj = self.adjacency[pid]
+        return {self.works[adj[i]]: adj[i + 1] for i in range(0, len(adj), 2)}
+
+    @property
+    def citing_index(self) -> typing.Dict[int, typing.List[typing.Tuple[str, int]]]:
+        """
+        The reverse adjacency, mapping work numbers to citing publications and counts.
+        """
+        if self._citing is None:
+            self._citing = collections.defaultdict(list)
+            for pid, adj in sorted(self.adjacency.items()):
+                for i in range(0, len(adj), 2):
+                    self._citing[adj[i]].append((pid, adj[i + 1]))
+        return self._citing
+
+    def citing(self, key: str) -> typing.List[typing.Tuple[str, int]]:
+        """
+        The publications citing a work, with citation counts - or an empty list for unknown works.
+        """
+        if key not in self._keys:
+            return []
+        return self.citing_index.get(self._keys[key], [])
+
+    def most_cited(self, n: int = 10) -> typing.List[typing.Tuple[str, int, int]]:
+        """
+        The works cited by the most publications.
+
+        :return: `list` of triples (key, number of citing publications, total citation count).
+        """
+        res = [
+            (self.works[i], len(pubs), sum(c for _, c in pubs))
+            for i, pubs in self.citing_index.items()]
+        return sorted(res, key=lambda t: (-t[1], -t[2], t[0]))[:n]
+
+    def shared(self, pid1: str, pid2: str) -> typing.List[str]:
+        """
+        The works cited by both publications.
+        """
+        adj1, adj2 = self.adjacency[pid1], self.adjacency[pid2]
+        res, i, j = [], 0, 0
+        while i < len(adj1) and j < len(adj2):  # Merge the sorted work numbers.
+            if adj1[i] == adj2[j]:
+                res.append(self.works[adj1[i]])
+                i, j = i + 2, j + 2
+            elif adj1[i] < adj2[j]:
+                i += 2
+            else:
+                j += 2
+        return res
@@ -1,45 +1,108 @@
 import functools
+import contextlib
 import collections
 
-from pycldf.dataset import iter_datasets
+import attr
+from pycldf.dataset import iter_datasets, Dataset
 from pycldf.sources import Sources
-from pyigt import Example
+from pyigt import IGT
 
 from linglit import base
+from linglit.util import load_cache, dump_cache
+
+EXAMPLE_PROPERTIES = [
+    'id', 'languageReference', 'metaLanguageReference', 'analyzedWord', 'gloss', 'translatedText',
+    'comment']
+
+
+def make_igt(row: dict) -> IGT:
+    """
+    Create an `IGT` from an ExampleTable row - like `pyigt.Example.igt`, but without ORM objects.
+    """
+    tr = "'{}'".format(row.get('translatedText'))
+    if row.get('comment'):
+        tr += ' ({})'.format(row['comment'])
+    return IGT(
+        id=row['id'],
+        gloss=row['gloss'],
+        phrase=row['analyzedWord'],
+        language=row['languageReference'],
+        translation=tr,
+    )
+
+
+def has_reader_api(table) -> bool:
+    """
+    Whether the installed csvw provides the (private) reader API of tables, which we use to read raw
+    cells.
+    """
+    return all(hasattr(table, attr_) for attr_ in ['_get_dialect', '_get_csv_reader'])
 
 
 class Publication(base.Publication):
+    cached_attributes = base.Publication.cached_attributes + ['ds', 'sid2langs']
+
     @functools.cached_property
     def ds(self):
-        return next(iter_datasets(self.dir))
+        item = self.repos.index.get(self.dir.name)
+        if item:  # We know where the metadata is, thus don't have to look for it.
+            return Dataset.from_metadata(self.dir / item['metadata'])
+        return next(iter_datasets(self.dir))  # pragma: no cover
 
     @functools.cached_property
     def cfg(self):
         return self.repos.catalog[self.dir.name]
 
     @functools.cached_property
-    def languages(self):
-        return self.ds.objects('LanguageTable')
+    def fingerprint(self):
+        """
+        CLDF datasets are versioned, so we can rely on the version number from the Zenodo metadata.
+        """
+        return '{} {} {}'.format(
+            self.dir.name, self.repos.index[self.dir.name]['version'], attr.astuple(self.cfg))
 
-    def iter_references(self):
+    @functools.cached_property
+    def sid2langs(self):
+        """
+        Maps source IDs to the sorted Glottocodes of the languages described in the sources.
+
+        Since computing the mapping may require a scan of a big ValueTable, it is cached in a JSON
+        file next to the dataset directory, and only recomputed for a new dataset version or config.
+        """
+        p = self.dir.parent / '{}.sources.json'.format(self.dir.name)
+        cached = load_cache(p)
+        if cached.get('fingerprint') == self.fingerprint and 'sid2langs' in cached:
+            return cached['sid2langs']
+        res = {sid: sorted(gcs) for sid, gcs in sorted(self._sid2langs().items())}
+        dump_cache(dict(fingerprint=self.fingerprint, sid2langs=res), p, indent=2)
+        return res
+
+    def _sid2langs(self):
         sid2langs = collections.defaultdict(set)
-        if not self.cfg.bib:
-            return  # pragma: no cover
         s2l = self.cfg.source_to_language
         l2gc = {}
-        for row in self.languages:
-            if row.cldf.glottocode:
-                l2gc[row.id] = row.cldf.glottocode
+        for row in self._iter_rows('LanguageTable', 'id', 'glottocode', 'source'):
+            if row.get('glottocode'):
+                l2gc[row['id']] = row['glottocode']
                 if s2l == 'LanguageTable':
-                    for src in row.cldf.source:
+                    for src in row.get('source') or []:
                         sid, _ = Sources.parse(src)
-                        sid2langs[sid].add(row.cldf.glottocode)
+                        sid2langs[sid].add(row['glottocode'])
         if s2l == 'ValueTable':
-            for row in self.ds.iter_rows('ValueTable', 'languageReference', 'source'):
-                if row['languageReference'] in l2gc:
-                    for src in row['source']:
-                        sid, _ = Sources.parse(src)
-                        sid2langs[sid].add(l2gc[row['languageReference']])
+            # The same combinations of language and source occur in many rows, so we collect the
+            # distinct raw cell values first, and parse the source references only once each:
+            for lid, sources in set(self._iter_cells('ValueTable', 'languageReference', 'source')):
+                if lid in l2gc and sources:
+                    for src in sources.split(self.ds['ValueTable', 'source'].separator):
+                        if src.strip():
+                            sid, _ = Sources.parse(src.strip())
+                            sid2langs[sid].add(l2gc[lid])
+        return sid2langs
+
+    def iter_references(self):
+        if not self.cfg.bib:
+            return  # pragma: no cover
+        sid2langs = self.sid2langs
         for src in self.ds.sources:
             for field in [
                 'besttxt', 'cfn', 'delivered', 'fn',
@@ -50,7 +113,7 @@ class Publication(base.Publication):
                 if field in src:
                     del src[field]
             if src.id in sid2langs:
-                src['lgcode'] = '; '.join('[{}]'.format(gc) for gc in sorted(sid2langs[src.id]))
+                src['lgcode'] = '; '.join('[{}]'.format(gc) for gc in sid2langs[src.id])
             if self.cfg.hhtype:
                 src['hhtype'] = self.cfg.hhtype
             yield src
@@ -65,23 +128,65 @@ class Publication(base.Publication):
             fname, abbrcol, defcol = self.cfg.gloss_abbreviations
             abbrs = collections.OrderedDict(
                 [(r[abbrcol], r[defcol]) for r in self.ds.iter_rows(fname)])
-        l2gc = {lg.id: (lg.cldf.glottocode, lg.cldf.name) for lg in self.languages}
+        # We only keep the language table in memory - examples are streamed:
+        l2gc = {
+            row['id']: (row.get('glottocode'), row.get('name')) for row in self._iter_rows(
+                'LanguageTable', 'id', 'glottocode', 'name')}
         if self.cfg.igt:
-            for count, ex in enumerate(self.ds.objects('ExampleTable', cls=Example), start=1):
+            for count, row in enumerate(self._iter_rows('ExampleTable', *EXAMPLE_PROPERTIES), 1):
+                igt = make_igt(row)
                 if abbrs:
-                    ex.igt.abbrs = abbrs
-                if ex.igt.primary_text and ex.igt.phrase:
+                    igt.abbrs = abbrs
+                if igt.primary_text and igt.phrase:
                     yield base.Example(
                         ID='{}'.format(count),
-                        Local_ID=ex.id,
-                        Primary_Text=ex.igt.primary_text,
-                        Analyzed_Word=ex.igt.phrase,
-                        Gloss=ex.igt.gloss,
-                        Translated_Text=ex.igt.translation or '',
-                        Language_ID=l2gc[ex.cldf.languageReference][0],
-                        Language_Name=l2gc[ex.cldf.languageReference][1],
+                        Local_ID=row['id'],
+                        Primary_Text=igt.primary_text,
+                        Analyzed_Word=igt.phrase,
+                        Gloss=igt.gloss,
+                        Translated_Text=igt.translation or '',
+                        Language_ID=l2gc[row['languageReference']][0],
+                        Language_Name=l2gc[row['languageReference']][1],
                         Source=[],
-                        Abbreviations=ex.igt.gloss_abbrs if ex.igt.is_valid(strict=True) else {},
-                        Meta_Language_ID=ex.cldf.metaLanguageReference or 'stan1293',
-                        Comment=getattr(ex.cldf, 'comment', None),
+                        Abbreviations=igt.gloss_abbrs if igt.is_valid(strict=True) else {},
+                        Meta_Language_ID=row.get('metaLanguageReference') or 'stan1293',
+                        Comment=row.get('comment'),
                     )
+
+    def _iter_rows(self, table, *properties):
+        """
+        Iterate rows of a table, aliasing the columns of those CLDF properties the table has.
+        """
+        yield from self.ds.iter_rows(
+            table, *[prop for prop in properties if self.ds.get((table, prop))])
+
+    def _iter_cells(self, table, *properties):
+        """
+        Iterate over tuples of the raw - i.e. unparsed - cell values for the specified properties.
+
+        Skipping the datatype conversion of csvw for all other columns makes a scan of big tables
+        a lot faster.
+        """
+        name, table = table, self.ds[table]
+        cols = [self.ds[table, prop] for prop in properties]
+        if not has_reader_api(table):
+            # The csvw version doesn't provide the reader API we rely on, so we read the rows the
+            # slow way and re-serialize list-valued cells:
+            for row in self._iter_rows(name, *properties):
+                yield tuple(
+                    (col.separator or '').join(row[prop]) if isinstance(row[prop], list)
+                    else ('' if row[prop] is None else str(row[prop]))
+                    for prop, col in zip(properties, cols))
+            return
+        cols = [col.header for col in cols]
+        # We re-use csvw's reader, to get dialect handling and reading of zipped tables for free:
+        dialect = table._get_dialect()
+        with contextlib.ExitStack() as stack:
+            rows = iter(table._get_csv_reader(table.url.resolve(table.base), dialect, stack))
+            if dialect.header:
+                header = next(rows)[1]
+            else:
+                header = [col.header for col in table.tableSchema.columns]
+            indices = [header.index(col) for col in cols]
+            for _, row in rows:
+                yield tuple(row[i] if i < len(row) else '' for i in indices)
@@ -1,16 +1,26 @@
+import os
+import time
+import pathlib
 import shutil
+import tempfile
 import functools
 import collections
+import concurrent.futures
 
 import attr
 import cldfzenodo
 from clldutils.jsonlib import dump, load
 from pycldf import Source
+from pycldf.dataset import iter_datasets
 from csvw.dsv import reader
 
 from linglit import base
+from linglit.util import load_cache, dump_cache
 from .publication import Publication
 
+VERSIONS_NAME = 'versions.json'
+INDEX_NAME = 'index.json'
+
 
 @attr.s
 class Record(base.Record):
@@ -35,6 +45,26 @@ class Dataset:
     gloss_abbreviations = attr.ib(converter=lambda s: s.split())  # triple (fname, abbrcol, defcol)
 
 
+class VersionCache:
+    """
+    Caches the resolution of concept DOIs to the Zenodo metadata of the latest version.
+    """
+    def __init__(self, path, ttl):
+        self.path, self.ttl = path, ttl
+        self.items = load(path) if path.exists() else {}
+
+    def get(self, doi):
+        item = self.items.get(doi)
+        if item and time.time() - item['resolved'] < self.ttl:
+            return item['record']
+
+    def set(self, doi, md):
+        self.items[doi] = dict(resolved=time.time(), record=md)
+
+    def save(self):
+        dump(self.items, self.path, indent=2)
+
+
 class Repository(base.Repository):
     id = 'cldf'
 
@@ -43,11 +73,39 @@ class Repository(base.Repository):
         return collections.OrderedDict([
             (row['name'], Dataset(**row)) for row in reader(self.dir / 'catalog.csv', dicts=True)])
 
-    def __getitem__(self, did):
+    @functools.cached_property
+    def index(self):
+        """
+        Maps dataset IDs to record data - including BibTeX - and the path of the CLDF metadata file.
+
+        The index is persisted in a JSON file - if the repository is writable - and items are only
+        recomputed if the Zenodo metadata or the catalog entry of a dataset changed.
+        """
+        p = self.dir / INDEX_NAME
+        cached = load_cache(p)
+        res = collections.OrderedDict()
+        for did, dataset in self.catalog.items():
+            md = self.dir / '{}.json'.format(did)
+            if not md.exists():  # Not downloaded yet.
+                continue
+            stamp = [md.stat().st_mtime_ns, md.stat().st_size, dataset.id]
+            item = cached.get(did)
+            if not item or item['stamp'] != stamp:
+                item = self._index_item(did, dataset, stamp)
+            res[did] = item
+        if res != cached:
+            dump_cache(res, p, indent=2)
+        return res
+
+    def _index_item(self, did, dataset, stamp):
         md = self.metadata(did)
-        return Publication(
-            Record(
-                ID=str(self.catalog[did].id),
+        return dict(
+            stamp=stamp,
+            version=md['version'],
+            metadata=str(next(iter_datasets(self.dir / did)).tablegroup._fname.relative_to(
+                self.dir / did)),
+            record=dict(
+                ID=str(dataset.id),
                 DOI=md['doi'],
                 license=md['license'],
                 creators=md['creators'],
@@ -57,40 +115,101 @@ class Repository(base.Repository):
                 objectlanguage=None,
                 bibtex=cldfzenodo.Record(**md).bibtex,
             ),
-            self.dir / did,
-            self)
+        )
+
+    def __getitem__(self, did):
+        return Publication(Record(**self.index[did]['record']), self.dir / did, self)
 
     def metadata(self, did):
         return load(self.dir / '{}.json'.format(did))
 
     def iter_publications(self):
-        for i, (did, rmd) in enumerate(self.catalog.items(), start=1):
-            md = self.metadata(did)
-            yield Publication(
-                Record(
-                    ID=str(rmd.id),
-                    DOI=md['doi'],
-                    license=md['license'],
-                    creators=md['creators'],
-                    title=md['title'],
-                    year=md['year'],
-                    metalanguage=None,
-                    objectlanguage=None,
-                    bibtex=cldfzenodo.Record(**md).bibtex,
-                ),
-                self.dir / did,
-                self)
-
-    def create(self, verbose=False):
-        for did, dataset in self.catalog.items():
-            dldir = self.dir / did
-            print(did)
-            rec = cldfzenodo.Record.from_concept_doi(dataset.conceptdoi)
+        for did, item in self.index.items():
+            yield Publication(Record(**item['record']), self.dir / did, self)
+
+    def create(self, verbose=False, workers=4, ttl=24 * 60 * 60, api=None):
+        """
+        Download the latest versions of the datasets listed in the catalog from Zenodo.
+
+        :param workers: Maximal number of concurrent requests to Zenodo.
+        :param ttl: Number of seconds for which the resolution of a concept DOI to the metadata of \
+        the latest version is cached.
+        :param api: Stand-in for `cldfzenodo.Record`, i.e. a class providing a `from_concept_doi` \
+        method and accepting the metadata of a record as keyword arguments.
+        :return: `dict` mapping dataset IDs to one of "new", "updated", "unchanged" or an exception.
+        """
+        api = api or cldfzenodo.Record
+        versions = VersionCache(self.dir / VERSIONS_NAME, ttl)
+
+        def resolve(doi):
+            md = versions.get(doi)
+            if md:
+                return api(**md)
+            rec = api.from_concept_doi(doi)
+            versions.set(doi, attr.asdict(rec))
+            return rec
+
+        def update(did, rec):
+            exists = (self.dir / did).exists()
+            if exists and self.metadata(did)['version'] == rec.version:
+                return 'unchanged'
+            if verbose:
+                print('{}: downloading {} ...'.format(did, rec.version))
+            self._download(did, rec)
+            return 'updated' if exists else 'new'
+
+        summary = collections.OrderedDict()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            # First, we resolve each concept DOI once, ...
+            dois = sorted({ds.conceptdoi for ds in self.catalog.values()})
+            # ... making sure a single failing DOI doesn't abort the whole update, ...
+            records = {}
+            resolving = {executor.submit(resolve, doi): doi for doi in dois}
+            for future in concurrent.futures.as_completed(resolving):
+                try:
+                    records[resolving[future]] = future.result()
+                except Exception as e:
+                    records[resolving[future]] = e
+            versions.save()
+            # ... then we download what's new:
+            futures = collections.OrderedDict()
+            for did, ds in self.catalog.items():
+                rec = records[ds.conceptdoi]
+                futures[did] = rec if isinstance(rec, Exception) else executor.submit(
+                    update, did, rec)
+            for did, future in futures.items():
+                if isinstance(future, Exception):  # The concept DOI could not be resolved.
+                    summary[did] = future
+                else:
+                    try:
+                        summary[did] = future.result()
+                    except Exception as e:
+                        summary[did] = e
+                if verbose:
+                    print('{}: {}'.format(did, summary[did]))
+        self.__dict__.pop('index', None)  # The index must be updated.
+        if verbose:
+            print(', '.join('{} {}'.format(n, status) for status, n in collections.Counter(
+                s if isinstance(s, str) else 'failed' for s in summary.values()).items()))
+        return summary
+
+    def _download(self, did, rec):
+        """
+        Download a dataset into a temporary directory, and swap it in for the old version.
+        """
+        dldir = self.dir / did
+        tmp = pathlib.Path(tempfile.mkdtemp(prefix='.{}-'.format(did), dir=self.dir))
+        try:
+            rec.download_dataset(tmp / did)
             if dldir.exists():
-                if self.metadata(did)['version'] == rec.version:
-                    continue
-                shutil.rmtree(dldir)  # pragma: no cover
-            print('downloading {} ...'.format(rec.version))
-            rec.download_dataset(self.dir / did)
-            print('... done')
-            dump(attr.asdict(rec), self.dir / '{}.json'.format(did), indent=2)
+                dldir.rename(tmp / 'old')
+            try:
+                (tmp / did).rename(dldir)
+            except Exception:
+                if (tmp / 'old').exists():  # Restore the old version before cleaning up.
+                    (tmp / 'old').rename(dldir)
+                raise
+            dump(attr.asdict(rec), tmp / 'md.json', indent=2)
+            os.replace(tmp / 'md.json', self.dir / '{}.json'.format(did))
+        finally:
+            shutil.rmtree(tmp)
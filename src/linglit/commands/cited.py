@@ -0,0 +1,37 @@
+"""
+Query a citation graph created with the `citegraph` command.
+"""
+import pathlib
+
+from clldutils.clilib import PathType, Table, add_format
+
+from linglit.citations import CitationGraph
+
+
+def register(parser):
+    parser.add_argument(
+        'graph', type=PathType(type='file'), help='Path of the citation graph file.')
+    parser.add_argument(
+        '--most-cited', type=int, default=None, help='List the N works cited most often.')
+    parser.add_argument(
+        '--citing', default=None, help='List the publications citing a work, given by key.')
+    parser.add_argument(
+        '--shared',
+        nargs=2,
+        default=None,
+        metavar='PUBID',
+        help='List the works cited by two publications.')
+    add_format(parser, default='simple')
+
+
+def run(args):
+    graph = CitationGraph(pathlib.Path(args.graph))
+    if args.citing:
+        with Table(args, 'Publication', 'Citations') as t:
+            t.extend(graph.citing(args.citing))
+    elif args.shared:
+        with Table(args, 'Work') as t:
+            t.extend([key] for key in graph.shared(*args.shared))
+    else:
+        with Table(args, 'Work', 'Publications', 'Citations') as t:
+            t.extend(graph.most_cited(args.most_cited or 10))
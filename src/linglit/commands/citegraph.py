@@ -0,0 +1,42 @@
+"""
+Add the citations of a provider's publications to a corpus-wide citation graph.
+
+Only publications with changed input data are re-extracted.
+"""
+import pathlib
+import collections
+
+from tqdm import tqdm
+
+from linglit.base import iter_released
+from linglit.cli_util import add_provider, get_provider
+from linglit.citations import CitationGraph
+
+
+def register(parser):
+    add_provider(parser)
+    parser.add_argument('graph', type=pathlib.Path, help='Path of the citation graph file.')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        default=False,
+        help='Re-extract all publications, even if they have not changed.')
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        default=False,
+        help='Remove publications from the graph which are no longer in the repository.')
+
+
+def run(args):
+    repos = get_provider(args)
+    graph = CitationGraph(args.graph)
+    ids, stats = [], collections.Counter()
+    for pub in tqdm(iter_released(repos.iter_publications())):
+        ids.append(pub.id)
+        stats['loaded' if graph.update(pub, force=args.force) else 'unchanged'] += 1
+    if args.prune:
+        stats['pruned'] = graph.prune(ids, prefix=repos.id)
+    graph.save()
+    args.log.info('{}: {}'.format(
+        repos.id, ', '.join('{} {}'.format(v, k) for k, v in sorted(stats.items()))))
@@ -0,0 +1,41 @@
+"""
+Load the data of a provider's publications into a SQLite database.
+
+Only publications with changed input data are re-extracted.
+"""
+import pathlib
+import collections
+
+from tqdm import tqdm
+
+from linglit.base import iter_released
+from linglit.cli_util import add_provider, get_provider
+from linglit.db import Database
+
+
+def register(parser):
+    add_provider(parser)
+    parser.add_argument('db', type=pathlib.Path, help='Path of the SQLite database file.')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        default=False,
+        help='Re-extract all publications, even if they have not changed.')
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        default=False,
+        help='Remove publications from the database which are no longer in the repository.')
+
+
+def run(args):
+    repos = get_provider(args)
+    db = Database(args.db)
+    ids, stats = [], collections.Counter()
+    for pub in tqdm(iter_released(repos.iter_publications())):
+        ids.append(pub.id)
+        stats['loaded' if db.upsert(pub, force=args.force) else 'unchanged'] += 1
+    if args.prune:
+        stats['pruned'] = db.prune(repos.id, ids)
+    args.log.info('{}: {}'.format(
+        repos.id, ', '.join('{} {}'.format(v, k) for k, v in sorted(stats.items()))))
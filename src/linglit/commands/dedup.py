@@ -0,0 +1,33 @@
+"""
+Find duplicate IGT examples across all publications in a database created with the `db` command.
+
+Duplicates are recorded in the table `duplicate`, linking each duplicate example to the canonical
+example of its cluster.
+"""
+import pathlib
+
+from clldutils.clilib import PathType
+from tqdm import tqdm
+
+from linglit.db import Database
+from linglit.dedup import Deduplicator, store, NUM_PERM
+
+
+def register(parser):
+    parser.add_argument('db', type=PathType(type='file'), help='Path of the SQLite database file.')
+    parser.add_argument(
+        '--bands',
+        type=int,
+        default=4,
+        # The bands must partition the MinHash signature:
+        choices=[n for n in range(1, NUM_PERM + 1) if NUM_PERM % n == 0],
+        help='Number of LSH bands. More bands cluster less similar examples.')
+
+
+def run(args):
+    db = Database(pathlib.Path(args.db))
+    with Deduplicator(bands=args.bands) as dedup:
+        for ex in tqdm(db.iter_examples()):
+            dedup.add(ex)
+        n = store(db, dedup.iter_clusters())
+    args.log.info('{} of {} examples are duplicates'.format(n, dedup.count))
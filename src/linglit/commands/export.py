@@ -0,0 +1,32 @@
+"""
+Export the IGT examples of a provider's publications to Parquet or Arrow IPC files.
+
+Requires pyarrow, installable via `pip install linglit[arrow]`.
+"""
+import pathlib
+
+from tqdm import tqdm
+
+from linglit.cli_util import add_provider, get_provider
+from linglit.export import export, FORMATS
+
+
+def register(parser):
+    add_provider(parser)
+    parser.add_argument(
+        'out',
+        type=pathlib.Path,
+        help='Output directory. Examples are written to a subdirectory "provider=<PROVIDER>".')
+    parser.add_argument('--format', choices=list(FORMATS), default='parquet')
+    parser.add_argument(
+        '--batch-size', type=int, default=10000, help='Number of examples per record batch.')
+
+
+def run(args):
+    res = export(
+        tqdm(get_provider(args).iter_publications()),
+        args.out,
+        fmt=args.format,
+        batch_size=args.batch_size)
+    for provider, n in res.items():
+        args.log.info('{}: {} examples exported'.format(provider, n))
@@ -1,38 +1,77 @@
 """
-Create a bibliography by merging all glossa publications in the repository and their references.
+Create a bibliography by merging all publications in the repository and their references.
+
+Using `--workdir`, an interrupted run can be resumed: The bibliographies of publications completed
+in an earlier run are kept in the directory and are not re-extracted - unless their input changed.
 """
+import pathlib
+import contextlib
+
 from clldutils.path import TemporaryDirectory
 from tqdm import tqdm
 from pybtex.database import parse_string
 
 from linglit.cli_util import add_provider, get_provider
 from linglit.bibtex import iter_entries, iter_merged
+from linglit.journal import Journal
 
 
 def register(parser):
     add_provider(parser)
     parser.add_argument(
-        '--drop-until', type=int, help='Numeric ID of the first book to process.', default=None)
+        '--workdir',
+        type=pathlib.Path,
+        help='Directory to store per-publication bibliographies and the run journal in.',
+        default=None)
+    parser.add_argument(
+        '--workers', type=int, help='Number of publications to process in parallel.', default=1)
+    parser.add_argument(
+        '--drop-until',
+        type=int,
+        help='Deprecated and ignored - interrupted runs can be resumed using --workdir.',
+        default=None)
 
 
 def run(args):
     def bibtex(src):
         return '{}\n'.format(src.bibtex())
 
+    if args.drop_until:
+        args.log.warning('Option --drop-until is deprecated and ignored - use --workdir instead.')
     repos = get_provider(args)
-    do = False if args.drop_until else True
-    with TemporaryDirectory() as tmp:
-        for pub in tqdm(repos.iter_publications()):
-            if pub.id == 'langsci{}'.format(args.drop_until):
-                do = True  # pragma: no cover
-            if not do:
-                continue  # pragma: no cover
-            with tmp.joinpath('{}.bib'.format(pub.id)).open('w') as bib:
+    pids = set()
+
+    def iter_publications():
+        for pub in repos.iter_publications():
+            pids.add(pub.id)
+            yield pub
+
+    with contextlib.ExitStack() as stack:
+        if args.workdir:
+            tmp = args.workdir
+            tmp.mkdir(parents=True, exist_ok=True)
+        else:
+            tmp = stack.enter_context(TemporaryDirectory())
+        bibs = tmp / 'bibs'
+        bibs.mkdir(exist_ok=True)
+
+        def write_bib(pub):
+            p = bibs / '{}.bib'.format(pub.id)
+            with p.open('w', encoding='utf8') as bib:
                 bib.write(bibtex(pub.as_source()))
                 for src in pub.cited_references:
                     bib.write(bibtex(src))
+            return p
+
+        stats = Journal(tmp / 'journal.jsonl').run(
+            tqdm(iter_publications()), write_bib, workers=args.workers)
+        args.log.info('{} publications completed, {} skipped'.format(
+            stats['completed'], stats['skipped']))
+        for p in bibs.glob('*.bib'):
+            if p.stem not in pids:  # Left from an earlier run, for a publication removed since.
+                p.unlink()
         ids = set()
-        for src, _ in iter_merged(iter_entries(tmp)):
+        for src, _ in iter_merged(iter_entries(bibs)):
             src.id = src.id.replace('\\', '')
             assert src.id not in ids, src.id
             ids.add(src.id)
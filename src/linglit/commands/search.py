@@ -0,0 +1,37 @@
+"""
+Search IGT examples in a database created with the `db` command.
+"""
+import pathlib
+
+from clldutils.clilib import PathType
+
+from linglit.db import Database
+from linglit.search import search
+
+
+def register(parser):
+    parser.add_argument('db', type=PathType(type='file'), help='Path of the SQLite database file.')
+    parser.add_argument(
+        'query', nargs='?', default=None, help='FTS5 query, e.g. "categories:ERG OR glosses:dog".')
+    parser.add_argument('--text', help='Word or phrase in the primary text.', default=None)
+    parser.add_argument('--morpheme', help='Morpheme of the analyzed words.', default=None)
+    parser.add_argument(
+        '--gloss', help='Gloss element, e.g. a category like ERG.', default=None)
+    parser.add_argument('--translation', help='Word or phrase in the translation.', default=None)
+    parser.add_argument(
+        '--language', help='Glottocode or name of the example language.', default=None)
+    parser.add_argument('--limit', type=int, help='Maximal number of results.', default=None)
+
+
+def run(args):
+    for ex in search(
+            Database(pathlib.Path(args.db)),
+            language=args.language,
+            limit=args.limit,
+            text=args.text,
+            morpheme=args.morpheme,
+            gloss=args.gloss,
+            translation=args.translation,
+            query=args.query):
+        print(ex)
+        print('')
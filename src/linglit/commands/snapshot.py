@@ -0,0 +1,22 @@
+"""
+Write publications, IGT examples and references (with citation counts) of a provider to a binary
+snapshot.
+
+Snapshots can be memory-mapped for instant reload, via `linglit.load_snapshot`.
+"""
+import pathlib
+
+from tqdm import tqdm
+
+from linglit.cli_util import add_provider, get_provider
+from linglit.snapshot import write_snapshot
+
+
+def register(parser):
+    add_provider(parser)
+    parser.add_argument('out', type=pathlib.Path, help='Path of the snapshot file.')
+
+
+def run(args):
+    write_snapshot(tqdm(get_provider(args).iter_publications()), args.out)
+    args.log.info('Snapshot written to {}'.format(args.out))
@@ -1,13 +1,30 @@
 """
 Update a linglit data repository
 """
+from clldutils.clilib import ParserError
+
 from linglit.cli_util import add_provider, get_provider
+from linglit import PROVIDERS
 
 
 def register(parser):
     add_provider(parser)
+    parser.add_argument(
+        '--compress',
+        help="Store data compressed - in a format supported by the provider: {}.".format(
+            '; '.join('{} - {}'.format(pid, ' or '.join(cls.compressions))
+                      for pid, cls in sorted(PROVIDERS.items()) if cls.compressions)),
+        choices=sorted({fmt for cls in PROVIDERS.values() for fmt in cls.compressions}),
+        default=None,
+    )
 
 
-def run(args):  # pragma: no cover
+def run(args):
     repo = get_provider(args)
-    repo.create(verbose=True)
+    if args.compress:
+        if args.compress not in repo.compressions:
+            raise ParserError('Provider {} does not support --compress {}'.format(
+                args.provider, args.compress))
+        repo.create(verbose=True, compress=args.compress)  # pragma: no cover
+    else:  # pragma: no cover
+        repo.create(verbose=True)
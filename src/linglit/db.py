@@ -0,0 +1,256 @@
+"""
+Materialize publications, examples, references and citations in a SQLite database.
+
+Publications are only re-extracted if their `fingerprint` changed, so updating the database for a
+provider after a repository update is cheap.
+"""
+import json
+import typing
+import pathlib
+import sqlite3
+import contextlib
+import collections
+
+from linglit.base import Publication, Example, AbbreviationTable
+from linglit.search import FTS_SCHEMA, index_terms
+from linglit.dedup import CLUSTER_SCHEMA
+
+__all__ = ['Database']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publication (
+    id TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    title TEXT,
+    creators TEXT,
+    year TEXT,
+    doi TEXT,
+    bibtex TEXT,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS example (
+    id TEXT PRIMARY KEY,
+    publication_id TEXT NOT NULL REFERENCES publication(id) ON DELETE CASCADE,
+    local_id TEXT,
+    primary_text TEXT,
+    analyzed_word TEXT,
+    gloss TEXT,
+    translated_text TEXT,
+    language_id TEXT,
+    language_name TEXT,
+    meta_language_id TEXT,
+    comment TEXT,
+    corpus_ref TEXT,
+    source_path TEXT,
+    source TEXT,
+    abbreviations_id TEXT REFERENCES abbreviations(id)
+);
+CREATE INDEX IF NOT EXISTS example_publication ON example(publication_id);
+CREATE INDEX IF NOT EXISTS example_language ON example(language_id);
+CREATE INDEX IF NOT EXISTS example_abbreviations ON example(abbreviations_id);
+CREATE TABLE IF NOT EXISTS abbreviations (
+    id TEXT PRIMARY KEY,
+    abbreviations TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reference (
+    id TEXT PRIMARY KEY,
+    publication_id TEXT NOT NULL REFERENCES publication(id) ON DELETE CASCADE,
+    genre TEXT,
+    bibtex TEXT
+);
+CREATE INDEX IF NOT EXISTS reference_publication ON reference(publication_id);
+CREATE TABLE IF NOT EXISTS citation (
+    publication_id TEXT NOT NULL REFERENCES publication(id) ON DELETE CASCADE,
+    reference_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (publication_id, reference_id)
+);
+""" + FTS_SCHEMA + CLUSTER_SCHEMA
+EXAMPLE_COLUMNS = [
+    'id', 'publication_id', 'local_id', 'primary_text', 'analyzed_word', 'gloss',
+    'translated_text', 'language_id', 'language_name', 'meta_language_id', 'comment', 'corpus_ref',
+    'source_path', 'source', 'abbreviations_id']
+
+
+class Database:
+    """
+    A SQLite database holding data extracted from publications.
+
+    List-valued example properties (`Analyzed_Word`, `Gloss`, `Source`) are stored as JSON.
+    Abbreviation tables are shared by many examples, thus stored - as JSON - only once in table
+    `abbreviations`, and referenced from examples by ID.
+    """
+    def __init__(self, path: typing.Union[str, pathlib.Path]):
+        self.path = pathlib.Path(path)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def connection(self) -> typing.Generator[sqlite3.Connection, None, None]:
+        conn = sqlite3.connect(str(self.path))
+        conn.execute('PRAGMA foreign_keys = ON')
+        try:
+            with conn:  # Commit on success, rollback on exceptions.
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _delete(conn, pids):
+        abbreviations = set()
+        for pid in pids:
+            abbreviations.update(row[0] for row in conn.execute(
+                "SELECT DISTINCT abbreviations_id FROM example "
+                "WHERE publication_id = ? AND abbreviations_id IS NOT NULL",
+                (pid,)))
+            # The full-text index cannot reference the example table, so we clean it up explicitly:
+            conn.execute(
+                "DELETE FROM example_fts WHERE example_id IN "
+                "(SELECT id FROM example WHERE publication_id = ?)",
+                (pid,))
+            conn.execute("DELETE FROM publication WHERE id = ?", (pid,))
+        # Remove those abbreviation tables of the deleted examples, which are no longer referenced:
+        conn.executemany(
+            "DELETE FROM abbreviations WHERE id = ? AND NOT EXISTS "
+            "(SELECT 1 FROM example WHERE abbreviations_id = ?)",
+            [(aid, aid) for aid in abbreviations])
+
+    def fingerprints(self, provider: typing.Optional[str] = None) -> typing.Dict[str, str]:
+        """
+        Maps publication IDs to the fingerprint of the data stored in the database.
+        """
+        sql, params = "SELECT id, fingerprint FROM publication", ()
+        if provider:
+            sql, params = sql + " WHERE provider = ?", (provider,)
+        with self.connection() as conn:
+            return dict(conn.execute(sql, params).fetchall())
+
+    def fingerprint(self, pid: str) -> typing.Optional[str]:
+        """
+        The fingerprint of the data stored for a publication.
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT fingerprint FROM publication WHERE id = ?", (pid,)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, pub: Publication, force: bool = False) -> bool:
+        """
+        (Re-)load data for a publication, unless the stored data is up-to-date.
+
+        :return: Flag signaling whether the publication was (re-)loaded.
+        """
+        if not force and self.fingerprint(pub.id) == pub.fingerprint:
+            return False
+        # We extract all data *before* modifying the database, to keep the transaction short:
+        src = pub.as_source()
+        publication = (
+            pub.id,
+            pub.repos.id,
+            pub.record.ID,
+            pub.record.title,
+            pub.record.creators if isinstance(pub.record.creators, str)
+            else ' and '.join(pub.record.creators),
+            pub.record.year,
+            pub.record.DOI,
+            src.bibtex(),
+            pub.fingerprint)
+        examples = [(
+            ex.ID,
+            pub.id,
+            ex.Local_ID,
+            ex.Primary_Text,
+            json.dumps(ex.Analyzed_Word),
+            json.dumps(ex.Gloss),
+            ex.Translated_Text,
+            ex.Language_ID,
+            ex.Language_Name,
+            ex.Meta_Language_ID,
+            ex.Comment,
+            ex.Corpus_Ref,
+            str(ex.Source_Path) if ex.Source_Path else None,
+            json.dumps(ex.Source),
+            ex.Abbreviations_ID) for ex in pub.examples]
+        abbreviations = {
+            ex.Abbreviations_ID: json.dumps(dict(ex.Abbreviations))
+            for ex in pub.examples if ex.Abbreviations}
+        references = [
+            (sid, pub.id, ref.genre, ref.bibtex()) for sid, ref in pub.references.items()]
+        citations = [(pub.id, sid, n) for sid, n in pub.cited.items()]
+        terms = [(ex.ID,) + index_terms(ex) for ex in pub.examples]
+
+        with self.connection() as conn:
+            self._delete(conn, [pub.id])
+            conn.execute(
+                "INSERT INTO publication VALUES ({})".format(', '.join(9 * '?')), publication)
+            conn.executemany(
+                "INSERT OR IGNORE INTO abbreviations VALUES (?, ?)", abbreviations.items())
+            conn.executemany(
+                "INSERT OR REPLACE INTO example VALUES ({})".format(
+                    ', '.join(len(EXAMPLE_COLUMNS) * '?')),
+                examples)
+            conn.executemany(
+                "INSERT OR REPLACE INTO reference VALUES (?, ?, ?, ?)", references)
+            conn.executemany("INSERT INTO citation VALUES (?, ?, ?)", citations)
+            conn.executemany("INSERT INTO example_fts VALUES (?, ?, ?, ?, ?, ?)", terms)
+        return True
+
+    def prune(self, provider: str, keep: typing.Iterable[str]) -> int:
+        """
+        Remove publications of a provider which are not listed in `keep`.
+
+        :return: Number of removed publications.
+        """
+        obsolete = set(self.fingerprints(provider)) - set(keep)
+        with self.connection() as conn:
+            self._delete(conn, obsolete)
+        return len(obsolete)
+
+    def iter_examples(
+            self,
+            where: typing.Optional[str] = None,
+            params: typing.Iterable = (),
+            limit: typing.Optional[int] = None,
+    ) -> typing.Generator[Example, None, None]:
+        """
+        Read examples from the database.
+
+        :param where: SQL condition on the `example` table.
+        """
+        sql = "SELECT {} FROM example".format(', '.join(EXAMPLE_COLUMNS))
+        if where:
+            sql += " WHERE " + where
+        sql += " ORDER BY publication_id, rowid"
+        if limit:
+            sql += " LIMIT {}".format(int(limit))
+        abbreviations = {None: AbbreviationTable()}
+        with self.connection() as conn:
+            for row in conn.execute(sql, tuple(params)):
+                row = dict(zip(EXAMPLE_COLUMNS, row))
+                if row['abbreviations_id'] not in abbreviations:
+                    abbreviations[row['abbreviations_id']] = AbbreviationTable(json.loads(
+                        conn.execute(
+                            "SELECT abbreviations FROM abbreviations WHERE id = ?",
+                            (row['abbreviations_id'],)).fetchone()[0],
+                        object_pairs_hook=collections.OrderedDict))
+                ex = Example(
+                    ID=row['id'],
+                    Local_ID=row['local_id'],
+                    Primary_Text=row['primary_text'],
+                    Analyzed_Word=json.loads(row['analyzed_word']),
+                    Gloss=json.loads(row['gloss']),
+                    Translated_Text='',
+                    Language_ID=row['language_id'],
+                    Language_Name=row['language_name'],
+                    Meta_Language_ID=row['meta_language_id'],
+                    Comment=None,
+                    Source=[tuple(s) for s in json.loads(row['source'])],
+                    Source_Path=row['source_path'],
+                    Abbreviations=abbreviations[row['abbreviations_id']],
+                )
+                # Assigned after initialization, to bypass the (already applied) normalization:
+                ex.Translated_Text = row['translated_text']
+                ex.Comment = row['comment']
+                ex.Corpus_Ref = row['corpus_ref']
+                yield ex
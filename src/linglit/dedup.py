@@ -0,0 +1,246 @@
+"""
+Corpus-wide deduplication of IGT examples.
+
+The same example is often cited in several publications - possibly with slightly different
+transcription, punctuation or glossing. We cluster examples by
+
+- exact duplicates, i.e. examples with identical normalized primary text and gloss,
+- near duplicates, i.e. examples whose MinHash signatures collide in one of the bands of a
+  locality-sensitive hashing (LSH) index.
+
+To keep memory bounded for millions of examples, signatures are not kept in memory. Instead,
+exact keys and LSH buckets are written to a temporary SQLite database, from which the candidate
+pairs are read sorted; only a compact union-find array of one integer per example is kept in memory.
+"""
+import re
+import array
+import random
+import struct
+import typing
+import hashlib
+import pathlib
+import sqlite3
+import tempfile
+import unicodedata
+
+import attr
+
+from linglit.base import Example
+
+__all__ = ['normalize', 'exact_key', 'minhash', 'Cluster', 'Deduplicator', 'store']
+
+NUM_PERM = 64  # Default number of MinHash permutations.
+CLUSTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS duplicate (
+    example_id TEXT PRIMARY KEY REFERENCES example(id) ON DELETE CASCADE,
+    canonical_id TEXT NOT NULL,
+    exact INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS duplicate_canonical ON duplicate(canonical_id);
+"""
+WORK_SCHEMA = """
+CREATE TABLE example (idx INTEGER PRIMARY KEY, id TEXT, exact INTEGER, score INTEGER);
+CREATE TABLE bucket (band INTEGER, hash INTEGER, idx INTEGER);
+"""
+PRIME = (1 << 61) - 1
+SHINGLE_SIZE = 4
+
+
+def normalize(s: str) -> str:
+    """
+    Normalize text for comparison, i.e. ignore case, punctuation and whitespace variation.
+    """
+    s = ''.join(
+        ' ' if unicodedata.category(c).startswith('P') else c
+        for c in unicodedata.normalize('NFC', s or '').casefold())
+    return re.sub(r'\s+', ' ', s).strip()
+
+
+def _text(ex: Example) -> str:
+    return '{} | {}'.format(normalize(ex.Primary_Text), normalize(' '.join(ex.Gloss)))
+
+
+def _hash(b: bytes, signed=False) -> int:
+    return int.from_bytes(hashlib.blake2b(b, digest_size=8).digest(), 'big', signed=signed)
+
+
+def exact_key(ex: Example) -> int:
+    """
+    Hash of normalized primary text and gloss, as signed 64-bit integer.
+    """
+    return _hash(_text(ex).encode('utf8'), signed=True)
+
+
+def _permutations(num_perm: int, seed: int = 42) -> typing.List[typing.Tuple[int, int]]:
+    rnd = random.Random(seed)
+    return [(rnd.randrange(1, PRIME), rnd.randrange(0, PRIME)) for _ in range(num_perm)]
+
+
+def minhash(
+        ex: Example,
+        permutations: typing.List[typing.Tuple[int, int]],
+) -> typing.Optional[typing.List[int]]:
+    """
+    MinHash signature of the character shingles of normalized primary text and gloss.
+    """
+    text = _text(ex)
+    if text == ' | ':  # Neither text nor gloss.
+        return None
+    shingles = {
+        _hash(text[i:i + SHINGLE_SIZE].encode('utf8'))
+        for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+    return [min((a * x + b) % PRIME for x in shingles) for a, b in permutations]
+
+
+def score(ex: Example) -> int:
+    """
+    Ranks examples for the choice of a canonical example of a cluster - the more complete the
+    better.
+    """
+    return 4 * bool(ex.Language_ID) + 2 * bool(ex.Translated_Text) + bool(ex.Source)
+
+
+@attr.s
+class Cluster:
+    canonical = attr.ib()  # ID of the canonical example
+    duplicates = attr.ib(default=attr.Factory(list))  # IDs of exact duplicates
+    near_duplicates = attr.ib(default=attr.Factory(list))  # IDs of near duplicates
+
+    def __len__(self):
+        return 1 + len(self.duplicates) + len(self.near_duplicates)
+
+
+class Deduplicator:
+    """
+    Streams examples into an LSH index and computes clusters of duplicates.
+
+    With the defaults of 64 permutations split into 4 bands, examples with a Jaccard similarity
+    of their shingles above ~0.92 are likely to be clustered. Since linguistic examples often come
+    as minimal pairs, lower thresholds - i.e. more bands - will cluster distinct examples.
+
+    Usage:
+
+    >>> with Deduplicator() as dedup:
+    ...     for ex in examples:
+    ...         dedup.add(ex)
+    ...     for cluster in dedup.iter_clusters():
+    ...         print(cluster.canonical, len(cluster))
+    """
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = 4, batch_size: int = 10000):
+        if bands < 1 or num_perm % bands:
+            raise ValueError('The number of bands must divide the number of permutations')
+        self.permutations = _permutations(num_perm)
+        self.bands, self.rows = bands, num_perm // bands
+        self.batch_size = batch_size
+        self.count = 0
+        self._tmp = tempfile.TemporaryDirectory()
+        self._conn = sqlite3.connect(str(pathlib.Path(self._tmp.name) / 'dedup.sqlite'))
+        self._conn.executescript(WORK_SCHEMA)
+        self._examples, self._buckets = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+        self._tmp.cleanup()
+
+    def add(self, ex: Example):
+        sig = minhash(ex, self.permutations)
+        if sig is None:
+            return
+        self._examples.append((self.count, ex.ID, exact_key(ex), score(ex)))
+        for band in range(self.bands):
+            values = sig[band * self.rows:(band + 1) * self.rows]
+            self._buckets.append((
+                band, _hash(struct.pack('<{}Q'.format(self.rows), *values), signed=True),
+                self.count))
+        self.count += 1
+        if len(self._examples) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with self._conn:
+            self._conn.executemany("INSERT INTO example VALUES (?, ?, ?, ?)", self._examples)
+            self._conn.executemany("INSERT INTO bucket VALUES (?, ?, ?)", self._buckets)
+        self._examples, self._buckets = [], []
+
+    def _union_find(self) -> array.array:
+        parent = array.array('L', range(self.count))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Examples in the same exact group or LSH bucket are linked to the group's first example:
+        for sql in [
+            "SELECT idx, min(idx) OVER (PARTITION BY exact) FROM example",
+            "SELECT idx, min(idx) OVER (PARTITION BY band, hash) FROM bucket",
+        ]:
+            for i, j in self._conn.execute(sql):
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[max(ri, rj)] = min(ri, rj)
+        for i in range(self.count):
+            parent[i] = find(i)
+        return parent
+
+    def iter_clusters(self, singletons: bool = False) -> typing.Generator[Cluster, None, None]:
+        """
+        Compute the clusters of duplicates.
+
+        :param singletons: Flag signaling whether to also yield examples without duplicates.
+        """
+        self.flush()
+        parent = self._union_find()
+        with self._conn:
+            self._conn.execute("DROP TABLE IF EXISTS cluster")
+            self._conn.execute("CREATE TABLE cluster (idx INTEGER PRIMARY KEY, root INTEGER)")
+            self._conn.executemany(
+                "INSERT INTO cluster VALUES (?, ?)", ((i, r) for i, r in enumerate(parent)))
+        del parent
+
+        def make_cluster(rows):
+            # The canonical example has the highest score - and was added first among these.
+            canonical = sorted(rows, key=lambda r: (-r[3], r[0]))[0]
+            res = Cluster(canonical=canonical[1])
+            for row in rows:
+                if row is not canonical:
+                    (res.duplicates if row[2] == canonical[2] else res.near_duplicates).append(
+                        row[1])
+            return res
+
+        rows, root = [], None
+        for row in self._conn.execute(
+                "SELECT e.idx, e.id, e.exact, e.score, c.root FROM example AS e "
+                "JOIN cluster AS c ON e.idx = c.idx ORDER BY c.root, e.idx"):
+            if row[4] != root:
+                if rows and (singletons or len(rows) > 1):
+                    yield make_cluster(rows)
+                rows, root = [], row[4]
+            rows.append(row)
+        if rows and (singletons or len(rows) > 1):
+            yield make_cluster(rows)
+
+
+def store(db, clusters: typing.Iterable[Cluster]) -> int:
+    """
+    Replace the duplicates recorded in a `linglit.db.Database`.
+
+    :return: Number of duplicate examples.
+    """
+    n = 0
+    with db.connection() as conn:
+        conn.execute("DELETE FROM duplicate")
+        for cluster in clusters:
+            conn.executemany(
+                "INSERT INTO duplicate VALUES (?, ?, ?)",
+                [(eid, cluster.canonical, 1) for eid in cluster.duplicates]
+                + [(eid, cluster.canonical, 0) for eid in cluster.near_duplicates])
+            n += len(cluster) - 1
+    return n
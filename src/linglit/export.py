@@ -0,0 +1,208 @@
+"""
+Export examples to columnar formats - Parquet or Arrow IPC - for fast loading into dataframes.
+
+Examples are streamed into record batches, with list columns for `Analyzed_Word`, `Gloss` and
+`Source`, dictionary-encoded publication and language columns, and one partition (i.e. directory
+`provider=<ID>`) per provider.
+
+Abbreviation tables - typically shared by many examples - are written once per partition, to a file
+`_abbreviations.<format>` (which is ignored when reading the partitioned directory as dataset), and
+referenced from examples by ID.
+
+Requires `pyarrow`, installable via `pip install linglit[arrow]`.
+"""
+import typing
+import pathlib
+import collections
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa, pq = None, None
+
+from linglit.base import Example, Publication, iter_released
+
+__all__ = ['ExampleWriter', 'export', 'FORMATS']
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+DICTIONARY_COLUMNS = [
+    'publication_id', 'language_id', 'language_name', 'meta_language_id', 'abbreviations_id']
+ABBREVIATIONS_NAME = '_abbreviations'
+
+
+def _require_pyarrow():
+    if pa is None:  # pragma: no cover
+        raise ValueError('Exporting examples requires pyarrow: pip install linglit[arrow]')
+
+
+def abbreviations_schema() -> 'pa.Schema':
+    _require_pyarrow()
+    return pa.schema([('id', pa.string()), ('abbreviations', pa.map_(pa.string(), pa.string()))])
+
+
+def schema() -> 'pa.Schema':
+    _require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.string()),
+        ('publication_id', dictionary),
+        ('local_id', pa.string()),
+        ('primary_text', pa.string()),
+        ('analyzed_word', pa.list_(pa.string())),
+        ('gloss', pa.list_(pa.string())),
+        ('translated_text', pa.string()),
+        ('language_id', dictionary),
+        ('language_name', dictionary),
+        ('meta_language_id', dictionary),
+        ('comment', pa.string()),
+        ('corpus_ref', pa.string()),
+        ('source_path', pa.string()),
+        ('source', pa.list_(pa.struct([('id', pa.string()), ('pages', pa.string())]))),
+        ('abbreviations_id', dictionary),
+    ])
+
+
+class DictionaryEncoder:
+    """
+    Dictionary-encodes a column across record batches.
+
+    The dictionary only ever grows, so the dictionaries of subsequent batches extend each other,
+    which allows writing them as deltas in Arrow IPC files.
+    """
+    def __init__(self):
+        self.values, self.index = [], {}
+
+    def __call__(self, values: typing.List[typing.Optional[str]]) -> 'pa.DictionaryArray':
+        indices = []
+        for v in values:
+            if v is None:
+                indices.append(None)
+                continue
+            if v not in self.index:
+                self.index[v] = len(self.values)
+                self.values.append(v)
+            indices.append(self.index[v])
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()), pa.array(self.values, type=pa.string()))
+
+
+class ExampleWriter:
+    """
+    Streams examples into one Parquet or Arrow IPC file, in record batches of `batch_size`.
+    """
+    def __init__(self, path: pathlib.Path, fmt: str = 'parquet', batch_size: int = 10000):
+        self.schema = schema()
+        self.path = path
+        self.format = fmt
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows = []
+        self._encoders = {col: DictionaryEncoder() for col in DICTIONARY_COLUMNS}
+        self.abbreviations = collections.OrderedDict()  # The distinct tables, keyed by ID.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(str(path), self.schema)
+        else:
+            self._sink = pa.OSFile(str(path), 'wb')
+            self._writer = pa.ipc.new_file(
+                self._sink,
+                self.schema,
+                options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, ex: Example, publication_id: str):
+        self._rows.append((publication_id, ex))
+        if ex.Abbreviations:
+            self.abbreviations.setdefault(ex.Abbreviations_ID, ex.Abbreviations)
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        cols = collections.OrderedDict([
+            ('id', [ex.ID for _, ex in self._rows]),
+            ('publication_id', [pid for pid, _ in self._rows]),
+            ('local_id', [ex.Local_ID for _, ex in self._rows]),
+            ('primary_text', [ex.Primary_Text for _, ex in self._rows]),
+            ('analyzed_word', [ex.Analyzed_Word for _, ex in self._rows]),
+            ('gloss', [ex.Gloss for _, ex in self._rows]),
+            ('translated_text', [ex.Translated_Text for _, ex in self._rows]),
+            ('language_id', [ex.Language_ID for _, ex in self._rows]),
+            ('language_name', [ex.Language_Name for _, ex in self._rows]),
+            ('meta_language_id', [ex.Meta_Language_ID for _, ex in self._rows]),
+            ('comment', [ex.Comment for _, ex in self._rows]),
+            ('corpus_ref', [ex.Corpus_Ref for _, ex in self._rows]),
+            ('source_path', [
+                str(ex.Source_Path) if ex.Source_Path else None for _, ex in self._rows]),
+            ('source', [
+                [dict(id=sid, pages=pages or None) for sid, pages in ex.Source]
+                for _, ex in self._rows]),
+            ('abbreviations_id', [ex.Abbreviations_ID for _, ex in self._rows]),
+        ])
+        arrays = []
+        for field in self.schema:
+            if field.name in self._encoders:
+                arrays.append(self._encoders[field.name](cols[field.name]))
+            else:
+                arrays.append(pa.array(cols[field.name], type=field.type))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        if self.format != 'parquet':
+            self._sink.close()
+        self._write_abbreviations()
+
+    def _write_abbreviations(self):
+        table = pa.table(
+            [
+                pa.array(list(self.abbreviations), type=pa.string()),
+                pa.array(
+                    [list(abbrs.items()) for abbrs in self.abbreviations.values()],
+                    type=pa.map_(pa.string(), pa.string())),
+            ],
+            schema=abbreviations_schema())
+        p = self.path.parent / '{}{}'.format(ABBREVIATIONS_NAME, FORMATS[self.format])
+        if self.format == 'parquet':
+            pq.write_table(table, str(p))
+        else:
+            with pa.OSFile(str(p), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+
+def export(
+        pubs: typing.Iterable[Publication],
+        d: typing.Union[str, pathlib.Path],
+        fmt: str = 'parquet',
+        batch_size: int = 10000,
+) -> typing.Dict[str, int]:
+    """
+    Export the examples of publications into per-provider partitions in directory `d`.
+
+    :return: `dict` mapping provider IDs to the number of exported examples.
+    """
+    d, writers = pathlib.Path(d), {}
+    try:
+        for pub in iter_released(pubs):
+            if pub.repos.id not in writers:
+                writers[pub.repos.id] = ExampleWriter(
+                    d / 'provider={}'.format(pub.repos.id) / 'examples{}'.format(FORMATS[fmt]),
+                    fmt=fmt,
+                    batch_size=batch_size)
+            for ex in pub.stream_examples():
+                writers[pub.repos.id].write(ex, pub.id)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {pid: writer.count for pid, writer in writers.items()}
@@ -1,4 +1,7 @@
 import re
+import typing
+import pathlib
+import functools
 
 from csvw.dsv import reader
 from pyglottolog.languoids import Glottocode
@@ -11,14 +14,24 @@ LNAME_MAP = {
 }
 
 
-def language_specs():
+@functools.lru_cache(maxsize=None)
+def _language_specs(p: pathlib.Path) -> typing.Dict[int, 'LanguageSpec']:
     res = {}
-    for d in reader(CFG_PATH / 'glossa.csv', dicts=True):
+    for d in reader(p, dicts=True):
         if d['example_languages']:
             res[int(d['id'])] = LanguageSpec(d['example_languages'])
     return res
 
 
+def language_specs() -> typing.Dict[int, 'LanguageSpec']:
+    """
+    Maps article ID to the `LanguageSpec` for the examples in the article.
+
+    The table is parsed only once per process (and config file).
+    """
+    return _language_specs(util.cfg_file('glossa', 'glossa.csv'))
+
+
 class LanguageSpec:
     def __init__(self, spec):
         self.language_ranges = {}
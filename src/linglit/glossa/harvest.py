@@ -0,0 +1,296 @@
+"""
+Asynchronous harvesting of the JATS XML of articles from the Glossa website.
+
+Requests are sent by a `Client`, which
+- re-uses persistent HTTP connections from a pool,
+- bounds the number of concurrent requests,
+- waits a minimal delay between starting requests, to be polite to the server,
+- retries requests failing with transient errors, with exponential backoff,
+- sends conditional requests (using ETag and Last-Modified) for cached pages.
+
+Since we want to do without additional dependencies, HTTP requests are sent with the blocking
+`http.client` API, run in a thread pool from asyncio code.
+"""
+import re
+import json
+import time
+import typing
+import asyncio
+import hashlib
+import logging
+import pathlib
+import http.client
+import urllib.parse
+import concurrent.futures
+
+from bs4 import BeautifulSoup as bs
+
+from linglit import storage
+
+__all__ = ['Client', 'HTTPError', 'harvest', 'iter_article_urls', 'next_page_url', 'xml_url']
+
+BASE_URL = "https://www.glossa-journal.org"
+URL_PATTERN = re.compile('article/id/(?P<id>[0-9]+)')
+CATALOG_PATH = "/articles/"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+REDIRECT_STATUS = {301, 302, 303, 307, 308}
+
+
+class HTTPError(Exception):
+    def __init__(self, url, status):
+        self.url, self.status = url, status
+        super().__init__('{} {}'.format(status, url))
+
+
+class Cache:
+    """
+    A directory storing response bodies and their validators, keyed by URL.
+
+    Since the cache typically lives within a (git) repository of harvested articles, it contains
+    a `.gitignore` file, excluding the cache from version control.
+    """
+    def __init__(self, d: pathlib.Path):
+        self.dir = d
+        self.dir.mkdir(parents=True, exist_ok=True)
+        gitignore = self.dir / '.gitignore'
+        if not gitignore.exists():
+            gitignore.write_text(
+                '# Created by linglit - the HTTP cache of harvest.\n*\n', encoding='utf8')
+
+    def _path(self, url, suffix):
+        return self.dir / '{}.{}'.format(hashlib.md5(url.encode('utf8')).hexdigest(), suffix)
+
+    def validators(self, url) -> dict:
+        p = self._path(url, 'json')
+        if p.exists() and self._path(url, 'body').exists():
+            return json.loads(p.read_text(encoding='utf8'))
+        return {}
+
+    def body(self, url) -> bytes:
+        return self._path(url, 'body').read_bytes()
+
+    def store(self, url, headers: dict, body: bytes):
+        validators = {
+            k: headers[k.lower()] for k in ['ETag', 'Last-Modified'] if k.lower() in headers}
+        if validators:
+            self._path(url, 'body').write_bytes(body)
+            self._path(url, 'json').write_text(json.dumps(validators), encoding='utf8')
+
+
+class Client:
+    """
+    Usage:
+
+    >>> async def main():
+    ...     async with Client(concurrency=4, delay=0.5) as client:
+    ...         return await asyncio.gather(*[client.get(url) for url in urls])
+    >>> asyncio.run(main())
+    """
+    def __init__(self,
+                 concurrency: int = 4,
+                 delay: float = 0.5,
+                 retries: int = 3,
+                 backoff: float = 1.0,
+                 timeout: float = 30,
+                 cache: typing.Optional[pathlib.Path] = None,
+                 verbose: bool = False):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = Cache(cache) if cache else None
+        self.verbose = verbose
+        self.stats = {'requests': 0, 'not modified': 0, 'retries': 0}
+        self._connections = {}  # Idle connections, by (scheme, netloc).
+        self._executor = None
+        self._semaphore = None
+        self._lock = None
+        self._next = 0
+
+    async def __aenter__(self):
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._lock = asyncio.Lock()
+        return self
+
+    async def __aexit__(self, *args):
+        for conns in self._connections.values():
+            for conn in conns:
+                conn.close()
+        self._connections = {}
+        self._executor.shutdown()
+
+    def _connection(self, scheme, netloc) -> http.client.HTTPConnection:
+        conns = self._connections.setdefault((scheme, netloc), [])
+        if conns:
+            return conns.pop()
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def _request(self, url, headers):
+        """
+        Send a GET request in a worker thread, returning status, headers and body of the response.
+        """
+        comps = urllib.parse.urlsplit(url)
+        conn = self._connection(comps.scheme, comps.netloc)
+        try:
+            conn.request(
+                'GET',
+                urllib.parse.urlunsplit(['', '', comps.path or '/', comps.query, '']),
+                headers=headers)
+            res = conn.getresponse()
+            body = res.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        if res.will_close:
+            conn.close()
+        else:  # The connection can be re-used.
+            self._connections[(comps.scheme, comps.netloc)].append(conn)
+        return res.status, {k.lower(): v for k, v in res.getheaders()}, body
+
+    async def _wait(self):
+        """
+        Wait until `delay` seconds have passed since the last request was started.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.delay
+
+    async def get(self, url: str, conditional: bool = False) -> bytes:
+        """
+        Retrieve the content of a URL, following redirects.
+
+        :param conditional: Flag signaling whether to cache the response and re-validate it with \
+        a conditional request.
+        """
+        for _ in range(5):
+            status, headers, body = await self._get(url, conditional)
+            if status not in REDIRECT_STATUS:
+                return body
+            url = urllib.parse.urljoin(url, headers['location'])
+        raise HTTPError(url, status)  # pragma: no cover
+
+    async def _get(self, url, conditional):
+        headers = {'User-Agent': 'linglit'}
+        validators = self.cache.validators(url) if (conditional and self.cache) else {}
+        if 'ETag' in validators:
+            headers['If-None-Match'] = validators['ETag']
+        if 'Last-Modified' in validators:
+            headers['If-Modified-Since'] = validators['Last-Modified']
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+            async with self._semaphore:
+                await self._wait()
+                if self.verbose:
+                    print('retrieving {}'.format(url))
+                self.stats['requests'] += 1
+                try:
+                    status, rheaders, body = await loop.run_in_executor(
+                        self._executor, self._request, url, headers)
+                except (OSError, http.client.HTTPException) as e:
+                    if attempt == self.retries:
+                        raise
+                    logging.getLogger(__name__).warning('{}: {}'.format(url, e))
+                    status, rheaders = None, {}
+            if status == 304:
+                self.stats['not modified'] += 1
+                return 200, rheaders, self.cache.body(url)
+            if status is None or status in RETRY_STATUS:
+                if attempt == self.retries:
+                    raise HTTPError(url, status)
+                retry_after = rheaders.get('retry-after', '')
+                await asyncio.sleep(
+                    int(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt)
+                continue
+            if status >= 400:
+                raise HTTPError(url, status)
+            if conditional and self.cache and status == 200:
+                self.cache.store(url, rheaders, body)
+            return status, rheaders, body
+
+
+def iter_article_urls(page: bs, base_url: str = BASE_URL) -> typing.Generator[str, None, None]:
+    """
+    The URLs of the article pages linked from a page of the article catalog.
+    """
+    for p in page.find_all('div', class_='card-panel'):
+        for a in p.find_all('a'):
+            yield urllib.parse.urljoin(base_url, a['href'])
+            break
+
+
+def next_page_url(page: bs, url: str) -> typing.Optional[str]:
+    """
+    The URL of the next page of the article catalog - i.e. the one following the active page.
+    """
+    pagination, active = page.find('ul', class_='pagination'), False
+    for li in pagination.find_all('li') if pagination else []:
+        if active and li.find('a') and li.find('a').get('href'):
+            return urllib.parse.urljoin(url, li.find('a')['href'])
+        if 'active' in li.get('class', []):
+            active = True
+
+
+def xml_url(page: bs, base_url: str = BASE_URL) -> typing.Optional[str]:
+    """
+    The URL of the JATS XML of an article, linked from the article page.
+    """
+    # <a href="/article/5809/galley/21790/download/">Download XML</a>
+    a = page.find('a', href=True, string='Download XML')
+    if a:
+        return urllib.parse.urljoin(base_url, a['href'])
+
+
+async def harvest(d: pathlib.Path,
+                  base_url: str = BASE_URL,
+                  pages: typing.Optional[int] = None,
+                  compress: typing.Optional[str] = None,
+                  **kw) -> typing.List[pathlib.Path]:
+    """
+    Download the XML of articles listed in the catalog and not present in `d` yet.
+
+    Catalog pages are requested one after the other - but re-validated against cached copies - while
+    articles are downloaded concurrently.
+
+    :param compress: Compression - see `linglit.storage.COMPRESSIONS` - for the XML files.
+    :param kw: Keyword arguments to initialize the `Client`.
+    :return: List of paths of the downloaded XML files.
+    """
+    kw.setdefault('cache', d / '.cache')
+
+    async def get_xml(client, url):
+        p = d / '{}.xml'.format(URL_PATTERN.search(url).group('id'))
+        try:
+            xurl = xml_url(bs(await client.get(url), 'lxml'), base_url=base_url)
+            if xurl:
+                # Written atomically, so incomplete downloads are not mistaken for articles:
+                return storage.write_bytes(p, await client.get(xurl), compression=compress)
+        except (HTTPError, OSError, http.client.HTTPException) as e:  # pragma: no cover
+            logging.getLogger(__name__).warning('Skipping {}: {}'.format(url, e))
+
+    tasks = []
+    async with Client(**kw) as client:
+        url, pagenum = urllib.parse.urljoin(base_url, CATALOG_PATH), 0
+        while url:
+            pagenum += 1
+            if pages and pagenum >= pages:
+                break  # pragma: no cover
+            page = bs(await client.get(url, conditional=True), 'lxml')
+            for aurl in iter_article_urls(page, base_url=base_url):
+                m = URL_PATTERN.search(aurl)
+                if m and not storage.exists(d.joinpath('{}.xml'.format(m.group('id')))):
+                    tasks.append(asyncio.ensure_future(get_xml(client, aurl)))
+            url = next_page_url(page, url)
+        res = [p for p in await asyncio.gather(*tasks) if p]
+        if client.verbose:
+            print('{} articles downloaded; {} requests, {} not modified, {} retries'.format(
+                len(res), client.stats['requests'], client.stats['not modified'],
+                client.stats['retries']))
+    return res
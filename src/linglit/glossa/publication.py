@@ -1,3 +1,5 @@
+import functools
+
 import attr
 from pycldf.sources import Source
 
@@ -7,7 +9,8 @@ from . import xml
 
 @attr.s
 class Record(base.Record):
-    doc = attr.ib()
+    volume = attr.ib()
+    issue = attr.ib()
 
     def as_source(self):
         return Source(
@@ -16,8 +19,8 @@ class Record(base.Record):
             author=self.creators,
             title=self.title,
             year=self.year,
-            volume=self.doc.xpath(".//volume")[0].text,
-            issue=self.doc.xpath(".//issue")[0].text,
+            volume=self.volume,
+            issue=self.issue,
             doi=self.DOI,
             publisher="Open Library of Humanities",
             journal="Glossa: a journal of general linguistics",
@@ -29,13 +32,31 @@ class Record(base.Record):
 
 
 class Publication(base.Publication):
+    cached_attributes = base.Publication.cached_attributes + ['doc']
+
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
-        self.doc = xml.parse(self.dir)
         self.language_spec = self.record
         self.record = Record(**xml.metadata(self.dir, self.doc))
         self.abbreviations = xml.abbreviations(self.doc)
 
+    @functools.cached_property
+    def doc(self):
+        """
+        The parsed XML of the article - which may be released, since it is big.
+        """
+        return xml.parse(self.dir)
+
+    def iter_fingerprint_data(self):
+        """
+        Extracted data also depends on the language spec from the config table `glossa.csv`.
+        """
+        yield from super().iter_fingerprint_data()
+        if self.language_spec:
+            yield repr((
+                self.language_spec.language,
+                sorted(self.language_spec.language_ranges.items()))).encode('utf8')
+
     def iter_references(self):
         yield from xml.refs(self.doc)
 
@@ -44,8 +65,11 @@ class Publication(base.Publication):
             yield xref.get('rid')
 
     def iter_examples(self, glottolog=None):
-        for count, number, letter, lang, xrefs, igt, comment in xml.iter_igt(
-                self.doc, self.abbreviations):
+        # Abbreviations may be defined in the translations of examples, so we have to parse all
+        # examples before we know the complete - shared - abbreviation table:
+        igts = list(xml.iter_igt(self.doc, self.abbreviations))
+        abbrs = base.AbbreviationTable(self.abbreviations)
+        for count, number, letter, lang, xrefs, igt, comment in igts:
             lid = '{}{}'.format(number or '', letter or '')
             refs = []
             for sid, reft, label in xrefs:
@@ -63,7 +87,7 @@ class Publication(base.Publication):
                 Language_ID=None,
                 Language_Name=self.language_spec(lang, lid) if self.language_spec else lang,
                 Source=refs,
-                Abbreviations=self.abbreviations,
+                Abbreviations=abbrs,
                 Meta_Language_ID='stan1293',
                 Comment=comment,
             )
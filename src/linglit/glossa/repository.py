@@ -1,90 +1,79 @@
-import re
-import urllib.request
-
-from bs4 import BeautifulSoup as bs
+import asyncio
+import collections
+import concurrent.futures
 
 from linglit import base
+from linglit import storage
 from .publication import Publication
+from .harvest import harvest
 from . import cfg
 
-BASE_URL = "https://www.glossa-journal.org"
-URL_PATTERN = re.compile('article/id/(?P<id>[0-9]+)')
-CATALOG_URL = BASE_URL + "/articles/"
+XML_SUFFIXES = ['xml'] + ['xml.{}'.format(c) for c in storage.COMPRESSIONS]
 
 
 class Repository(base.Repository):
     id = 'glossa'
     lname_map = cfg.LNAME_MAP
+    compressions = storage.COMPRESSIONS
+
+    def create(self, verbose=False, **kw):
+        """
+        Download the XML of new articles.
 
-    def create(self, verbose=False):
-        get_all(self.dir, verbose=verbose, pages=30)
+        :param kw: Keyword arguments passed into `linglit.glossa.harvest.harvest`.
+        """
+        kw.setdefault('pages', 30)
+        res = asyncio.run(harvest(self.dir, verbose=verbose, **kw))
+        if kw.get('compress'):
+            self.compress(kw['compress'])
+        return res
+
+    def compress(self, compression='gz'):
+        """
+        Compress the XML files of all articles.
+        """
+        for p in self.dir.glob('*.xml'):
+            storage.write_bytes(p, p.read_bytes(), compression=compression)
+            p.unlink()
 
     def __getitem__(self, item):
         p = self.dir / '{}.xml'.format(item)
-        if not p.exists():
+        if not storage.exists(p):
             raise KeyError(item)
         lspecs = cfg.language_specs()
         return Publication(lspecs.get(int(item)), p, repos=self)
 
-    def iter_publications(self):
+    def iter_publications(self, workers: int = 0):
+        """
+        :param workers: Number of articles to parse and extract data from concurrently in threads, \
+        ahead of the publication currently being processed.
+        """
         lspecs = cfg.language_specs()
-        for p in sorted(self.dir.glob('*.xml'), key=lambda p_: int(p_.stem)):
-            yield Publication(lspecs.get(int(p.stem)), p, repos=self)
-
-
-def download(url, verbose=False):
-    if verbose:
-        print('retrieving {}'.format(url))
-    return urllib.request.urlopen(url).read().decode('utf8')
-
-
-def get_xml(url, d, verbose=False):
-    if url:
-        m = URL_PATTERN.search(url)
-        if m:
-            p = d / '{}.xml'.format(m.group('id'))
-            if not p.exists():
-                page = bs(download(url, verbose=verbose), 'lxml')
-                xml_url = page.find('a', href=True, string='Download XML')
-                if xml_url:
-                    xml_url = xml_url['href']
-                    if not xml_url.startswith('http'):
-                        xml_url = BASE_URL + xml_url
-                    p.write_text(download(xml_url), encoding='utf8')
-                else:  # pragma: no cover
-                    return
-            return p.read_text(encoding='utf8')
-
+        # Articles may be stored compressed, but are identified by the path of the plain XML file:
+        paths = sorted(
+            {self.dir / '{}.xml'.format(p.name.split('.')[0]) for p in self.dir.glob('*.xml*')
+             if p.name.split('.', maxsplit=1)[1] in XML_SUFFIXES},
+            key=lambda p_: int(p_.stem))
+        if not workers:
+            for p in paths:
+                yield Publication(lspecs.get(int(p.stem)), p, repos=self)
+            return
 
-def get_all(d, verbose=False, pages=None):
-    url = CATALOG_URL
-    pagenum = 0
-    while url:
-        pagenum += 1
-        if pages and pagenum >= pages:
-            break  # pragma: no cover
-        page = bs(download(url, verbose=verbose), 'lxml')
-        for p in page.find_all('div', class_='card-panel'):
-            for a in p.find_all('a'):
-                url = a['href']
-                if not url.startswith('http'):
-                    url = BASE_URL + url
-                get_xml(url, d, verbose=verbose)
-                # download HTML, look for "Download XML" link:
-                # <a href="/article/5809/galley/21790/download/">Download XML</a>
-                # https://www.glossa-journal.org/article/5821/galley/21844/download/
-                break
+        def load(p):
+            pub = Publication(lspecs.get(int(p.stem)), p, repos=self)
+            # lxml releases the GIL, so extracting the data in the worker thread pays off:
+            _ = pub.references, pub.cited, pub.examples
+            return pub
 
-        pagination = page.find('ul', class_='pagination')
-        active = None
-        for p in pagination.find_all('li'):
-            if active:  # pragma: no cover
-                try:
-                    url = CATALOG_URL + p.find('a')['href']
-                    break
-                except KeyError:
-                    continue
-            if 'active' in p['class']:
-                active = True
-        else:
-            break
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            queue = collections.deque()
+            try:
+                for p in paths:
+                    queue.append(executor.submit(load, p))
+                    if len(queue) > 2 * workers:
+                        yield queue.popleft().result()
+                while queue:
+                    yield queue.popleft().result()
+            finally:  # Don't parse articles which will not be consumed.
+                for future in queue:
+                    future.cancel()
@@ -1,11 +1,54 @@
 import re
+import typing
 import functools
 
 from clldutils.misc import nfilter
 from lxml.etree import fromstring, tostring
 from pyigt import IGT
+from pyigt.igt import NON_OVERT_ELEMENT
+from pyigt.lgrmorphemes import MORPHEME_SEPARATORS
 from pycldf.sources import Source
 
+from linglit import storage
+
+MORPHEME_SEPARATOR_PATTERN = re.compile('[{}]'.format(re.escape(''.join(MORPHEME_SEPARATORS))))
+
+
+class Tiers(typing.NamedTuple):
+    """
+    The tiers of an interlinear glossed example, as parsed from the XML.
+
+    Creating a `pyigt.IGT` for each example is expensive - and not necessary for the data we
+    extract - so IGT objects are only created on demand.
+    """
+    phrase: typing.List[str]
+    gloss: typing.List[str]
+    translation: str
+    primary_text: str
+
+    @classmethod
+    def from_parsed(cls, phrase, gloss, translation, abbrs):
+        """
+        Process the parsed tiers like `pyigt.IGT` would.
+
+        :param abbrs: `dict` to which abbreviations defined in the translation are added.
+        """
+        if translation:
+            # Strip quotes and extract abbreviations, using pyigt's implementation:
+            translation = IGT(phrase=[], gloss=[], translation=translation, abbrs=abbrs).translation
+        text = ' '.join(w or '' for w in phrase)
+        if NON_OVERT_ELEMENT in text:  # pragma: no cover
+            # Non-overt elements are only removed from the primary text of morpheme-aligned IGT:
+            text = IGT(phrase=phrase, gloss=gloss).primary_text
+        else:
+            text = MORPHEME_SEPARATOR_PATTERN.sub('', text)
+        return cls(phrase, gloss, translation, text)
+
+    def as_igt(self, abbrs=None) -> IGT:
+        igt = IGT(phrase=self.phrase, gloss=self.gloss, abbrs=abbrs or {})
+        igt.translation = self.translation  # Already processed.
+        return igt
+
 
 def element(s):
     if isinstance(s, str):
@@ -14,7 +57,7 @@ def element(s):
 
 
 def parse(p):
-    return fromstring(p.read_bytes().replace(b'&nbsp;', b'&#160;'))
+    return fromstring(storage.read_bytes(p).replace(b'&nbsp;', b'&#160;'))
 
 
 def translate(in_, out_, s):
@@ -189,7 +232,7 @@ def iter_igt(d, abbrs):
                 except AssertionError:  # pragma: no cover
                     res = None
                 if res:
-                    igt = IGT(phrase=res[0], gloss=res[1], translation=res[2], abbrs=abbrs)
+                    igt = Tiers.from_parsed(res[0], res[1], res[2], abbrs)
                     if igt.primary_text not in seen:
                         refs.extend(res[4])
                         count += 1
@@ -282,7 +325,8 @@ def metadata(p, doc):
         creators=names(doc.xpath(".//contrib[@contrib-type='author']/name")),
         title=title,
         year=doc.xpath(".//pub-date/year")[0].text,
-        doc=doc,
+        volume=doc.xpath(".//volume")[0].text,
+        issue=doc.xpath(".//issue")[0].text,
     )
 
 
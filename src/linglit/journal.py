@@ -0,0 +1,108 @@
+"""
+A run journal, to make long runs over the publications of a repository resumable.
+
+The journal is a JSON lines file, with one record per completed publication, listing the
+fingerprint of its input data and path and MD5 hash of its output. Records are appended and flushed
+as soon as a publication is completed, so after a crash a run can be resumed exactly where it
+stopped: Publications with unchanged input and intact output are skipped.
+"""
+import os
+import json
+import typing
+import hashlib
+import pathlib
+import collections
+import concurrent.futures
+
+from linglit.base import Publication
+
+__all__ = ['Journal']
+
+
+def md5(p: pathlib.Path) -> str:
+    return hashlib.md5(p.read_bytes()).hexdigest()
+
+
+class Journal:
+    """
+    Usage:
+
+    >>> def process(pub):
+    ...     out = workdir / '{}.txt'.format(pub.id)
+    ...     out.write_text(...)
+    ...     return out
+    >>> Journal(workdir / 'journal.jsonl').run(repos.iter_publications(), process, workers=4)
+    """
+    def __init__(self, path: typing.Union[str, pathlib.Path]):
+        self.path = pathlib.Path(path)
+        self.completed = {}
+        if self.path.exists():
+            data = self.path.read_bytes()
+            if data and not data.endswith(b'\n'):
+                # A record truncated by a crash - which we remove, so that we can append records:
+                data = data[:data.rfind(b'\n') + 1]
+                with self.path.open('r+b') as f:
+                    f.truncate(len(data))
+            for line in data.decode('utf8').splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:  # pragma: no cover
+                    continue
+                self.completed[record['id']] = record
+
+    def is_completed(self, pub: Publication) -> bool:
+        record = self.completed.get(pub.id)
+        if not record or record['fingerprint'] != pub.fingerprint:
+            return False
+        out = pathlib.Path(record['output'])
+        return out.exists() and md5(out) == record['md5']
+
+    def complete(self, pub: Publication, output: pathlib.Path):
+        record = dict(id=pub.id, fingerprint=pub.fingerprint, output=str(output), md5=md5(output))
+        with self.path.open('a', encoding='utf8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.completed[pub.id] = record
+
+    def run(self,
+            pubs: typing.Iterable[Publication],
+            func: typing.Callable[[Publication], pathlib.Path],
+            workers: int = 1) -> collections.Counter:
+        """
+        Run `func` for all publications which have not been completed yet.
+
+        Publications are consumed lazily from `pubs`, with at most `2 * workers` publications
+        being processed or waiting to be processed at any time.
+
+        :param func: Callable processing one publication, returning the path of its output.
+        :param workers: Number of publications to process in parallel threads.
+        :return: `Counter` of completed and skipped publications.
+        """
+        stats, futures = collections.Counter(), {}
+
+        def collect(return_when):
+            done, _ = concurrent.futures.wait(futures, return_when=return_when)
+            for future in done:
+                pub = futures.pop(future)
+                self.complete(pub, future.result())
+                release = getattr(pub, 'release', None)
+                if release:  # Drop the data of completed publications.
+                    release()
+                stats['completed'] += 1
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for pub in pubs:
+                    if self.is_completed(pub):
+                        stats['skipped'] += 1
+                        continue
+                    futures[executor.submit(func, pub)] = pub
+                    if len(futures) >= 2 * workers:
+                        collect(concurrent.futures.FIRST_COMPLETED)
+                collect(concurrent.futures.ALL_COMPLETED)
+            except:  # noqa: E722
+                for future in futures:
+                    future.cancel()
+                raise
+        return stats
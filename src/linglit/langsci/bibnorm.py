@@ -0,0 +1,136 @@
+"""
+In-process normalization of BibTeX, as alternative to running bibtool.
+
+We implement the subset of the rules in `cfg/langsci/bibtool.rsc` which matter for the sources we
+extract:
+
+- `expand.macros`: `@string` macros are expanded - by pybtex - when parsing,
+- `expand.crossref`: Fields of cross-referenced entries are copied to the referencing entries,
+- `preserve.key.case`: Keys are not modified,
+- `delete.field`: Fields listed in the resource file are removed.
+
+Rules for printing and for declaring entry types are irrelevant, since we never serialize
+the entries and pybtex accepts arbitrary entry types.
+"""
+import re
+import typing
+import logging
+import pathlib
+import functools
+
+from pybtex.database import Entry, Person
+from pybtex.database.input.bibtex import Parser, month_names
+from pybtex.exceptions import PybtexError
+from pybtex.bibtex.utils import split_name_list
+from pybtex import textutils
+
+from . import cfg
+
+__all__ = ['parse', 'iter_entries', 'deleted_fields']
+
+KEYLESS_PATTERN = re.compile(r'^@[A-Za-z]+\s*\{\s*,', flags=re.MULTILINE)
+RSC_PATTERN = re.compile(r'^\s*(?P<name>[a-z.]+)\s*(=\s*(?P<value>.+)|\{(?P<arg>[^}]+)})\s*$')
+
+
+@functools.lru_cache(maxsize=None)
+def deleted_fields(p: typing.Optional[pathlib.Path] = None) -> typing.FrozenSet[str]:
+    """
+    The (lowercase) names of the fields deleted by the `delete.field` rules of a resource file.
+    """
+    res = set()
+    for line in (p or cfg.BIBTOOL_RSC).read_text(encoding='utf8').splitlines():
+        m = RSC_PATTERN.match(line)
+        if m and m.group('name') == 'delete.field':
+            res.add(m.group('arg').strip().lower())
+    return frozenset(res)
+
+
+class _Parser(Parser):
+    """
+    A parser collecting all entries - including ones with duplicate keys - in order.
+
+    Like bibtool, we keep the first value of duplicate fields.
+    """
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.entries = []
+
+    def process_entry(self, entry_type, key, fields):
+        if entry_type.lower() == 'unpublished' and key.startswith('rien'):  # Empty stub.
+            return  # pragma: no cover
+        entry, seen = Entry(entry_type), set()
+        for name, values in fields:
+            if name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            value = textutils.normalize_whitespace(self.flatten_value_list(values))
+            if name in self.person_fields:
+                for person in split_name_list(value):
+                    entry.add_person(Person(person), name)
+            else:
+                entry.fields[name] = value
+        entry.key = key
+        self.entries.append(entry)
+
+
+def parse(bibtex: str) -> typing.List[Entry]:
+    """
+    Parse BibTeX in one go, skipping invalid entries individually.
+
+    If the BibTeX cannot be parsed, we bisect the list of records (i.e. chunks of text starting with
+    "@" at the start of a line), to isolate and skip the invalid records, while parsing the valid
+    ones in as few batches as possible.
+    """
+    # Records without key are turned into comments:
+    chunks = re.split(r'(?=^@)', KEYLESS_PATTERN.sub('@comment{', bibtex), flags=re.MULTILINE)
+    entries, macros = [], month_names
+
+    def parse_chunks(chunks):
+        nonlocal macros
+        parser = _Parser(macros=macros)
+        try:
+            parser.parse_string(''.join(chunks))
+        except PybtexError as e:
+            if len(chunks) == 1:
+                logging.getLogger(__name__).warning('Skipping invalid BibTeX: {}'.format(e))
+                return
+            parse_chunks(chunks[:len(chunks) // 2])
+            parse_chunks(chunks[len(chunks) // 2:])
+            return
+        entries.extend(parser.entries)
+        macros = parser.macros  # Macros defined in earlier chunks may be used in later ones.
+
+    parse_chunks(chunks)
+    return entries
+
+
+def expand_crossref(entry: Entry, parent: Entry):
+    for name, value in parent.fields.items():
+        if name not in entry.fields:
+            entry.fields[name] = value
+    for role, persons in parent.persons.items():
+        if role not in entry.persons:
+            for person in persons:
+                entry.add_person(person, role)
+
+
+def iter_entries(bibtex: str) -> typing.Generator[typing.Tuple[str, Entry], None, None]:
+    """
+    Parse and normalize BibTeX.
+    """
+    entries, by_key = parse(bibtex), {}
+    for entry in entries:
+        by_key.setdefault(entry.key.lower(), entry)
+
+    delete = deleted_fields()
+    for entry in entries:
+        crossref = entry.fields.get('crossref')
+        if crossref:
+            parent = by_key.get(crossref.lower())
+            if parent is not None:
+                expand_crossref(entry, parent)
+                del entry.fields['crossref']
+        for name in list(entry.fields.keys()):
+            if name.lower() in delete:
+                del entry.fields[name]
+        yield entry.key, entry
@@ -1,22 +1,25 @@
 """
 Functionality to read LSP BibTeX files.
 """
+import os
 import re
 import typing
 import logging
 import pathlib
 import subprocess
 import unicodedata
+import concurrent.futures
 
-from pybtex import database
 from clldutils.source import Source
 from clldutils.misc import slug
 from clldutils.path import ensure_cmd
 
+from linglit import storage
 from .latex import simple_to_text
 from . import cfg
+from . import bibnorm
 
-__all__ = ['iter_bib', 'normalize_key']
+__all__ = ['iter_bib', 'normalize_key', 'BibtoolPool']
 
 # Invalid author lists (and fixes):
 NAMES = {
@@ -490,19 +493,17 @@ def to_source(key, e):
     return src
 
 
-def iter_bib(ps: typing.List[pathlib.Path], verbose=False) -> typing.Generator[Source, None, None]:
+def preprocess(ps: typing.List[pathlib.Path]) -> str:
     """
-    :param ps: `list` of paths to bibtex files making up one bibliography.
+    Read and concatenate bibtex files, fixing the stuff that bibtool can't fix.
     """
-    log = logging.getLogger(__name__)
     bibtex = []
     for p in ps:
-        # preprocess the bibtex, fixing the stuff that bibtool can't fix:
-        text = p.read_text(encoding='utf8')
+        text = storage.read_text(p)
         lines = [ln.strip() for ln in text.split('\n') if ln.strip()]
-        if len(lines) == 1 and len(lines[0]) < 200 and p.parent.joinpath(lines[0]).exists():
+        if len(lines) == 1 and len(lines[0]) < 200 and storage.exists(p.parent.joinpath(lines[0])):
             # Special handling for 237, where the path to 223's bib is given in the bibfile!
-            text = p.parent.joinpath(lines[0]).read_text(encoding='utf8')  # pragma: no cover
+            text = storage.read_text(p.parent.joinpath(lines[0]))  # pragma: no cover
 
         text = text.replace('\xa0', ' ')
 
@@ -540,15 +541,24 @@ def iter_bib(ps: typing.List[pathlib.Path], verbose=False) -> typing.Generator[S
         ]:
             text = text.replace(k, v)
         bibtex.append(text)
+    return '\n'.join(bibtex)
+
 
-    # Now run bibtool:
+def run_bibtool(bibtex: str, verbose=False) -> str:
+    """
+    Normalize bibtex with bibtool.
+
+    Since the subprocess runs outside of the GIL, multiple instances can be run concurrently from
+    threads, see `BibtoolPool`.
+    """
+    log = logging.getLogger(__name__)
     cmd = subprocess.Popen(
         [ensure_cmd('bibtool'), '-r', str(cfg.BIBTOOL_RSC)],
         stdin=subprocess.PIPE,
         stderr=subprocess.PIPE,
         stdout=subprocess.PIPE,
     )
-    stdout, stderr = cmd.communicate(input='\n'.join(bibtex).encode('utf8'))
+    stdout, stderr = cmd.communicate(input=bibtex.encode('utf8'))
     for line in stderr.decode('utf8').splitlines():  # pragma: no cover
         if line.strip():
             if any(s in line for s in
@@ -556,25 +566,76 @@ def iter_bib(ps: typing.List[pathlib.Path], verbose=False) -> typing.Generator[S
                 continue
             if verbose:
                 log.warning('bibtool:::' + line)
+    return stdout.decode('utf8')
+
+
+class BibtoolPool:
+    """
+    Runs bibtool for multiple bibliographies concurrently.
+
+    bibtool reads its input until EOF, so a process cannot be reused for multiple bibliographies.
+    Instead, a pool of threads spawns and drives bibtool processes, while the calling thread
+    post-processes the results of earlier bibliographies.
+
+    Usage:
 
-    # Now feed the bibtex to pybtex one record at a time to skip duplicate keys:
-    for i, chunk in enumerate(re.split(r'^@', stdout.decode('utf8'), flags=re.MULTILINE)):
-        # Again some preprocessing:
-        if re.match('[A-Za-z]+{,', chunk):  # record without key.
-            continue  # pragma: no cover
-        if chunk.startswith('unpublished{rien'):  # empty stub.
-            continue  # pragma: no cover
+    >>> with BibtoolPool() as pool:
+    ...     futures = [pool.submit(ps) for ps in bibliographies]
+    ...     for ps, future in zip(bibliographies, futures):
+    ...         refs = list(iter_bib(ps, bibtool_output=future.result()))
+    """
+    def __init__(self, max_workers: typing.Optional[int] = None, verbose=False):
+        self.verbose = verbose
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def submit(self, ps: typing.List[pathlib.Path]) -> concurrent.futures.Future:
+        """
+        :return: A future resolving to bibtool's output for the bibliography.
+        """
+        return self.executor.submit(lambda: run_bibtool(preprocess(ps), verbose=self.verbose))
+
+
+def iter_bib(
+        ps: typing.List[pathlib.Path],
+        verbose=False,
+        bibtool_output: typing.Optional[str] = None,
+        use_bibtool: bool = True,
+) -> typing.Generator[Source, None, None]:
+    """
+    :param ps: `list` of paths to bibtex files making up one bibliography.
+    :param bibtool_output: bibtool's output for the bibliography, if it has been computed already.
+    :param use_bibtool: Flag signaling whether to normalize the bibtex with bibtool or in-process \
+    (see `linglit.langsci.bibnorm`).
+    """
+    if not use_bibtool:
+        bibtex = preprocess(ps)
         for k, v in NAMES.items():  # Fix invalid author lists.
-            chunk = chunk.replace(k, v)
-        # Field values without enclosing braces:
-        chunk = re.sub(
-            r'^\s*([a-zA-Z]+)\s*=([^{]+),$',
-            lambda m: '%s = {%s},' % (m.groups()[0], m.groups()[1]),
-            chunk,
-            flags=re.MULTILINE)
-        if i:
-            try:
-                for k, e in database.parse_string('@' + chunk, 'bibtex').entries.items():
-                    yield to_source(k, e)
-            except:  # pragma: no cover # noqa: E722
-                raise ValueError('{}::@{}'.format(ps, chunk))  # pragma: no cover
+            bibtex = bibtex.replace(k, v)
+        for key, e in bibnorm.iter_entries(bibtex):
+            yield to_source(key, e)
+        return
+
+    if bibtool_output is None:
+        bibtool_output = run_bibtool(preprocess(ps), verbose=verbose)
+
+    for k, v in NAMES.items():  # Fix invalid author lists.
+        bibtool_output = bibtool_output.replace(k, v)
+    # Field values without enclosing braces:
+    bibtool_output = re.sub(
+        r'^\s*([a-zA-Z]+)\s*=([^{]+),$',
+        lambda m: '%s = {%s},' % (m.groups()[0], m.groups()[1]),
+        bibtool_output,
+        flags=re.MULTILINE)
+    # Now parse all records in one go, keeping duplicate keys and skipping invalid records:
+    for e in bibnorm.parse(bibtool_output):
+        yield to_source(e.key, e)
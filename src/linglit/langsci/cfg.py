@@ -1,3 +1,7 @@
+import typing
+import pathlib
+import functools
+
 from csvw.dsv import reader
 
 from linglit import util
@@ -70,5 +74,24 @@ LNAME_MAP = {
 }
 
 
-def iter_texfile_titles():
-    yield from reader(CFG_PATH / 'texfile_titles.tsv', delimiter='\t', dicts=True)
+def iter_texfile_titles(p=None):
+    yield from reader(
+        p or util.cfg_file('langsci', 'texfile_titles.tsv'), delimiter='\t', dicts=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _texfile2language(p: pathlib.Path) -> typing.Dict[int, typing.Dict[str, str]]:
+    res = {}
+    for row in iter_texfile_titles(p):
+        if row['Language']:
+            res.setdefault(int(row['Book_ID']), {})[row['Filename']] = row['Language']
+    return res
+
+
+def texfile2language() -> typing.Dict[int, typing.Dict[str, str]]:
+    """
+    Maps book ID to filename to the name of the object language of the chapter.
+
+    The table is parsed only once per process (and config file).
+    """
+    return _texfile2language(util.cfg_file('langsci', 'texfile_titles.tsv'))
@@ -0,0 +1,151 @@
+"""
+An in-memory index of the source files of a langsci book.
+
+Locating main file, includes, bibs and abbreviations requires many lookups in a book's directory.
+On network filesystems, where each stat call is slow, answering these from a manifest - built
+from a single scan of the directory, or from the `files.json` of the repository - is much faster.
+"""
+import os
+import typing
+import hashlib
+import pathlib
+import fnmatch
+import collections
+
+from linglit import storage
+
+__all__ = ['Manifest', 'is_source_file']
+
+# Paths matching any of these substrings are not considered part of a book's sources:
+EXCLUDE = [
+    'seriesinfo',
+    'langsci/locale',
+    'langsci-hyphenation',
+    '.texpadtmp',
+    'bibstyles.deprecated',
+    'figures/',
+    'graphics/',
+    'biblatex-sp-unified',
+    'draftinfo.tex',
+    'generated/',
+    'bibstyles/',
+    'Figures/',
+    'styles/tcb',
+    '__MACOSX',
+    'pdf/',
+]
+
+
+def is_source_file(path: typing.Union[str, pathlib.PurePath]) -> bool:
+    """
+    Whether a file is relevant for extracting data from a book's sources.
+    """
+    path = pathlib.PurePosixPath(path)
+    return (path.suffix in ['.bib', '.tex'] or path.name == 'Makefile') \
+        and not any(e in str(path) for e in EXCLUDE)
+
+
+class Manifest:
+    """
+    Index of the files in a book directory, answering the queries of `Publication` in memory.
+
+    :ivar verify: Flag signaling whether listed files must be checked for presence on disk - which \
+    is the case for manifests built from a file list, which may list files not fetched (yet).
+    """
+    def __init__(self,
+                 d: typing.Union[str, pathlib.Path],
+                 paths: typing.Iterable[str],
+                 verify: bool = False):
+        self.dir = pathlib.Path(d)
+        self.verify = verify
+        self.files = collections.defaultdict(list)  # Maps directory to list of filenames.
+        self.subdirs = collections.defaultdict(set)  # Maps directory to set of subdirectories.
+        for path in sorted(pathlib.PurePosixPath(p) for p in paths):
+            self.files[path.parent].append(path.name)
+            for parent in path.parents:
+                if parent != pathlib.PurePosixPath('.'):
+                    self.subdirs[parent.parent].add(parent.name)
+
+    @classmethod
+    def from_dir(cls, d: typing.Union[str, pathlib.Path]) -> 'Manifest':
+        """
+        Build the manifest from one walk over the directory - or the list of members of its archive.
+        """
+        return cls(d, storage.iter_files(d))
+
+    @classmethod
+    def from_filelist(cls, d: typing.Union[str, pathlib.Path], tree: dict) -> 'Manifest':
+        """
+        Build the manifest from the GitHub tree listing for a book as stored in `files.json`.
+        """
+        return cls(
+            d,
+            [f['path'] for f in tree['tree']
+             if f['type'] not in ['tree', 'commit'] and is_source_file(f['path'])],
+            verify=True)
+
+    @property
+    def digest(self) -> str:
+        """
+        A hash of the list of files, i.e. changing whenever files are added or removed.
+        """
+        return hashlib.md5('\n'.join(
+            '{}/{}'.format(d, name) for d, names in sorted(self.files.items()) for name in names
+        ).encode('utf8')).hexdigest()
+
+    def _rel(self, p: typing.Union[str, pathlib.Path]) -> pathlib.PurePosixPath:
+        p = pathlib.Path(p)
+        try:
+            p = p.relative_to(self.dir)
+        except ValueError:  # We assume a path relative to the book directory.
+            pass
+        return pathlib.PurePosixPath(os.path.normpath(p.as_posix()))
+
+    def exists(self, p: typing.Union[str, pathlib.Path]) -> bool:
+        rel = self._rel(p)
+        if rel.parts and rel.parts[0] == '..':  # Outside of the book directory.
+            return storage.exists(p)
+        if rel.name in self.files.get(rel.parent, []):
+            # Only positive answers are checked, so most lookups are still answered in memory:
+            return self._present(self.dir / rel)
+        return self.is_dir(p)
+
+    def _present(self, p: pathlib.Path) -> bool:
+        return (not self.verify) or storage.exists(p)
+
+    def is_dir(self, p: typing.Union[str, pathlib.Path]) -> bool:
+        rel = self._rel(p)
+        return rel == pathlib.PurePosixPath('.') or rel.name in self.subdirs.get(rel.parent, [])
+
+    def iterdirs(self, p=None) -> typing.List[pathlib.Path]:
+        """
+        The (sorted) subdirectories of directory `p`.
+        """
+        p = self.dir if p is None else p
+        return [pathlib.Path(p) / name for name in sorted(self.subdirs.get(self._rel(p), []))]
+
+    def glob(self, p: typing.Union[str, pathlib.Path], pattern: str) -> typing.List[pathlib.Path]:
+        """
+        The (sorted) files in directory `p` matching a non-recursive glob `pattern`.
+        """
+        return [
+            pathlib.Path(p) / name for name in self.files.get(self._rel(p), [])
+            if fnmatch.fnmatchcase(name, pattern) and self._present(pathlib.Path(p) / name)]
+
+    def iter_named(self, name: str) -> typing.Generator[pathlib.Path, None, None]:
+        """
+        All files called `name`, anywhere in the directory tree.
+        """
+        for d, names in sorted(self.files.items()):
+            if name in names and self._present(self.dir.joinpath(d, name)):
+                yield self.dir.joinpath(d, name)
+
+    def casefold(self, p: typing.Union[str, pathlib.Path]) -> pathlib.Path:
+        """
+        Resolve a path case-insensitively to an existing file in the same directory.
+        """
+        p, rel = pathlib.Path(p), self._rel(p)
+        for name in self.files.get(rel.parent, []):
+            if name.lower() == rel.name.lower():
+                return p.parent / name
+        return p
@@ -1,15 +1,19 @@
 import re
+import sys
 import functools
 import collections
 
-from clldutils.path import walk
+import attr
 
 from linglit import base
+from linglit import storage
+from linglit.util import LRUCache
 from .bibtex import iter_bib, normalize_key
-from .texsoup import iter_texsoup_lines
-from .latex import to_text, iter_abbreviations
+from .texscan import iter_commands, iter_cite_keys
+from .latex import iter_abbreviations
 from . import texfixes
 from .examples import iter_gll, make_example
+from .manifest import Manifest
 from . import cfg
 
 MAKEFILE_NAME = 'Makefile'
@@ -25,9 +29,16 @@ NO_INCLUDES = [163]
 FIX_FILENAMES = {
     'parts/bilinguismo': 'parts/biblinguismo',
 }
+# Preprocessed TeX shared across publications, keyed by path, input-resolution mode and file
+# signature. Cached values also carry the signatures of the merged input files, which are checked
+# on each hit:
+TEX_CACHE = LRUCache(maxsize=64 * 1024 * 1024, sizeof=lambda res: sys.getsizeof(res[0]))
 
 
 class Publication(base.Publication):
+    cached_attributes = base.Publication.cached_attributes + [
+        'bibkeys', 'gloss_abbreviations', 'manifest']
+
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
         if self.record.int_id in MAIN_TEX_EXCEPTIONS:  # pragma: no cover
@@ -39,14 +50,16 @@ class Publication(base.Publication):
 
         self._bibs = None
         self._includes = None
-        self._includes_tex = {}
-        self._refs = []
+        self._refs = None
+        # A future resolving to bibtool's output for the bibliography, see `BibtoolPool`:
+        self.bibtool_output = None
+
+    def release(self):
+        super().release()
+        self._bibs, self._includes, self._refs, self.bibtool_output = None, None, None, None
 
     def iter_examples(self):
-        texfile2language = {}
-        for row in cfg.iter_texfile_titles():
-            if row['Language']:
-                texfile2language[(int(row['Book_ID']), row['Filename'])] = row['Language']
+        texfile2language = cfg.texfile2language().get(self.record.int_id, {})
         seen = set()
         for p in self.includes:
             for linfo, gll, prevline in iter_gll(self.read_tex(p)):
@@ -61,9 +74,8 @@ class Publication(base.Publication):
                         if key in self.bibkeys:
                             refs.append((self.bibkeys[key], pages))
                     ex.Source = refs
-                    if ex.Language_Name is None and \
-                            (self.record.int_id, p.name) in texfile2language:
-                        ex.Language_Name = texfile2language[(self.record.int_id, p.name)]
+                    if ex.Language_Name is None and p.name in texfile2language:
+                        ex.Language_Name = texfile2language[p.name]
                     if ex.Language_Name is None and self.record.objectlanguage:
                         ex.Language_Name = self.record.objectlanguage
                     if str(p) in self.gloss_abbreviations:
@@ -76,26 +88,76 @@ class Publication(base.Publication):
 
     def iter_cited(self):
         relevant = self.includes + [self.main]
-        if self.main.parent.joinpath(BACKMATTER_NAME).exists():
+        if self.manifest.exists(self.main.parent.joinpath(BACKMATTER_NAME)):
             relevant.append(self.main.parent.joinpath(BACKMATTER_NAME))
         for p in relevant:
-            for line in self.read_tex(p, with_input=(p != self.main)).split(r'\\'):
-                _, _, refs = to_text(line)
-                for ref, _ in refs:
-                    key = normalize_key(ref)
-                    if key in self.bibkeys:
-                        yield self.bibkeys[key]
+            for ref in iter_cite_keys(self.read_tex(p, with_input=(p != self.main))):
+                key = normalize_key(ref)
+                if key in self.bibkeys:
+                    yield self.bibkeys[key]
+
+    @functools.cached_property
+    def references(self):
+        self._parse_references()
+        return base.Publication.references.func(self)
+
+    def _parse_references(self):
+        """
+        Parse the bibliography - running bibtool - once, for `references` and `bibkeys`.
+        """
+        if self._refs is None:
+            self._refs = list(self.iter_references())
+        return self._refs
+
+    def _iter_bib(self):
+        return iter_bib(
+            self.bibs,
+            bibtool_output=self.bibtool_output.result() if self.bibtool_output else None)
 
     def iter_references(self):
-        if not self._refs:
-            self._refs = list(iter_bib(self.bibs))
-        yield from iter(self._refs)
+        # When only streaming references, parsed references are not kept in memory:
+        yield from self._iter_bib() if self._refs is None else self._refs
+
+    def iter_fingerprint_data(self):
+        """
+        Extracted data also depends on the catalog record and the config tables.
+        """
+        yield from super().iter_fingerprint_data()
+        yield repr(attr.astuple(self.record)).encode('utf8')
+        yield repr(sorted(
+            cfg.texfile2language().get(self.record.int_id, {}).items())).encode('utf8')
+
+    def iter_input_paths(self):
+        tex = list(self.includes)
+        if self.manifest.exists(self.main.parent / BACKMATTER_NAME):
+            tex.append(self.main.parent / BACKMATTER_NAME)
+        tex.extend(self.manifest.iter_named(ABBREVIATIONS_NAME))
+        seen = set()
+        for p in [self.main] + tex + self.bibs:
+            if p not in seen:
+                seen.add(p)
+                yield p
+            if p in tex:  # Files merged in via `\input` when reading the TeX:
+                for ip, _ in self._read_tex(p)[1]:
+                    if ip not in seen:
+                        seen.add(ip)
+                        yield ip
 
     # --- langsci specifics
     def read_tex(self, p, with_input=True):
-        if str(p) not in self._includes_tex:
-            self._includes_tex[str(p)] = texfixes.read_tex(p, with_input=with_input)
-        return self._includes_tex[str(p)]
+        return self._read_tex(p, with_input)[0]
+
+    def _read_tex(self, p, with_input=True):
+        """
+        :return: Pair (TeX, list of (path, signature) pairs of the merged input files).
+        """
+        key = (str(p), with_input, storage.signature(p))
+        res = TEX_CACHE.get(key)
+        if res is None or any(storage.signature(ip) != sig for ip, sig in res[1]):
+            inputs = []
+            tex = texfixes.read_tex(p, with_input=with_input, inputs=inputs)
+            res = TEX_CACHE[key] = (tex, [(ip, storage.signature(ip)) for ip in inputs])
+        return res
 
     @functools.cached_property
     def gloss_abbreviations(self):
@@ -110,19 +172,19 @@ class Publication(base.Publication):
                 for k, v in iter_abbreviations(section_pattern.split(tex[m.end():])[0]):
                     res[str(p)][k] = v
 
-        for p in walk(self.dir):
-            if p.name == ABBREVIATIONS_NAME:
-                for k, v in iter_abbreviations(self.read_tex(p)):
-                    res[None][k] = v
+        for p in self.manifest.iter_named(ABBREVIATIONS_NAME):
+            for k, v in iter_abbreviations(self.read_tex(p)):
+                res[None][k] = v
 
-        return res
+        return {k: base.AbbreviationTable(v) for k, v in res.items()}
 
     def _get_includes_and_bibs(self):
         self._includes, self._bibs = includes_and_bib(
             self.dir,
             self.main,
-            CHAPTERS_NAME if self.main.parent.joinpath(CHAPTERS_NAME).exists() else 'indexed',
+            CHAPTERS_NAME if self.manifest.is_dir(self.main.parent / CHAPTERS_NAME) else 'indexed',
             no_bib=self.record.int_id in NO_BIB,
+            manifest=self.manifest,
         )
 
     @property
@@ -134,7 +196,7 @@ class Publication(base.Publication):
     @functools.cached_property
     def bibkeys(self):
         res = {}
-        for src in self.iter_references():
+        for src in self._parse_references():
             res[src.id] = src.id
             for altkey in src.alt_keys:
                 res[altkey] = src.id
@@ -146,43 +208,51 @@ class Publication(base.Publication):
             self._get_includes_and_bibs()
         return self._includes
 
+    @functools.cached_property
+    def manifest(self):
+        """
+        Index of the files in the book directory.
+        """
+        if self.repos:
+            return self.repos.manifest(self.dir)
+        return Manifest.from_dir(self.dir)
+
     def _find_makefile(self):
         p = self.dir / MAKEFILE_NAME
-        if p.exists():
+        if self.manifest.exists(p):
+            return p
+        for p in self.manifest.iter_named(MAKEFILE_NAME):
             return p
-        for p in walk(self.dir, mode='files'):
-            if p.name == MAKEFILE_NAME:
-                return p
 
     def _find_by_documentclass(self, d):
-        for p in d.glob('*.tex'):
-            for line in p.read_text(encoding='utf8').split('\n'):
+        for p in self.manifest.glob(d, '*.tex'):
+            for line in storage.read_text(p).split('\n'):
                 if all(w in line for w in [r'\documentclass', 'number']):
                     return p
 
     def _find_main_tex(self):
         make = self._find_makefile()
         if make:
-            for line in make.read_text(encoding='utf8').splitlines():
+            for line in storage.read_text(make).splitlines():
                 line = line.strip()
                 if line.startswith('xelatex'):
                     tex = '{}.tex'.format(line.split()[-1])
-                    if tex and make.parent.joinpath(tex).exists():
+                    if tex and self.manifest.exists(make.parent.joinpath(tex)):
                         return make.parent / tex
-            for line in make.read_text(encoding='utf8').splitlines():
+            for line in storage.read_text(make).splitlines():
                 pdf = re.search(r'\s+([A-Za-z_0-9]+)\.pdf(\s|$)', line.strip(), flags=re.MULTILINE)
                 if pdf:
                     tex = '{}.tex'.format(pdf.groups()[0])
-                    if tex and make.parent.joinpath(tex).exists():
+                    if tex and self.manifest.exists(make.parent.joinpath(tex)):
                         return make.parent / tex
         for name in MAIN_TEX_NAMES:
-            if self.dir.joinpath(name).exists():
+            if self.manifest.exists(self.dir.joinpath(name)):
                 return self.dir / name
-        subdirs = [sd for sd in self.dir.iterdir() if sd.is_dir()]
-        if len(subdirs) == 1 and not list(self.dir.glob('*.tex')):
+        subdirs = self.manifest.iterdirs()
+        if len(subdirs) == 1 and not self.manifest.glob(self.dir, '*.tex'):
             # All the main sources are nested in one directory.
             for name in MAIN_TEX_NAMES:
-                if subdirs[0].joinpath(name).exists():
+                if self.manifest.exists(subdirs[0].joinpath(name)):
                     return subdirs[0] / name
         p = self._find_by_documentclass(self.dir)
         if p:
@@ -193,7 +263,37 @@ class Publication(base.Publication):
                 return p
 
 
-def includes_and_bib(d, main, chapterpath, no_bib):
+# Resolved includes and bibs, keyed by main file path and file listing of the book directory, and
+# stored with the signatures of the TeX files which were scanned:
+_INCLUDES_AND_BIB = LRUCache(
+    maxsize=4 * 1024 * 1024,
+    sizeof=lambda res: sum(len(str(p)) for paths in res for p in paths))
+
+
+def includes_and_bib(d, main, chapterpath, no_bib, manifest=None):
+    """
+    Determine the chapter files and BibTeX files of a book.
+
+    :param manifest: `Manifest` of the book directory `d` - if not passed, it will be created by \
+    scanning `d`.
+
+    Results are cached, so repeated set up of the same publication does not require re-scanning
+    the sources - as long as no file was added or removed and the scanned TeX files did not change.
+    """
+    manifest = manifest or Manifest.from_dir(d)
+    key = (str(main), manifest.digest, chapterpath, no_bib)
+    cached = _INCLUDES_AND_BIB.get(key)
+    if cached and all(storage.signature(p) == sig for p, sig in cached[2]):
+        includes, bibs, _ = cached
+    else:
+        scanned = [main]
+        includes, bibs = _includes_and_bib(
+            d, main, storage.read_text(main), chapterpath, no_bib, manifest, scanned)
+        _INCLUDES_AND_BIB[key] = (includes, bibs, [(p, storage.signature(p)) for p in scanned])
+    return list(includes), list(bibs)
+
+
+def _includes_and_bib(d, main, tex, chapterpath, no_bib, manifest, scanned):
     def norm_include(s):
         s = s.replace('\\chpath', chapterpath) \
             .replace('\\chapterpath', chapterpath) \
@@ -203,45 +303,43 @@ def includes_and_bib(d, main, chapterpath, no_bib):
             s += '.tex'
         return s
 
-    tex = main.read_text(encoding='utf8')
     tex = tex.replace(r'\input{chapters/', r'\include{chapters/')
     tex = tex.replace(r'\input{phrasal-lfg-include', r'\include{phrasal-lfg-include')
-    tex_lines = list(iter_texsoup_lines(main, tex=tex))
-    for pincl in main.parent.glob('*-include.tex'):
-        tex_lines.extend(iter_texsoup_lines(pincl))
+    commands = list(iter_commands(main, tex=tex, inputs=scanned))
+    for pincl in manifest.glob(main.parent, '*-include.tex'):
+        scanned.append(pincl)
+        commands.extend(iter_commands(pincl, inputs=scanned))
 
     # Three variants of bib detection:
-    bibs = [p for p in d.glob('*.bib')]
+    bibs = manifest.glob(d, '*.bib')
     if no_bib:  # explicitly marked as not having a bib
         bibs = []  # pragma: no cover
     elif len(bibs) == 1:  # only one choice for bibs
         pass  # pragma: no cover
     else:  # more bib files available, pick by parsing the main tex file
         bibs, bibnames = [], []
-        for soup in tex_lines:
-            if soup.bibliography or soup.addbibresource:
-                bibnames.extend((soup.bibliography or soup.addbibresource).string.split(','))
+        for name, arg in commands:
+            if name in {'bibliography', 'addbibresource'}:
+                bibnames.extend(n.strip() for n in arg.split(','))
         assert bibnames, str(main)
         for name in bibnames:
             if not name.endswith('.bib'):
                 name += '.bib'
             bib = main.parent / name
-            assert bib.exists(), str(bib)
+            assert manifest.exists(bib), str(bib)
             bibs.append(bib)
     includes = []
 
-    for soup in tex_lines:
-        incl = soup.include or soup.includechapter or soup.includepaper
-        if incl:
-            p = main.parent / norm_include(incl.string)
+    for name, arg in commands:
+        if name in {'include', 'includechapter', 'includepaper'}:
+            p = main.parent / norm_include(arg)
             # Allow case-insensitive matching:
-            m = {pp.name.lower(): pp for pp in p.parent.glob('*.tex')}
-            p = m.get(p.name.lower(), p)
-            if not p.exists() and (p.stem in ['preface', 'acknowledgments']):
+            p = manifest.casefold(p)
+            if not manifest.exists(p) and (p.stem in ['preface', 'acknowledgments']):
                 continue
-            if not p.exists() and p.stem == 'abbreviations':  # pragma: no cover
-                if p.parent.parent.joinpath('abbreviations.tex').exists():
+            if not manifest.exists(p) and p.stem == 'abbreviations':  # pragma: no cover
+                if manifest.exists(p.parent.parent.joinpath('abbreviations.tex')):
                     p = p.parent.parent.joinpath('abbreviations.tex')
-            assert p.exists(), str(p)
+            assert manifest.exists(p), str(p)
             includes.append(p)
     return includes, bibs
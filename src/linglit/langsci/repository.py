@@ -6,16 +6,22 @@ REST API via [gh](https://cli.github.com/).
 """
 import json
 import base64
+import logging
 import pathlib
+import functools
 import subprocess
+import collections
 
 import attr
 from clldutils.jsonlib import update_ordered, load
 from clldutils.path import ensure_cmd
 
 from linglit import base
+from linglit import storage
 from .catalog import Catalog, GITHUB_ORG
 from .publication import Publication
+from .bibtex import BibtoolPool
+from .manifest import Manifest, is_source_file
 from . import cfg
 
 CATALOG_NAME = "catalog.tsv"
@@ -67,8 +73,8 @@ class File:
 
     def same_content(self, p, shallow=True):
         if shallow:
-            return p.stat().st_size == self.size
-        return self.content == p.read_bytes()
+            return storage.size(p) == self.size
+        return self.content == storage.read_bytes(p)
 
     def fullpath(self, d):
         p = pathlib.Path(d).joinpath(self.path)
@@ -97,25 +103,78 @@ def branch_and_tree(item, olddata):
 class Repository(base.Repository):
     id = 'langsci'
     lname_map = cfg.LNAME_MAP
+    compressions = storage.ARCHIVE_FORMATS
 
     def __getitem__(self, item):
         return Publication(self.catalog[item], self.dir / item, self)
 
-    def iter_publications(self):
-        for item in self.catalog:
-            if item.int_id in MISSING_REPOS:
-                continue  # pragma: no cover
-            if item.int_id not in MISSING_TEX_SOURCES:
-                yield Publication(item, self.dir / item.ID, self)
-
-    def create(self, verbose=False):  # pragma: no cover
+    def iter_publications(self, bibtool_workers: int = 0):
+        """
+        :param bibtool_workers: Number of bibliographies to normalize concurrently with bibtool, \
+        ahead of the publication currently being processed.
+        """
+        pubs = (
+            Publication(item, self.dir / item.ID, self) for item in self.catalog
+            if item.int_id not in MISSING_REPOS and item.int_id not in MISSING_TEX_SOURCES)
+        if not bibtool_workers:
+            yield from pubs
+            return
+
+        with BibtoolPool(max_workers=bibtool_workers) as pool:
+            queue = collections.deque()
+            for pub in pubs:
+                try:
+                    bibs = pub.bibs
+                except AssertionError as e:
+                    # Like without bibtool workers, we only fail when the publication is used:
+                    logging.getLogger(__name__).warning(
+                        'Cannot determine bibs of {}: {}'.format(pub.id, e))
+                    bibs = None
+                if bibs:
+                    pub.bibtool_output = pool.submit(bibs)
+                queue.append(pub)
+                if len(queue) > bibtool_workers:
+                    yield queue.popleft()
+            yield from queue
+
+    def create(self, verbose=False, compress=None):  # pragma: no cover
         """
         Create a repository from scratch (may need to be restarted a couple of times if
         GH rate limit problems are encountered):
+
+        :param compress: Archive format - see `linglit.storage.ARCHIVE_FORMATS` - to pack the \
+        sources of each book into.
         """
         self.fetch_catalog()
         self.fetch_filelist(refresh=True)
         self.fetch_files()
+        if compress:
+            self.pack(compress)
+
+    def pack(self, fmt='zip'):
+        """
+        Pack the sources of each book into an archive - merging updated files with an existing
+        archive.
+        """
+        for item in self.catalog:
+            d = self.dir / item.ID
+            archive = storage.open_archive(d)
+            if d.is_dir() or (archive and archive.path.name != '{}.{}'.format(item.ID, fmt)):
+                storage.pack(d, fmt)
+
+    @functools.cached_property
+    def filelist(self):
+        p = self.dir / FILELIST_NAME
+        return load(p) if p.exists() else {}
+
+    def manifest(self, d):
+        """
+        The `Manifest` of a book directory - read from the file list if possible.
+        """
+        d = pathlib.Path(d)
+        if d.name in self.filelist:
+            return Manifest.from_filelist(d, self.filelist[d.name][1])
+        return Manifest.from_dir(d)
 
     @property
     def catalog(self):
@@ -135,32 +194,12 @@ class Repository(base.Repository):
                     d[item.ID] = branch_and_tree(item, d.get(item.ID))
 
     def fetch_files(self, filelist=None):
-        exclude = [
-            'seriesinfo',
-            'langsci/locale',
-            'langsci-hyphenation',
-            '.texpadtmp',
-            'bibstyles.deprecated',
-            'figures/',
-            'graphics/',
-            'biblatex-sp-unified',
-            'draftinfo.tex',
-            'generated/',
-            'bibstyles/',
-            'Figures/',
-            'styles/tcb',
-            '__MACOSX',
-            'pdf/',
-        ]
         for itemid, (_, filelist) in load(filelist or self.dir / FILELIST_NAME).items():
             sd = self.dir / itemid
-            if not sd.exists():
-                sd.mkdir()
             for file in filelist['tree']:
                 if file['type'] not in ['tree', 'commit']:
                     file = File(**file)
-                    if (file.path.suffix in ['.bib', '.tex'] or file.path.name == 'Makefile') \
-                            and not any(e in str(file.path) for e in exclude):
-                        fp = file.fullpath(sd)
-                        if not fp.exists() or (not file.same_content(fp)):
+                    if is_source_file(file.path):
+                        fp = sd.joinpath(file.path)
+                        if not storage.exists(fp) or (not file.same_content(fp)):
                             file.save(sd)
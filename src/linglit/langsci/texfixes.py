@@ -2,6 +2,8 @@ import re
 
 from clldutils.text import replace_pattern
 
+from linglit import storage
+
 __all__ = ['read_tex']
 
 
@@ -37,18 +39,20 @@ def normalize_cite(t):
     return t
 
 
-def read_tex(p, with_input=True):
+def read_tex(p, with_input=True, inputs=None):
     """
     Read (and simplyfy) TeX from a file, resolving "input" commands.
 
     :param p:
     :param with_input:
+    :param inputs: Optional list, to which the paths of the merged input files are appended.
     :return:
     """
+    data = storage.read_bytes(p)
     try:
-        t = p.read_text(encoding='utf8')
+        t = data.decode('utf8')
     except UnicodeDecodeError:  # pragma: no cover
-        t = p.read_text(encoding='latin1')
+        t = data.decode('latin1')
 
     t = normalize_cite(t)
 
@@ -72,10 +76,12 @@ def read_tex(p, with_input=True):
         fname = m.groups()[1].strip()
         if not fname.endswith('.tex'):
             fname += '.tex'
-        if not p.parent.joinpath(fname).exists() and '/' in fname:
+        if not storage.exists(p.parent.joinpath(fname)) and '/' in fname:
             # look in the current directory:
             fname = fname.split('/')[-1]
-        if p.parent.joinpath(fname).exists():
+        if storage.exists(p.parent.joinpath(fname)):
+            if inputs is not None:
+                inputs.append(p.parent.joinpath(fname))
             yield '\n'
             yield read_tex(p.parent.joinpath(fname), with_input=False)
             yield '\n'
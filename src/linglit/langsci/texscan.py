@@ -0,0 +1,155 @@
+"""
+A lightweight scanner for the handful of LaTeX commands we need to locate in LSP sources.
+
+Unlike TexSoup or pylatexenc, we do not build a document tree - we only extract commands and their
+arguments in a single pass over the (comment-stripped) text.
+"""
+import re
+import typing
+import pathlib
+import functools
+
+from linglit import storage
+
+__all__ = ['iter_commands', 'iter_cite_keys', 'DIRECTIVES']
+
+DIRECTIVES = (
+    'include', 'includechapter', 'includepaper', 'input', 'bibliography', 'addbibresource')
+MAX_INPUT_SIZE = 300  # Only tiny input files - i.e. lists of includes - are followed.
+# A `%` starts a comment, unless it is escaped, i.e. preceded by an odd number of backslashes:
+COMMENT_PATTERN = re.compile(r'(?<!\\)((?:\\\\)*)%.*$', flags=re.MULTILINE)
+# Cite-family commands - see `latex.cite` - mapped to their argument spec (as in
+# `latex.lw_context_db`) and the index of the argument holding the keys:
+CITE_COMMANDS = {
+    name: ('[[{', -1) for name in [
+        'cite', 'possessivecite', 'pgcitet', 'posscite', 'posscitet', 'posscitealt', 'namecite',
+        'Textcite', 'textcite', 'textcites', 'autocite', 'autocites']}
+CITE_COMMANDS.update(
+    nocite=('{', 0),
+    parencite=('[{', -1),
+    textcquote=('[{', -1),
+    blockcquote=('{{', 0),
+    fatcit=('{{', 0),
+    fatcitNP=('{{', 0),
+    scite=('{{', 1),
+    langinfo=('{{{', 2),
+)
+CITE_PATTERN = re.compile(r'\\(?P<name>{})(?![a-zA-Z@])'.format(
+    '|'.join(sorted(CITE_COMMANDS, key=lambda n: -len(n)))))
+
+
+@functools.lru_cache(maxsize=None)
+def command_pattern(names: typing.Tuple[str, ...]) -> typing.Pattern:
+    """
+    Regex matching any of the commands in `names`, with an optional `[...]` argument.
+    """
+    return re.compile(
+        r'\\(?P<name>{})(?![a-zA-Z@])\s*(\[[^]]*])?\s*{{(?P<arg>[^}}]*)}}'.format(
+            '|'.join(sorted(names, key=lambda n: -len(n)))))
+
+
+def iter_commands(
+        p: typing.Optional[pathlib.Path],
+        tex: typing.Optional[str] = None,
+        names: typing.Tuple[str, ...] = DIRECTIVES,
+        level: int = 0,
+        inputs: typing.Optional[typing.List[pathlib.Path]] = None,
+) -> typing.Generator[typing.Tuple[str, str], None, None]:
+    """
+    Yield (command name, argument) pairs in document order, including one level of input.
+
+    `\\input` commands are not reported, but resolved - if the input file is small enough - by
+    scanning the input file in its place.
+
+    :param inputs: List to which the paths of the scanned input files are appended.
+    """
+    tex = storage.read_text(p) if tex is None else tex
+    pattern = command_pattern(tuple(sorted(set(names) | {'input'})))
+    for m in pattern.finditer(strip_comments(tex)):
+        name, arg = m.group('name'), m.group('arg').strip()
+        if name == 'input':
+            if level == 0 and p is not None:
+                pp = p.parent / '{}.tex'.format(arg)
+                if storage.exists(pp) and storage.size(pp) < MAX_INPUT_SIZE:
+                    if inputs is not None:
+                        inputs.append(pp)
+                    yield from iter_commands(pp, names=names, level=level + 1)
+            continue
+        yield name, arg
+
+
+def strip_comments(tex: str) -> str:
+    return COMMENT_PATTERN.sub(r'\1', tex)
+
+
+def scan_arg(tex: str, pos: int, opening: str) -> typing.Optional[typing.Tuple[str, int]]:
+    """
+    Scan an argument delimited by `opening` - i.e. `[` or `{` - after optional whitespace at `pos`.
+
+    Braces within the argument must be balanced, but may be nested arbitrarily deep; escaped
+    characters - e.g. `\\{` - are skipped.
+
+    :return: Pair (argument content, end position) or `None` if there is no such argument.
+    """
+    while pos < len(tex) and tex[pos].isspace():
+        pos += 1
+    if pos >= len(tex) or tex[pos] != opening:
+        return None
+    depth, i = 0, pos + 1
+    while i < len(tex):
+        c = tex[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            if depth == 0:
+                return (tex[pos + 1:i], i + 1) if opening == '{' else None
+            depth -= 1
+        elif opening == '[' and depth == 0:
+            if c == ']':
+                return tex[pos + 1:i], i + 1
+            if c == '[':  # Unbraced brackets are not allowed in optional arguments.
+                return None
+        i += 1
+    return None
+
+
+def parse_args(tex: str, pos: int, spec: str) -> typing.Optional[typing.List[str]]:
+    """
+    Parse the arguments of a command according to `spec`, starting at `pos`.
+
+    Missing optional arguments are returned as `None`, missing mandatory arguments make the command
+    unparsable, signaled by returning `None`.
+    """
+    args = []
+    for c in spec:
+        res = scan_arg(tex, pos, c)
+        if res:
+            args.append(res[0])
+            pos = res[1]
+        elif c == '{':
+            return None
+        else:
+            args.append(None)
+    return args
+
+
+def iter_cite_keys(tex: str) -> typing.Generator[str, None, None]:
+    """
+    Yield citation keys of cite-family commands in TeX normalized by `texfixes.normalize_cite`.
+
+    Keys are lowercased like the references extracted by `latex.to_text`.
+    """
+    tex = strip_comments(tex)
+    for m in CITE_PATTERN.finditer(tex):
+        spec, index = CITE_COMMANDS[m.group('name')]
+        args = parse_args(tex, m.end(), spec)
+        if args:
+            arg = args[index].replace('{', '').replace('}', '').strip().replace('   ', '&')
+            if arg != '[':
+                for key in arg.split(','):
+                    key = key.strip()
+                    if key:
+                        yield re.sub(r'^\s*&+\s*', '', key.replace('–', '--').lower())
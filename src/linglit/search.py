@@ -0,0 +1,95 @@
+"""
+Full-text and morpheme search over IGT examples, backed by a SQLite FTS5 index.
+
+The index is maintained by `linglit.db.Database`: Each example is indexed with its primary text,
+the morphemes of the analyzed words, the gloss elements, the grammatical categories among these,
+and the translation.
+"""
+import re
+import typing
+
+from pyigt.lgrmorphemes import MORPHEME_SEPARATORS, split_morphemes
+
+from linglit.base import Example
+
+__all__ = ['index_terms', 'fts_query', 'search']
+
+FTS_COLUMNS = ['primary_text', 'morphemes', 'glosses', 'categories', 'translation']
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS example_fts USING fts5(
+    example_id UNINDEXED, {}, tokenize="unicode61 remove_diacritics 0"
+);""".format(', '.join(FTS_COLUMNS))
+CATEGORY_PATTERN = re.compile(r'^([A-Z][A-Z0-9]*|[1-3](DL|PL|SG|DU)|[1-3])$')
+
+
+def _morphemes(words: typing.List[str]) -> typing.List[str]:
+    return [
+        m for w in words for m in split_morphemes(w) if m and m not in MORPHEME_SEPARATORS]
+
+
+def index_terms(ex: Example) -> typing.Tuple[str, ...]:
+    """
+    The values of the FTS columns for an example.
+    """
+    glosses = [e for m in _morphemes(ex.Gloss) for e in m.split('.') if e]
+    return (
+        ex.Primary_Text or '',
+        ' '.join(_morphemes(ex.Analyzed_Word)),
+        ' '.join(glosses),
+        ' '.join(e for e in glosses if CATEGORY_PATTERN.match(e)),
+        ex.Translated_Text or '',
+    )
+
+
+def _phrase(s: str) -> str:
+    return '"{}"'.format(s.replace('"', '""'))
+
+
+def fts_query(
+        text: typing.Optional[str] = None,
+        morpheme: typing.Optional[str] = None,
+        gloss: typing.Optional[str] = None,
+        translation: typing.Optional[str] = None,
+        query: typing.Optional[str] = None) -> str:
+    """
+    Combine search criteria into one FTS5 query.
+
+    :param gloss: Gloss element - if it looks like a grammatical category, only categories are \
+    searched.
+    :param query: A raw FTS5 query, e.g. `categories:ERG OR categories:ABS`.
+    """
+    clauses = []
+    if text:
+        clauses.append('primary_text:{}'.format(_phrase(text)))
+    if morpheme:
+        clauses.append('morphemes:{}'.format(_phrase(morpheme)))
+    if gloss:
+        clauses.append('{}:{}'.format(
+            'categories' if CATEGORY_PATTERN.match(gloss) else 'glosses', _phrase(gloss)))
+    if translation:
+        clauses.append('translation:{}'.format(_phrase(translation)))
+    if query:
+        clauses.append('({})'.format(query))
+    return ' AND '.join(clauses)
+
+
+def search(
+        db,
+        language: typing.Optional[str] = None,
+        limit: typing.Optional[int] = None,
+        **kw) -> typing.Generator[Example, None, None]:
+    """
+    Search examples in a `linglit.db.Database`.
+
+    :param language: Glottocode or name of the example language.
+    :param kw: Search criteria, passed into `fts_query`.
+    """
+    where, params = [], []
+    match = fts_query(**kw)
+    if match:
+        where.append('example.id IN (SELECT example_id FROM example_fts WHERE example_fts MATCH ?)')
+        params.append(match)
+    if language:
+        where.append('(example.language_id = ? OR example.language_name = ?)')
+        params.extend([language, language])
+    yield from db.iter_examples(' AND '.join(where), params, limit=limit)
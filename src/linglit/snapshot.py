@@ -0,0 +1,307 @@
+"""
+Binary snapshots of extracted data, which can be memory-mapped for instant reload.
+
+A snapshot stores publications, examples and references as fixed-width records of string IDs,
+pointing into one de-duplicated string table. Opening a snapshot does not parse anything - records
+are read from the memory-mapped file on access, so worker processes opening the same snapshot share
+its pages.
+
+File layout (all integers in native byte order, sections aligned to 8 bytes):
+
+- header: magic, format version, byte order flag, number of sections,
+- section table: (name, offset, length) per section,
+- sections: `strings` (UTF-8 blob), `offsets` (uint64 string offsets), `lists` (uint32 string IDs
+  of list-valued fields), `pubs`, `examples`, `sources`, `abbrs` (uint32 records).
+
+Abbreviation tables are shared by many examples, so each table is stored once in `abbrs`, and
+referenced from examples by ID.
+
+String ID 0xFFFFFFFF encodes `None` - in records as well as in lists.
+"""
+import sys
+import mmap
+import json
+import array
+import struct
+import typing
+import pathlib
+import functools
+
+from linglit.base import Example, Publication, AbbreviationTable, iter_released
+
+__all__ = ['write_snapshot', 'load_snapshot', 'Snapshot', 'ExampleView']
+
+MAGIC = b'LLSNAP\x00\x01'
+VERSION = 3
+HEADER = struct.Struct('=8sII4xI')  # magic, version, little-endian flag, number of sections
+SECTION = struct.Struct('=8sQQ')  # name, offset, length
+NULL = 0xFFFFFFFF
+PUB_FIELDS = ['id', 'provider', 'title', 'creators', 'year', 'doi', 'bibtex']
+# Scalar example fields, followed by (start, length) into `lists` for the list-valued fields:
+EXAMPLE_FIELDS = [
+    'ID', 'Publication_ID', 'Local_ID', 'Primary_Text', 'Translated_Text', 'Language_ID',
+    'Language_Name', 'Meta_Language_ID', 'Comment', 'Corpus_Ref', 'Source_Path',
+    'Abbreviations_ID']
+LIST_FIELDS = ['Analyzed_Word', 'Gloss', 'Source']
+SOURCE_FIELDS = ['id', 'publication_id', 'bibtex', 'cited']
+ABBREVIATION_FIELDS = ['id', 'abbreviations']
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids, self.blob, self.offsets = {}, bytearray(), array.array('Q', [0])
+
+    def __call__(self, s: typing.Optional[str]) -> int:
+        if s is None:
+            return NULL
+        if s not in self.ids:
+            self.ids[s] = len(self.ids)
+            self.blob.extend(s.encode('utf8'))
+            self.offsets.append(len(self.blob))
+        return self.ids[s]
+
+
+def write_snapshot(pubs: typing.Iterable[Publication], path: typing.Union[str, pathlib.Path]):
+    """
+    Write publications with their examples and references to a snapshot file.
+    """
+    strings = _StringTable()
+    lists = array.array('I')
+    records = {name: array.array('I') for name in ['pubs', 'examples', 'sources', 'abbrs']}
+    abbreviations = set()
+
+    def add_list(items):
+        records['examples'].extend([len(lists), len(items)])
+        lists.extend(strings(item) for item in items)
+
+    for pub in iter_released(pubs):
+        creators = pub.record.creators
+        records['pubs'].extend(strings(s) for s in [
+            pub.id,
+            pub.repos.id if pub.repos else None,
+            pub.record.title,
+            creators if isinstance(creators, str) else ' and '.join(creators),
+            pub.record.year,
+            pub.record.DOI,
+            pub.as_source().bibtex()])
+        for ex in pub.stream_examples():
+            records['examples'].extend(strings(s) for s in [
+                ex.ID,
+                pub.id,
+                ex.Local_ID,
+                ex.Primary_Text,
+                ex.Translated_Text,
+                ex.Language_ID,
+                ex.Language_Name,
+                ex.Meta_Language_ID,
+                ex.Comment,
+                ex.Corpus_Ref,
+                str(ex.Source_Path) if ex.Source_Path else None,
+                ex.Abbreviations_ID])
+            if ex.Abbreviations and ex.Abbreviations_ID not in abbreviations:
+                abbreviations.add(ex.Abbreviations_ID)
+                records['abbrs'].extend(strings(s) for s in [
+                    ex.Abbreviations_ID, json.dumps(list(ex.Abbreviations.items()))])
+            add_list(ex.Analyzed_Word)
+            add_list(ex.Gloss)
+            add_list([s for sid, pages in ex.Source for s in [sid, pages]])
+        for src in pub.stream_references():
+            cited = pub.cited.get(src.id)
+            records['sources'].extend(strings(s) for s in [
+                src.id, pub.id, src.bibtex(), str(cited) if cited else None])
+
+    sections = [
+        (b'strings', bytes(strings.blob)),
+        (b'offsets', strings.offsets.tobytes()),
+        (b'lists', lists.tobytes()),
+        (b'pubs', records['pubs'].tobytes()),
+        (b'examples', records['examples'].tobytes()),
+        (b'sources', records['sources'].tobytes()),
+        (b'abbrs', records['abbrs'].tobytes()),
+    ]
+    offset = HEADER.size + len(sections) * SECTION.size
+    table, data = [], []
+    for name, content in sections:
+        offset += -offset % 8
+        table.append(SECTION.pack(name, offset, len(content)))
+        data.append(content)
+        offset += len(content)
+    with pathlib.Path(path).open('wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == 'little', len(sections)))
+        for entry in table:
+            f.write(entry)
+        for content in data:
+            f.write(b'\x00' * (-f.tell() % 8))
+            f.write(content)
+
+
+class _View:
+    fields = []
+
+    def __init__(self, snapshot: 'Snapshot', record: typing.Tuple[int, ...]):
+        self._snapshot = snapshot
+        self._record = record
+
+    def __getattr__(self, name):
+        if name.startswith('_'):  # E.g. looked up on an unpickled - i.e. uninitialized - instance.
+            raise AttributeError(name)
+        try:
+            return self._snapshot.string(self._record[self.fields.index(name)])
+        except ValueError:
+            raise AttributeError(name)
+
+
+class PublicationView(_View):
+    fields = PUB_FIELDS
+
+
+class SourceView(_View):
+    fields = SOURCE_FIELDS
+
+    @property
+    def cited(self) -> int:
+        """
+        The number of citations of the reference in the publication.
+        """
+        cited = self._snapshot.string(self._record[SOURCE_FIELDS.index('cited')])
+        return int(cited) if cited else 0
+
+
+class ExampleView(_View):
+    """
+    Read-only, `Example`-like access to an example in a snapshot.
+    """
+    fields = EXAMPLE_FIELDS
+
+    def _list(self, name):
+        i = len(EXAMPLE_FIELDS) + 2 * LIST_FIELDS.index(name)
+        start, length = self._record[i], self._record[i + 1]
+        return [self._snapshot.string(sid) for sid in self._snapshot.lists[start:start + length]]
+
+    @property
+    def Analyzed_Word(self) -> typing.List[str]:
+        return self._list('Analyzed_Word')
+
+    @property
+    def Gloss(self) -> typing.List[str]:
+        return self._list('Gloss')
+
+    @property
+    def Source(self) -> typing.List[typing.Tuple[str, typing.Optional[str]]]:
+        items = self._list('Source')
+        return list(zip(items[::2], items[1::2]))
+
+    @property
+    def Abbreviations(self) -> AbbreviationTable:
+        return self._snapshot.abbreviations.get(self.Abbreviations_ID) or AbbreviationTable()
+
+    def as_example(self) -> Example:
+        ex = Example(
+            ID=self.ID,
+            Primary_Text=self.Primary_Text,
+            Analyzed_Word=self.Analyzed_Word,
+            Gloss=self.Gloss,
+            Translated_Text='',
+            Language_Name=self.Language_Name,
+            Comment=None,
+            Source=self.Source,
+            Language_ID=self.Language_ID,
+            Source_Path=self.Source_Path,
+            Abbreviations=self.Abbreviations,
+            Local_ID=self.Local_ID,
+            Meta_Language_ID=self.Meta_Language_ID,
+        )
+        # Assigned after initialization, to bypass the (already applied) normalization:
+        ex.Translated_Text, ex.Comment, ex.Corpus_Ref = \
+            self.Translated_Text, self.Comment, self.Corpus_Ref
+        return ex
+
+    def as_igt(self):
+        return self.as_example().as_igt()
+
+    def __str__(self):
+        return str(self.as_example())
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file.
+    """
+    def __init__(self, path: typing.Union[str, pathlib.Path]):
+        self.path = pathlib.Path(path)
+        self._file = self.path.open('rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # E.g. an empty file.
+            self._file.close()
+            raise ValueError('{} is not a linglit snapshot'.format(self.path))
+        try:
+            magic, version, little_endian, n = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError('{} is not a linglit snapshot (version {})'.format(
+                    self.path, VERSION))
+            if bool(little_endian) != (sys.byteorder == 'little'):  # pragma: no cover
+                raise ValueError(
+                    'Snapshot {} was written with a different byte order'.format(path))
+        except (ValueError, struct.error) as e:
+            self._mmap.close()
+            self._file.close()
+            raise ValueError(str(e))
+        self._view, self.sections = memoryview(self._mmap), {}
+        for i in range(n):
+            name, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b'\x00').decode()] = self._view[offset:offset + length]
+        self.strings = self.sections['strings']
+        self.offsets = self.sections['offsets'].cast('Q')
+        self.lists = self.sections['lists'].cast('I')
+        self.records = {
+            name: self.sections[name].cast('I')
+            for name in ['pubs', 'examples', 'sources', 'abbrs']}
+
+    def close(self):
+        for view in [self.offsets, self.lists] + list(self.records.values()) \
+                + list(self.sections.values()) + [self._view]:
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def string(self, i: int) -> typing.Optional[str]:
+        if i == NULL:
+            return None
+        return str(self.strings[self.offsets[i]:self.offsets[i + 1]], 'utf8')
+
+    def _iter(self, section, cls, width):
+        records = self.records[section]
+        for i in range(0, len(records), width):
+            # Records are copied, so that views do not keep buffers exported, blocking `close`:
+            yield cls(self, tuple(records[i:i + width]))
+
+    @functools.cached_property
+    def abbreviations(self) -> typing.Dict[str, AbbreviationTable]:
+        """
+        Maps IDs to the abbreviation tables referenced by examples - parsed once, on first access.
+        """
+        records = self.records['abbrs']
+        return {
+            self.string(records[i]): AbbreviationTable(json.loads(self.string(records[i + 1])))
+            for i in range(0, len(records), len(ABBREVIATION_FIELDS))}
+
+    def iter_publications(self) -> typing.Generator[PublicationView, None, None]:
+        yield from self._iter('pubs', PublicationView, len(PUB_FIELDS))
+
+    def iter_examples(self) -> typing.Generator[ExampleView, None, None]:
+        yield from self._iter(
+            'examples', ExampleView, len(EXAMPLE_FIELDS) + 2 * len(LIST_FIELDS))
+
+    def iter_sources(self) -> typing.Generator[SourceView, None, None]:
+        yield from self._iter('sources', SourceView, len(SOURCE_FIELDS))
+
+
+def load_snapshot(path: typing.Union[str, pathlib.Path]) -> Snapshot:
+    return Snapshot(path)
@@ -0,0 +1,279 @@
+"""
+Transparent access to the files of provider repositories kept in compressed storage.
+
+Files may be stored
+- compressed individually, i.e. as `<name>.gz` or `<name>.zst`,
+- packed with the other files of a directory into an archive, i.e. `<dir>.zip`, `<dir>.tar` or
+  `<dir>.tar.gz`.
+
+The functions in this module accept the path a file has in uncompressed storage and read the
+data from the compressed variant if there is no plain file, without unpacking anything to disk.
+
+Reading and writing `.zst` files requires `zstandard`, installable via
+`pip install linglit[zstd]`.
+"""
+import os
+import io
+import gzip
+import shutil
+import typing
+import pathlib
+import tarfile
+import zipfile
+import tempfile
+import threading
+import functools
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+__all__ = [
+    'COMPRESSIONS', 'ARCHIVE_FORMATS',
+    'exists', 'size', 'signature', 'read_bytes', 'read_text', 'iter_files', 'write_bytes', 'pack']
+
+COMPRESSIONS = ['gz', 'zst']
+ARCHIVE_FORMATS = ['zip', 'tar', 'tar.gz']
+PathType = typing.Union[str, pathlib.Path]
+
+
+def _zstd():
+    if zstandard is None:  # pragma: no cover
+        raise ValueError('Reading .zst files requires zstandard: pip install linglit[zstd]')
+    return zstandard
+
+
+def _check_format(fmt: str, formats: typing.List[str]):
+    if fmt not in formats:
+        raise ValueError('Unknown format {}, expected one of {}'.format(fmt, formats))
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    _check_format(compression, COMPRESSIONS)
+    if compression == 'gz':
+        return gzip.compress(data)
+    return _zstd().ZstdCompressor().compress(data)
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    _check_format(compression, COMPRESSIONS)
+    if compression == 'gz':
+        return gzip.decompress(data)
+    return _zstd().ZstdDecompressor().decompressobj().decompress(data)
+
+
+class Archive:
+    """
+    Read access to the members of a zip or tar archive, keyed by POSIX path.
+
+    Only an index of the members is kept in memory, member data is read on demand. Note that
+    reading members of a `.tar.gz` archive out of order requires decompressing from the start.
+    """
+    def __init__(self, p: pathlib.Path):
+        self.path = p
+        self._lock = threading.Lock()
+        if p.suffix == '.zip':
+            self._zip, self._tar = zipfile.ZipFile(str(p)), None
+            self.members = {
+                i.filename: i.file_size for i in self._zip.infolist() if not i.is_dir()}
+        else:
+            self._zip, self._tar = None, tarfile.open(str(p))
+            # Member infos know the offset of the data within the (decompressed) tar stream:
+            self._index = {info.name: info for info in self._tar.getmembers() if info.isfile()}
+            self.members = {name: info.size for name, info in self._index.items()}
+
+    def read(self, member: str) -> bytes:
+        with self._lock:
+            if self._tar is not None:
+                return self._tar.extractfile(self._index[member]).read()
+            return self._zip.read(member)
+
+
+@functools.lru_cache(maxsize=16)
+def _open_archive(p: str, mtime_ns: int, size: int) -> Archive:
+    return Archive(pathlib.Path(p))
+
+
+@functools.lru_cache(maxsize=1024)
+def _archive_path(d: str, mtime_ns: int) -> typing.Optional[pathlib.Path]:
+    """
+    The path of the archive of directory `d`.
+
+    Lookups are cached for the modification time of the parent directory of `d`, which changes
+    whenever an archive is created, renamed or removed there. Thus, we only need one stat call
+    instead of one per archive format.
+    """
+    d = pathlib.Path(d)
+    for fmt in ARCHIVE_FORMATS:
+        p = d.parent / '{}.{}'.format(d.name, fmt)
+        if p.is_file():
+            return p
+    return None
+
+
+def open_archive(d: pathlib.Path) -> typing.Optional[Archive]:
+    try:
+        p = _archive_path(str(d), d.parent.stat().st_mtime_ns)
+        if p:
+            stat = p.stat()
+            return _open_archive(str(p), stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def _archive(p: pathlib.Path) -> typing.Optional[typing.Tuple[Archive, str]]:
+    """
+    Find the archive containing path `p` - and the name of the member.
+    """
+    for parent in p.parents:
+        archive = open_archive(parent)
+        if archive:
+            return archive, p.relative_to(parent).as_posix()
+    return None
+
+
+def _locate(p: PathType):
+    """
+    :return: (kind, location) pair, where kind is one of "file", "compressed", "archive".
+    """
+    p = pathlib.Path(p)
+    if p.is_file():
+        return 'file', p
+    for c in COMPRESSIONS:
+        cp = p.parent / '{}.{}'.format(p.name, c)
+        if cp.is_file():
+            return 'compressed', (cp, c)
+    archive = _archive(p)
+    if archive and archive[1] in archive[0].members:
+        return 'archive', archive
+    return None, None
+
+
+def exists(p: PathType) -> bool:
+    """
+    Whether a file exists - plain, compressed or in an archive - or a plain directory.
+    """
+    return pathlib.Path(p).is_dir() or _locate(p)[0] is not None
+
+
+def size(p: PathType) -> int:
+    """
+    The size of the uncompressed content of a file.
+    """
+    kind, loc = _locate(p)
+    if kind == 'file':
+        return loc.stat().st_size
+    if kind == 'archive':
+        return loc[0].members[loc[1]]
+    return len(read_bytes(p))
+
+
+def signature(p: PathType) -> typing.Optional[tuple]:
+    """
+    A cheap signature of a file, changing whenever the file is modified - computed from the file
+    system metadata of its storage location, i.e. without reading the data.
+    """
+    kind, loc = _locate(p)
+    if kind == 'file':
+        path, member = loc, None
+    elif kind == 'compressed':
+        path, member = loc[0], None
+    elif kind == 'archive':
+        path, member = loc[0].path, loc[1]
+    else:
+        return None
+    stat = path.stat()
+    return str(path), member, stat.st_mtime_ns, stat.st_size
+
+
+def read_bytes(p: PathType) -> bytes:
+    kind, loc = _locate(p)
+    if kind == 'file':
+        return loc.read_bytes()
+    if kind == 'compressed':
+        return decompress(loc[0].read_bytes(), loc[1])
+    if kind == 'archive':
+        return loc[0].read(loc[1])
+    raise FileNotFoundError(str(p))
+
+
+def read_text(p: PathType, encoding: str = 'utf8') -> str:
+    return read_bytes(p).decode(encoding)
+
+
+def iter_files(d: PathType) -> typing.Generator[str, None, None]:
+    """
+    The POSIX paths - relative to `d` - of all files in directory `d` and in its archive.
+    """
+    d, seen = pathlib.Path(d), set()
+    if d.is_dir():
+        for dirpath, _, filenames in os.walk(str(d)):
+            rel = pathlib.Path(dirpath).relative_to(d)
+            for fname in filenames:
+                seen.add(rel.joinpath(fname).as_posix())
+                yield rel.joinpath(fname).as_posix()
+    archive = open_archive(d)
+    if archive:
+        for name in archive.members:
+            if name not in seen:  # Not updated in the directory.
+                yield name
+
+
+def write_bytes(p: PathType, data: bytes, compression: typing.Optional[str] = None) -> pathlib.Path:
+    """
+    Write a file - atomically, and possibly compressed.
+
+    :return: The path of the file that was written.
+    """
+    p = pathlib.Path(p)
+    if compression:
+        p, data = p.parent / '{}.{}'.format(p.name, compression), compress(data, compression)
+    tmp = p.parent / '{}.tmp'.format(p.name)
+    tmp.write_bytes(data)
+    tmp.replace(p)
+    return p
+
+
+def pack(d: PathType, fmt: str = 'zip') -> pathlib.Path:
+    """
+    Pack the files of directory `d` into an archive `<d>.<fmt>` and remove the directory.
+
+    Files from an existing archive of `d` are carried over, unless they are replaced by files in
+    the directory.
+    """
+    _check_format(fmt, ARCHIVE_FORMATS)
+    d = pathlib.Path(d)
+    target = d.parent / '{}.{}'.format(d.name, fmt)
+    archive = open_archive(d)
+    files = set()
+    if d.is_dir():
+        files = {p.relative_to(d).as_posix() for p in d.glob('**/*') if p.is_file()}
+    old = {name: archive.read(name) for name in archive.members if name not in files} \
+        if archive else {}
+    files = sorted(files)
+    fd, tmp = tempfile.mkstemp(dir=str(d.parent), suffix='.tmp')
+    os.close(fd)
+    if fmt == 'zip':
+        with zipfile.ZipFile(tmp, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, data in sorted(old.items()):
+                zf.writestr(name, data)
+            for name in files:
+                zf.write(str(d / name), name)
+    else:
+        with tarfile.open(tmp, 'w:gz' if fmt == 'tar.gz' else 'w') as tar:
+            for name, data in sorted(old.items()):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+            for name in files:
+                tar.add(str(d / name), name)
+    if archive and archive.path != target:  # The archive is converted to another format.
+        archive.path.unlink()
+    os.replace(tmp, str(target))
+    _archive_path.cache_clear()
+    _open_archive.cache_clear()
+    if d.is_dir():
+        shutil.rmtree(d)
+    return target
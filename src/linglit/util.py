@@ -1,13 +1,115 @@
+import os
 import re
+import sys
+import typing
 import pathlib
+import threading
+import collections
+
+from clldutils import jsonlib
 
 PKG_PATH = pathlib.Path(__file__).parent
 CFG_PATH = PKG_PATH / 'cfg'
+# Environment variable pointing to a directory with user-supplied config tables (laid out as the
+# `cfg` directory of the package) overriding the ones distributed with the package:
+CFG_ENV_VAR = 'LINGLIT_CFG'
 STARTINGQUOTE = "`‘“"
 ENDINGQUOTE = "'’”"
 ELLIPSIS = '…'
 
 
+def cfg_file(provider: str, name: str) -> pathlib.Path:
+    """
+    Path of a config table for a provider, giving precedence to a user-supplied version.
+    """
+    if os.environ.get(CFG_ENV_VAR):
+        p = pathlib.Path(os.environ[CFG_ENV_VAR]) / provider / name
+        if p.exists():
+            return p
+    return CFG_PATH / provider / name
+
+
+def load_cache(p: pathlib.Path) -> dict:
+    """
+    Read a JSON cache file - treating a missing or corrupt file as empty cache.
+    """
+    try:
+        res = jsonlib.load(p)
+    except (OSError, ValueError):
+        return {}
+    return res if isinstance(res, dict) else {}
+
+
+def dump_cache(obj: dict, p: pathlib.Path, **kw) -> bool:
+    """
+    Write a JSON cache file - atomically, and only if possible, i.e. caches for read-only data
+    directories are simply not persisted.
+
+    :return: Flag signaling whether the cache was written.
+    """
+    tmp = p.parent / '{}.tmp'.format(p.name)
+    try:
+        jsonlib.dump(obj, tmp, **kw)
+        os.replace(tmp, p)
+        return True
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+class LRUCache:
+    """
+    A least-recently-used cache, bounded by the total size of the cached values (in bytes, as
+    determined by `sizeof`).
+
+    Hits, misses and evictions are counted in `stats`.
+    """
+    def __init__(self, maxsize: int, sizeof: typing.Callable = sys.getsizeof):
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.size = 0
+        self.stats = collections.Counter(hits=0, misses=0, evictions=0)
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._items:
+                self.stats['hits'] += 1
+                self._items.move_to_end(key)
+                return self._items[key][0]
+            self.stats['misses'] += 1
+            return default
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.size -= self._items.pop(key)[1]
+            if size > self.maxsize:  # Too big to be cached at all.
+                return
+            self._items[key] = (value, size)
+            self.size += size
+            while self.size > self.maxsize:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.size -= evicted_size
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
 def clean_translation(trs):
     trs = re.sub(r'\s+', ' ', trs.strip())
     try:
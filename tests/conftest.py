@@ -1,4 +1,7 @@
+import shutil
 import pathlib
+import threading
+import http.server
 
 import pytest
 from pyglottolog.languoids import Languoid
@@ -53,8 +56,10 @@ def glossa_pub(glossa_repos):
 
 
 @pytest.fixture
-def cldf_repos(test_dir):
-    return test_dir / 'cldf'
+def cldf_repos(test_dir, tmp_path):
+    # CLDF publications write caches next to the datasets, so we work on a copy.
+    shutil.copytree(test_dir / 'cldf', tmp_path / 'cldf')
+    return tmp_path / 'cldf'
 
 
 @pytest.fixture
@@ -69,3 +74,56 @@ def cldf_pub2(cldf_repos):
     from linglit.cldf import Repository
 
     return Repository(cldf_repos)['petersonsouthasia']
+
+
+@pytest.fixture
+def glossa_server(glossa_repos):
+    """
+    A local stand-in for the Glossa website, serving the article catalog, article pages and XML.
+
+    The catalog page supports conditional requests, and article pages fail once with 503.
+    """
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep connections alive.
+        requests = []
+        ports = set()
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, body=b'', **headers):
+            self.send_response(status)
+            headers.setdefault('Content-Length', str(len(body)))
+            for k, v in headers.items():
+                self.send_header(k.replace('_', '-'), v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.requests.append((self.path, dict(self.headers)))
+            self.ports.add(self.client_address[1])
+            if self.path == '/articles/':
+                if self.headers.get('If-None-Match') == '"v1"':
+                    return self.send(304)
+                return self.send(
+                    200, glossa_repos.joinpath('articles.html').read_bytes(), ETag='"v1"')
+            if self.path.startswith('/article/id/'):
+                aid = self.path.split('/')[3]
+                if [p for p, _ in self.requests].count(self.path) == 1:
+                    return self.send(503, Retry_After='0')
+                return self.send(200, '<a href="/article/{}/galley/1/download/">Download XML</a>'
+                                 .format(aid).encode('utf8'))
+            if self.path.endswith('/download/'):
+                return self.send(302, Location='/xml/{}.xml'.format(self.path.split('/')[2]))
+            if self.path.startswith('/xml/'):
+                return self.send(200, glossa_repos.joinpath(self.path.split('/')[2]).read_bytes())
+            self.send(404)
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    server.requests, server.ports = Handler.requests, Handler.ports
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -1,4 +1,8 @@
-from linglit.base import Glottolog, Example
+import pickle
+
+import attr
+
+from linglit.base import Glottolog, Example, AbbreviationTable, iter_released
 
 
 def test_Glottolog(glottolog_api):
@@ -17,6 +21,22 @@ def test_Publication(glossa_pub):
     assert 'Skilton' in str(glossa_pub)
 
 
+def test_Publication_release(glossa_pub):
+    examples = [ex.ID for ex in glossa_pub.stream_examples()]
+    references = [src.id for src in glossa_pub.stream_references()]
+    assert 'examples' not in glossa_pub.__dict__ and 'references' not in glossa_pub.__dict__
+    with glossa_pub:
+        assert [ex.ID for ex in glossa_pub.examples] == examples
+        assert list(glossa_pub.references) == references
+        assert [src.id for src in glossa_pub.stream_references()] == references
+        assert len(glossa_pub.cited_references) == len(list(glossa_pub.stream_cited_references()))
+    for name in ['examples', 'references', 'cited', 'doc']:
+        assert name not in glossa_pub.__dict__
+    assert glossa_pub.as_source().id
+    assert glossa_pub.examples[0] is next(glossa_pub.stream_examples())
+    assert [pub for pub in iter_released([glossa_pub])] == [glossa_pub]
+
+
 def test_Example():
     ex = Example(
         ID=1,
@@ -28,3 +48,29 @@ def test_Example():
         Comment='comment',
         Source=[])
     assert ex.Comment == 'comment; and a comment'
+
+
+def test_AbbreviationTable():
+    abbrs = AbbreviationTable({'PL': 'plural', 'SG': 'singular'})
+    assert abbrs is AbbreviationTable([('PL', 'plural'), ('SG', 'singular')])
+    assert abbrs is AbbreviationTable(abbrs) is pickle.loads(pickle.dumps(abbrs))
+    assert abbrs == {'PL': 'plural', 'SG': 'singular'} and list(abbrs) == ['PL', 'SG']
+    assert abbrs.id != AbbreviationTable({'PL': 'plural'}).id and abbrs.id in repr(abbrs)
+    assert len({abbrs, AbbreviationTable(dict(abbrs))}) == 1
+
+    ex = Example(
+        ID=1,
+        Primary_Text='text',
+        Analyzed_Word=['a-b'],
+        Gloss=['x-PL'],
+        Translated_Text='text',
+        Language_Name='l',
+        Comment=None,
+        Source=[],
+        Abbreviations=dict(abbrs))
+    assert ex.Abbreviations is abbrs and ex.Abbreviations_ID == abbrs.id
+    assert ex.as_igt().gloss_abbrs == {'PL': 'plural'}
+    assert Example(**dict(attr.asdict(ex), Abbreviations={})).Abbreviations_ID is None
+    # Abbreviations assigned after initialization are converted, too:
+    ex.Abbreviations = {'SG': 'singular'}
+    assert ex.Abbreviations_ID == AbbreviationTable({'SG': 'singular'}).id
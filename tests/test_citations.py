@@ -0,0 +1,27 @@
+from linglit.citations import CitationGraph
+from linglit.glossa import Repository
+
+
+def test_CitationGraph(tmp_path, glossa_repos, mocker):
+    graph = CitationGraph(tmp_path / 'graph')
+    for pub in Repository(glossa_repos).iter_publications():
+        assert graph.update(pub)
+    graph.save()
+
+    graph = CitationGraph(tmp_path / 'graph')
+    pub = Repository(glossa_repos)['6371']
+    assert not graph.update(pub)
+    assert sum(graph.cited('glossa6371').values()) == \
+        sum(n for sid, n in pub.cited.items() if sid in pub.references)
+    assert graph.most_cited(1) == [('kayne:94', 2, 2)]
+    assert graph.citing('kayne:94') == [('glossa5703', 1), ('glossa5745', 1)]
+    assert graph.citing('unknown:2000') == []
+    assert graph.shared('glossa5703', 'glossa5745') == ['kayne:94']
+    assert graph.shared('glossa5703', 'glossa6371') == []
+
+    pub = Repository(glossa_repos)['6371']
+    mocker.patch.object(type(pub), 'cited', {})
+    assert graph.update(pub, force=True)
+    assert graph.cited('glossa6371') == {}
+    assert graph.prune(['glossa6371'], prefix='glossa') == 3
+    assert graph.most_cited() == []
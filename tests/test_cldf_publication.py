@@ -4,3 +4,121 @@ def test_iter_references(cldf_pub, cldf_pub2):
     assert len(list(cldf_pub2.iter_references())) == 1
     assert len(list(cldf_pub2.iter_cited())) == 1
     assert cldf_pub.record.as_source()['title'] == 'Uralic Typological database - UraTyp'
+
+
+def test_sid2langs(cldf_repos, cldf_pub2, mocker):
+    from linglit.cldf import Repository
+
+    src = next(cldf_pub2.iter_references())
+    assert src['lgcode'].startswith('[adiv1239]; [beng1280]')
+    assert cldf_repos.joinpath('petersonsouthasia.sources.json').exists()
+
+    # The cached mapping is re-used:
+    pub = Repository(cldf_repos)['petersonsouthasia']
+    mocker.patch.object(pub, '_sid2langs', mocker.Mock(side_effect=ValueError))
+    assert pub.sid2langs['Peterson2017'][0] == 'adiv1239'
+
+    # ... unless the dataset version changed:
+    pub = Repository(cldf_repos)['petersonsouthasia']
+    pub.fingerprint = 'new version'
+    mocker.patch.object(pub, '_sid2langs', mocker.Mock(return_value={'x': {'b', 'a'}}))
+    assert pub.sid2langs == {'x': ['a', 'b']}
+
+
+def test_sid2langs_corrupt_cache(cldf_repos, cldf_pub2):
+    p = cldf_repos.joinpath('petersonsouthasia.sources.json')
+    p.write_text('{"fingerprint": ', encoding='utf8')  # A truncated write.
+    assert cldf_pub2.sid2langs['Peterson2017'][0] == 'adiv1239'
+    assert 'sid2langs' in p.read_text(encoding='utf8')
+    assert not cldf_repos.joinpath('petersonsouthasia.sources.json.tmp').exists()
+
+
+def test_iter_cells(cldf_pub2):
+    import zipfile
+
+    from csvw.dsv_dialects import Dialect
+
+    cells = list(cldf_pub2._iter_cells('ValueTable', 'languageReference', 'source'))
+    assert cells
+
+    # Tables with a non-default dialect are read correctly ...
+    table = cldf_pub2.ds['ValueTable']
+    rows = list(table)
+    table.dialect = Dialect(delimiter='\t', header=False)
+    table.write(rows)
+    assert list(cldf_pub2._iter_cells('ValueTable', 'languageReference', 'source')) == cells
+
+    # ... as are zipped tables:
+    fname = table.url.resolve(table.base)
+    with zipfile.ZipFile(str(fname) + '.zip', 'w') as zipf:
+        zipf.write(fname, fname.name)
+    fname.unlink()
+    assert list(cldf_pub2._iter_cells('ValueTable', 'languageReference', 'source')) == cells
+
+
+def test_iter_cells_fallback(cldf_pub2, mocker):
+    cells = list(cldf_pub2._iter_cells('ValueTable', 'languageReference', 'source'))
+    # Without the csvw reader API, rows are read via pycldf:
+    mocker.patch('linglit.cldf.publication.has_reader_api', lambda table: False)
+    assert list(cldf_pub2._iter_cells('ValueTable', 'languageReference', 'source')) == cells
+
+
+def _examples_from_objects(pub):
+    """
+    The examples of a publication, extracted - like in earlier versions - via pycldf's ORM.
+    """
+    from pyigt import Example as IGTExample
+    from linglit.base import Example
+
+    abbrs = {r['abbr']: r['def'] for r in pub.ds.iter_rows('ga.csv')}
+    for count, ex in enumerate(pub.ds.objects('ExampleTable', cls=IGTExample), start=1):
+        igt = ex.igt
+        igt.abbrs = abbrs
+        if igt.primary_text and igt.phrase:
+            yield Example(
+                ID=str(count),
+                Local_ID=ex.id,
+                Primary_Text=igt.primary_text,
+                Analyzed_Word=igt.phrase,
+                Gloss=igt.gloss,
+                Translated_Text=igt.translation or '',
+                Language_ID=ex.language.cldf.glottocode,
+                Language_Name=ex.language.cldf.name,
+                Source=[],
+                Abbreviations=igt.gloss_abbrs if igt.is_valid(strict=True) else {},
+                Meta_Language_ID=getattr(ex.cldf, 'metaLanguageReference', None) or 'stan1293',
+                Comment=getattr(ex.cldf, 'comment', None),
+            )
+
+
+def test_iter_examples(cldf_repos, cldf_pub):
+    from linglit.cldf import Repository
+
+    def examples(exs):
+        return [(
+            ex.ID, ex.Local_ID, ex.Primary_Text, ex.Analyzed_Word, ex.Gloss, ex.Translated_Text,
+            ex.Language_ID, ex.Language_Name, dict(ex.Abbreviations), ex.Meta_Language_ID,
+            ex.Comment,
+        ) for ex in exs]
+
+    table = cldf_pub.ds['ExampleTable']
+    rows = list(table)
+    rows[0]['Comment'], rows[1]['Meta_Language_ID'] = 'a comment', 'russ1263'
+    table.write(rows)
+    pub = Repository(cldf_repos)['uratyp']
+    res = examples(pub.iter_examples())
+    assert res and res == examples(_examples_from_objects(pub))
+    assert res[0][-1] == 'a comment' and "(a comment)" in res[0][5]
+    assert res[1][-2] == 'russ1263'
+
+    # Tables without comment and meta language columns are supported, too:
+    ds = pub.ds
+    ds.remove_columns('ExampleTable', 'Comment', 'Meta_Language_ID')
+    ds.write_metadata()
+    ds['ExampleTable'].write([
+        {k: v for k, v in row.items() if k not in {'Comment', 'Meta_Language_ID'}}
+        for row in rows])
+    pub = Repository(cldf_repos)['uratyp']
+    res = examples(pub.iter_examples())
+    assert res == examples(_examples_from_objects(pub))
+    assert {r[-2] for r in res} == {'stan1293'} and {r[-1] for r in res} == {None}
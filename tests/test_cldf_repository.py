@@ -5,21 +5,95 @@ import attr
 from linglit.cldf import Repository
 
 
+@attr.s
+class ZenodoRecord:
+    """
+    A local stand-in for the Zenodo API.
+    """
+    version = attr.ib(default='1.0')
+    resolved = []
+
+    @classmethod
+    def from_concept_doi(cls, doi):
+        cls.resolved.append(doi)
+        return cls(version=cls.latest)
+
+    def download_dataset(self, d):
+        d.mkdir(parents=True, exist_ok=True)
+        d.joinpath('version.txt').write_text(self.version)
+
+
 def test_create(tmp_path, cldf_repos, mocker):
-    @attr.s
-    class ZenodoRecord:
-        version = attr.ib(default='1.0')
+    shutil.copy(cldf_repos / 'catalog.csv', tmp_path)
+    repo = Repository(tmp_path)
+
+    ZenodoRecord.latest = '1.0'
+    mocker.patch('linglit.cldf.repository.cldfzenodo', mocker.Mock(Record=ZenodoRecord))
+    assert set(repo.create().values()) == {'new'}
+    assert set(repo.create(verbose=True).values()) == {'unchanged'}
+    # Concept DOIs - shared by both datasets in our catalog - are only resolved once within the TTL:
+    assert len(ZenodoRecord.resolved) == 1
+
+    ZenodoRecord.latest = '2.0'
+    assert set(repo.create().values()) == {'unchanged'}
+    assert set(repo.create(ttl=0, workers=1).values()) == {'updated'}
+    assert tmp_path.joinpath('uratyp', 'version.txt').read_text() == '2.0'
+    assert repo.metadata('uratyp')['version'] == '2.0'
+    # No temporary directories are left behind:
+    assert not list(tmp_path.glob('.*'))
+
 
-        @classmethod
-        def from_concept_doi(cls, _):
-            return cls()
+def test_index(cldf_repos, mocker):
+    repo = Repository(cldf_repos)
+    assert [pub.id for pub in repo.iter_publications()] == ['cldf8', 'cldf9']
+    assert repo.index['uratyp']['metadata'] == 'StructureDataset-metadata.json'
+    assert cldf_repos.joinpath('index.json').exists()
 
-        def download_dataset(self, d):
-            d.mkdir(parents=True, exist_ok=True)
+    # The persisted index is re-used, without directory walks or BibTeX generation:
+    mocker.patch('linglit.cldf.repository.iter_datasets', mocker.Mock(side_effect=ValueError))
+    mocker.patch('linglit.cldf.repository.cldfzenodo', mocker.Mock(side_effect=ValueError))
+    pub = Repository(cldf_repos)['uratyp']
+    assert 'Uralic' in pub.record.bibtex
+    assert pub.ds.module == 'StructureDataset'
+
+
+def test_create_errors(tmp_path, cldf_repos, mocker):
+    import pathlib
 
     shutil.copy(cldf_repos / 'catalog.csv', tmp_path)
     repo = Repository(tmp_path)
 
-    mocker.patch('linglit.cldf.repository.cldfzenodo', mocker.Mock(Record=ZenodoRecord()))
-    repo.create()
-    repo.create()
+    ZenodoRecord.latest = '1.0'
+    mocker.patch('linglit.cldf.repository.cldfzenodo', mocker.Mock(Record=ZenodoRecord))
+    mocker.patch.object(ZenodoRecord, 'from_concept_doi', mocker.Mock(side_effect=IOError))
+    # A failing DOI resolution is reported, but doesn't abort the update:
+    assert all(isinstance(v, IOError) for v in repo.create(verbose=True).values())
+
+    mocker.stopall()
+    mocker.patch('linglit.cldf.repository.cldfzenodo', mocker.Mock(Record=ZenodoRecord))
+    assert set(repo.create().values()) == {'new'}
+
+    # If swapping in the new version fails, the old version is kept:
+    rename = pathlib.Path.rename
+
+    def failing_rename(self, target):
+        if self.parent.name.startswith('.') and self.name == 'uratyp':
+            raise OSError()
+        return rename(self, target)
+
+    ZenodoRecord.latest = '2.0'
+    mocker.patch.object(pathlib.Path, 'rename', failing_rename)
+    res = repo.create(ttl=0)
+    assert isinstance(res['uratyp'], OSError) and res['petersonsouthasia'] == 'updated'
+    assert tmp_path.joinpath('uratyp', 'version.txt').read_text() == '1.0'
+    assert repo.metadata('uratyp')['version'] == '1.0'
+    assert not list(tmp_path.glob('.*'))
+
+
+def test_read_only(cldf_repos, mocker):
+    # Caches are not written to read-only repositories, but kept in memory:
+    mocker.patch('linglit.util.jsonlib.dump', mocker.Mock(side_effect=PermissionError))
+    pub = Repository(cldf_repos)['petersonsouthasia']
+    assert pub.sid2langs['Peterson2017'][0] == 'adiv1239'
+    assert not list(cldf_repos.glob('*.sources.json')) and not list(cldf_repos.glob('*.tmp'))
+    assert not cldf_repos.joinpath('index.json').exists()
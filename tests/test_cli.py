@@ -1,4 +1,7 @@
 import logging
+import sqlite3
+
+import pytest
 
 from linglit.__main__ import main
 
@@ -20,3 +23,92 @@ def test_mergedbib(capsys, glossa_repos):
     out, _ = capsys.readouterr()
     assert 'isreferencedby' in out
     assert ':j,ed' not in out
+
+
+def test_mergedbib_resume(capsys, glossa_repos, tmp_path):
+    log = logging.getLogger(__name__)
+    main(['mergedbib', 'glossa', str(glossa_repos), '--workdir', str(tmp_path)], log=log)
+    out, _ = capsys.readouterr()
+    main(['mergedbib', 'glossa', str(glossa_repos), '--workdir', str(tmp_path), '--workers', '2'],
+         log=log)
+    assert capsys.readouterr()[0] == out
+    assert len(tmp_path.joinpath('journal.jsonl').read_text(encoding='utf8').splitlines()) == 4
+
+    # Bibliographies of publications no longer in the repository are not merged:
+    tmp_path.joinpath('bibs', 'glossa1.bib').write_text(
+        '@book{glossa1:x,\n  title={Obsolete}\n}\n', encoding='utf8')
+    main(['mergedbib', 'glossa', str(glossa_repos), '--workdir', str(tmp_path),
+          '--drop-until', '1'], log=log)
+    assert capsys.readouterr()[0] == out
+    assert not tmp_path.joinpath('bibs', 'glossa1.bib').exists()
+
+
+def test_db(glossa_repos, cldf_repos, tmp_path):
+    db = tmp_path / 'db.sqlite'
+    log = logging.getLogger(__name__)
+    main(['db', 'glossa', str(glossa_repos), str(db)], log=log)
+    main(['db', 'cldf', str(cldf_repos), str(db), '--prune'], log=log)
+    assert db.exists()
+
+
+def test_search(glossa_repos, tmp_path, capsys):
+    db = tmp_path / 'db.sqlite'
+    main(['db', 'glossa', str(glossa_repos), str(db)], log=logging.getLogger(__name__))
+    main(['search', str(db), '--gloss', 'REP', '--limit', '1'])
+    out, _ = capsys.readouterr()
+    assert 'REP' in out
+
+
+def test_export(glossa_repos, tmp_path):
+    pytest.importorskip('pyarrow')
+    main(['export', 'glossa', str(glossa_repos), str(tmp_path)], log=logging.getLogger(__name__))
+    assert tmp_path.joinpath('provider=glossa', 'examples.parquet').exists()
+
+
+def test_snapshot(glossa_repos, tmp_path):
+    main(
+        ['snapshot', 'glossa', str(glossa_repos), str(tmp_path / 'snapshot')],
+        log=logging.getLogger(__name__))
+    assert tmp_path.joinpath('snapshot').exists()
+
+
+def test_dedup(glossa_repos, tmp_path):
+    db = tmp_path / 'db.sqlite'
+    main(['db', 'glossa', str(glossa_repos), str(db)], log=logging.getLogger(__name__))
+    main(['dedup', str(db)], log=logging.getLogger(__name__))
+    conn = sqlite3.connect(str(db))
+    assert conn.execute('SELECT count(*), sum(exact) FROM duplicate').fetchone() == (9, 1)
+    # All canonical examples are in the database:
+    assert conn.execute(
+        'SELECT count(*) FROM duplicate WHERE canonical_id NOT IN (SELECT id FROM example)'
+    ).fetchone()[0] == 0
+    conn.close()
+
+    # The number of bands must divide the number of permutations:
+    with pytest.raises(SystemExit):
+        main(['dedup', str(db), '--bands', '10'], log=logging.getLogger(__name__))
+
+
+def test_citegraph(glossa_repos, tmp_path, capsys):
+    graph = tmp_path / 'graph'
+    main(['citegraph', 'glossa', str(glossa_repos), str(graph), '--prune'],
+         log=logging.getLogger(__name__))
+    main(['cited', str(graph)], log=logging.getLogger(__name__))
+    assert 'kayne:94' in capsys.readouterr().out
+    main(['cited', str(graph), '--citing', 'kayne:94'], log=logging.getLogger(__name__))
+    assert 'glossa5703' in capsys.readouterr().out
+    main(['cited', str(graph), '--shared', 'glossa5703', 'glossa5745'],
+         log=logging.getLogger(__name__))
+    assert 'kayne:94' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('provider,fmt', [('langsci', 'gz'), ('glossa', 'zip'), ('cldf', 'gz')])
+def test_update_unsupported_compression(tmp_path, mocker, capsys, provider, fmt):
+    from linglit import PROVIDERS
+
+    create = mocker.patch.object(PROVIDERS[provider], 'create')
+    with pytest.raises(SystemExit):  # The help of the command is printed.
+        main(['update', provider, str(tmp_path), '--compress', fmt],
+             log=logging.getLogger(__name__))
+    assert 'does not support' in capsys.readouterr().out
+    assert not create.called
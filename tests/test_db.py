@@ -0,0 +1,39 @@
+import sqlite3
+
+from linglit.db import Database
+from linglit.glossa import Repository
+
+
+def test_Database(tmp_path, glossa_repos, mocker):
+    db = Database(tmp_path / 'db.sqlite')
+    pub = Repository(glossa_repos)['6371']
+    assert db.upsert(pub)
+    assert not db.upsert(pub)
+    assert db.upsert(pub, force=True)
+    assert db.fingerprints('glossa') == {'glossa6371': pub.fingerprint}
+    assert db.fingerprint('glossa6371') == pub.fingerprint and db.fingerprint('x') is None
+
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    assert conn.execute('SELECT count(*) FROM example').fetchone()[0] == 42
+    assert conn.execute('SELECT count(*) FROM reference').fetchone()[0] == 33
+    assert conn.execute('SELECT sum(count) FROM citation').fetchone()[0] > 33
+    # All examples of the article share one abbreviation table:
+    assert conn.execute('SELECT count(*) FROM abbreviations').fetchone()[0] == 1
+    assert len({ex.Abbreviations_ID for ex in db.iter_examples()}) == 1
+    ex = next(db.iter_examples())
+
+    pub = Repository(glossa_repos)['6371']
+    mocker.patch.object(type(pub), 'fingerprint', 'x')
+    assert db.upsert(pub)
+    assert conn.execute('SELECT count(*) FROM example').fetchone()[0] == 42
+
+    # A table no longer used after re-loading a publication is removed:
+    conn.execute("INSERT INTO abbreviations VALUES ('x', '{}')")
+    conn.execute("UPDATE example SET abbreviations_id = 'x' WHERE id = ?", (ex.ID,))
+    conn.commit()
+    assert db.upsert(pub, force=True)
+    assert conn.execute('SELECT count(*) FROM abbreviations').fetchone()[0] == 1
+
+    assert db.prune('glossa', []) == 1
+    assert conn.execute('SELECT count(*) FROM example').fetchone()[0] == 0
+    assert conn.execute('SELECT count(*) FROM abbreviations').fetchone()[0] == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from linglit.base import Example
+from linglit.db import Database
+from linglit.dedup import normalize, exact_key, Deduplicator, store
+from linglit.glossa import Repository
+
+
+def _ex(id_, text, gloss, **kw):
+    return Example(
+        ID=id_,
+        Primary_Text=text,
+        Analyzed_Word=text.split(),
+        Gloss=gloss.split(),
+        Translated_Text=kw.pop('translation', ''),
+        Language_Name=None,
+        Comment=None,
+        Source=[],
+        **kw)
+
+
+def test_normalize():
+    assert normalize('  Kim   saw, the dog!') == 'kim saw the dog'
+    assert exact_key(_ex('1', 'Kim saw the dog.', 'Kim see-PST DEF dog')) == \
+        exact_key(_ex('2', 'kim saw the dog', 'kim see-pst def dog'))
+
+
+def test_Deduplicator():
+    examples = [
+        _ex('a', 'Kim saw the dog.', 'Kim see-PST DEF dog'),
+        _ex('b', 'kim saw the dog', 'Kim see-PST DEF dog', Language_ID='abcd1234'),
+        _ex('c', 'Kim saw the dogs here', 'Kim see-PST DEF dog-PL here'),
+        _ex('d', 'Something completely different', 'thing complete-ADV different'),
+        _ex('e', '', ''),
+    ]
+    with Deduplicator(num_perm=64, bands=16) as dedup:
+        for ex in examples:
+            dedup.add(ex)
+        clusters = list(dedup.iter_clusters())
+        assert len(clusters) == 1
+        assert clusters[0].canonical == 'b'
+        assert clusters[0].duplicates == ['a']
+        assert clusters[0].near_duplicates == ['c']
+        assert len(list(dedup.iter_clusters(singletons=True))) == 2
+
+
+def test_Deduplicator_invalid():
+    with pytest.raises(ValueError):
+        Deduplicator(num_perm=64, bands=10)
+
+
+def test_store(tmp_path, glossa_repos):
+    db = Database(tmp_path / 'db.sqlite')
+    for pub in Repository(glossa_repos).iter_publications():
+        db.upsert(pub)
+    with Deduplicator(bands=16) as dedup:
+        for ex in db.iter_examples():
+            dedup.add(ex)
+        n = store(db, dedup.iter_clusters())
+    with db.connection() as conn:
+        assert conn.execute('SELECT count(*) FROM duplicate').fetchone()[0] == n
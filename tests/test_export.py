@@ -0,0 +1,31 @@
+import pytest
+
+from linglit.glossa import Repository
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_export(tmp_path, glossa_repos, fmt):
+    from linglit.export import export
+
+    res = export(Repository(glossa_repos).iter_publications(), tmp_path, fmt=fmt, batch_size=10)
+    assert res['glossa'] > 42
+    p = tmp_path / 'provider=glossa' / 'examples.{}'.format(fmt)
+    a = p.parent / '_abbreviations.{}'.format(fmt)
+    if fmt == 'parquet':
+        table, abbrs = pq.read_table(str(p)), pq.read_table(str(a))
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(p))).read_all()
+        abbrs = pa.ipc.open_file(pa.memory_map(str(a))).read_all()
+    assert table.num_rows == res['glossa']
+    assert pa.types.is_dictionary(table.schema.field('language_name').type)
+    row = table.slice(0, 1).to_pylist()[0]
+    assert isinstance(row['gloss'], list)
+    assert row['source'][-1]['id'] == row['publication_id']
+    # Each abbreviation table is written once:
+    ids = set(table.column('abbreviations_id').to_pylist()) - {None}
+    assert ids
+    assert sorted(abbrs.column('id').to_pylist()) == sorted(ids)
+    assert all(len(abbr) for abbr in abbrs.column('abbreviations').to_pylist())
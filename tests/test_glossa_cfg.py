@@ -1,7 +1,21 @@
-from linglit.glossa.cfg import LanguageSpec
+from linglit.util import CFG_ENV_VAR
+from linglit.glossa.cfg import LanguageSpec, language_specs
 
 
 def test_LanguageSpec():
     lspec = LanguageSpec('abcd1234')
     assert lspec('name', None) == 'name'
     assert lspec(None, None) == 'abcd1234'
+
+
+def test_language_specs(tmp_path, monkeypatch):
+    assert language_specs() is language_specs()
+    assert language_specs()[4813].language == 'dogr1252'
+
+    monkeypatch.setenv(CFG_ENV_VAR, str(tmp_path))
+    assert language_specs()[4813].language == 'dogr1252'
+
+    tmp_path.joinpath('glossa').mkdir()
+    tmp_path.joinpath('glossa', 'glossa.csv').write_text(
+        'id,example_languages\n1,abcd1234\n2,', encoding='utf8')
+    assert list(language_specs()) == [1]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from linglit.glossa.harvest import Client, HTTPError, harvest
+
+
+def test_harvest(tmp_path, glossa_server):
+    def run(d=tmp_path, **kw):
+        return asyncio.run(harvest(d, base_url=glossa_server.url, delay=0, **kw))
+
+    assert run() == [tmp_path / '6371.xml']
+    # Catalog page, article page twice - because of the 503 - redirect and XML:
+    assert len(glossa_server.requests) == 5
+    assert tmp_path.joinpath('6371.xml').read_bytes().startswith(b'<?xml')
+    # The HTTP cache is excluded from version control of the harvested articles:
+    assert tmp_path.joinpath('.cache', '.gitignore').read_text().endswith('*\n')
+
+    # Existing articles are skipped, and the catalog page is re-validated:
+    assert run() == []
+    assert len(glossa_server.requests) == 6
+    assert glossa_server.requests[-1][1]['If-None-Match'] == '"v1"'
+
+    d = tmp_path / 'compressed'
+    d.mkdir()
+    assert run(d=d, compress='gz') == [d / '6371.xml.gz']
+
+
+def test_Client(glossa_server):
+    async def get(*paths, **kw):
+        async with Client(delay=0.01, backoff=0, **kw) as client:
+            res = await asyncio.gather(*[client.get(glossa_server.url + p) for p in paths])
+            return res, client
+
+    res, client = asyncio.run(get('/article/id/1/', '/article/id/2/', concurrency=2))
+    assert all(b'Download XML' in r for r in res)
+    assert client.stats['retries'] == 2
+    # Four requests were sent over at most two connections:
+    assert len(glossa_server.requests) == 4
+    assert len(glossa_server.ports) <= 2
+    assert not client._connections
+
+    with pytest.raises(HTTPError):
+        asyncio.run(get('/unknown'))
+
+    with pytest.raises(HTTPError):
+        asyncio.run(get('/article/id/3/', retries=0))
@@ -1,3 +1,5 @@
+import shutil
+
 import pytest
 
 from linglit.glossa import Repository
@@ -27,13 +29,46 @@ def test_Repository_examples(repo):
            ['1a', '1b', '1c', '1d', '1d', '1d', '1e', '1e', '2a', '2b']
 
 
-def test_Repository_create(tmp_path, mocker, glossa_repos, capsys):
-    class Req:
-        def urlopen(self, url):
-            return mocker.Mock(read=lambda: glossa_repos.joinpath('articles.html').read_bytes())
-
-    mocker.patch('linglit.glossa.repository.urllib.request', Req())
+def test_Repository_create(tmp_path, glossa_server, capsys):
     repo = Repository(tmp_path)
-    repo.create(verbose=True)
+    assert repo.create(verbose=True, base_url=glossa_server.url, delay=0) == [tmp_path / '6371.xml']
     out, _ = capsys.readouterr()
     assert 'retrieving' in out
+    assert len(repo['6371'].examples) == 42
+
+
+def test_Repository_iter_publications(repo):
+    pubs = list(repo.iter_publications())
+    ppubs = list(repo.iter_publications(workers=2))
+    assert [p.id for p in ppubs] == [p.id for p in pubs] == \
+        ['glossa5703', 'glossa5745', 'glossa5887', 'glossa6371']
+    assert [len(p.examples) for p in ppubs] == [len(p.examples) for p in pubs]
+    assert [p.cited for p in ppubs] == [p.cited for p in pubs]
+
+    pubs = repo.iter_publications(workers=1)
+    assert next(pubs).id == 'glossa5703'
+    pubs.close()
+
+
+def test_Repository_compressed(tmp_path, glossa_repos):
+    shutil.copy(glossa_repos / '6371.xml', tmp_path)
+    repo = Repository(tmp_path)
+    fingerprint = repo['6371'].fingerprint
+    repo.compress('gz')
+    assert [p.name for p in tmp_path.iterdir()] == ['6371.xml.gz']
+    pub = next(repo.iter_publications())
+    assert pub.id == 'glossa6371' and len(pub.examples) == 42
+    assert pub.fingerprint == fingerprint
+
+
+def test_Publication_fingerprint(glossa_repos):
+    from linglit.glossa.cfg import LanguageSpec
+
+    repo = Repository(glossa_repos)
+    pub = repo['6371']
+    fingerprint = pub.fingerprint
+    assert repo['6371'].fingerprint == fingerprint
+    # Changing the language spec from the config changes the fingerprint:
+    pub = repo['6371']
+    pub.language_spec = LanguageSpec('stan1293')
+    assert pub.fingerprint != fingerprint
@@ -1,6 +1,6 @@
 import pytest
 
-from linglit.glossa.xml import text, parse_citation, parse_language_name, parse_ref, iter_igt
+from linglit.glossa.xml import text, parse_citation, parse_language_name, parse_ref, iter_igt, Tiers
 
 
 def _xml(s):
@@ -181,3 +181,16 @@ def test_iter_igt(xml, check):
     res = list(iter_igt(xml, {}))
     assert len(res) == 1
     assert check(*res[0])
+
+
+def test_Tiers():
+    abbrs = {}
+    tiers = Tiers.from_parsed(
+        ['h-u-me-b', 'jo-si=a.'], ['come-PRED-SS-1PL', 'eat-3DU=TODPST'],
+        "\u2018they ate (PRED = predicate)\u2019", abbrs)
+    assert tiers.primary_text == 'humeb josia.'
+    assert tiers.translation == 'they ate'
+    assert abbrs == {'PRED': 'predicate'}
+    igt = tiers.as_igt(abbrs)
+    assert igt.primary_text == tiers.primary_text
+    assert igt.translation == tiers.translation
@@ -0,0 +1,62 @@
+import pytest
+
+from linglit.glossa import Repository
+from linglit.journal import Journal
+
+
+def test_Journal(tmp_path, glossa_repos, mocker):
+    def process(pub):
+        out = tmp_path / '{}.txt'.format(pub.id)
+        out.write_text(pub.record.title, encoding='utf8')
+        return out
+
+    journal = Journal(tmp_path / 'journal.jsonl')
+    stats = journal.run(Repository(glossa_repos).iter_publications(), process, workers=2)
+    assert stats['completed'] == 4
+
+    # Simulate a crash while writing the journal and a modified output:
+    with journal.path.open('a', encoding='utf8') as f:
+        f.write('{"id": "glo')
+    tmp_path.joinpath('glossa6371.txt').write_text('x', encoding='utf8')
+    journal = Journal(tmp_path / 'journal.jsonl')
+    stats = journal.run(Repository(glossa_repos).iter_publications(), process)
+    assert stats == dict(skipped=3, completed=1)
+    # The truncated record has been removed, so the new record is readable:
+    assert len(Journal(tmp_path / 'journal.jsonl').completed) == 4
+    assert all(line.startswith('{"id": "glossa') and line.endswith('}')
+               for line in journal.path.read_text(encoding='utf8').splitlines())
+
+    def fail(pub):
+        raise ValueError(pub.id)
+
+    pubs = list(Repository(glossa_repos).iter_publications())
+    mocker.patch.object(type(pubs[0]), 'fingerprint', 'changed')
+    with pytest.raises(ValueError):
+        journal.run(pubs, fail)
+
+
+def test_Journal_bounded(tmp_path, glossa_repos):
+    pending, processed = [], []
+
+    def pubs():
+        for i, pub in enumerate(Repository(glossa_repos).iter_publications()):
+            pending.append(i - len(processed))  # Publications submitted, but not yet processed.
+            yield pub
+
+    def process(pub):
+        out = tmp_path / '{}.txt'.format(pub.id)
+        out.write_text(pub.id, encoding='utf8')
+        processed.append(pub.id)
+        return out
+
+    assert Journal(tmp_path / 'journal.jsonl').run(pubs(), process)['completed'] == 4
+    # With one worker, publications are submitted in a window of two:
+    assert len(pending) == 4 and max(pending) <= 2
+
+
+def test_Journal_no_release(tmp_path, mocker):
+    # Publication-like objects without a release method can be processed, too:
+    pub = mocker.Mock(spec=['id', 'fingerprint'], id='x', fingerprint='1')
+    out = tmp_path / 'x.txt'
+    out.write_text('x', encoding='utf8')
+    assert Journal(tmp_path / 'journal.jsonl').run([pub], lambda p: out)['completed'] == 1
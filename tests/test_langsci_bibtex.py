@@ -1,6 +1,8 @@
+import shutil
+
 import pytest
 
-from linglit.langsci.bibtex import LangsciSource, to_source
+from linglit.langsci.bibtex import LangsciSource, to_source, iter_bib, BibtoolPool
 
 
 @pytest.mark.parametrize(
@@ -14,3 +16,75 @@ from linglit.langsci.bibtex import LangsciSource, to_source
 )
 def test_to_source(genre, md, test):
     assert test(to_source('x', LangsciSource(genre, 'x', **md)))
+
+
+def test_BibtoolPool(langsci_pub1, mocker):
+    # We don't need bibtool to test the concurrency - its input is valid BibTeX already:
+    mocker.patch('linglit.langsci.bibtex.run_bibtool', lambda text, verbose=False: text)
+    expected = [src.id for src in iter_bib(langsci_pub1.bibs)]
+    assert expected
+    with BibtoolPool(max_workers=2) as pool:
+        futures = [pool.submit(langsci_pub1.bibs) for _ in range(3)]
+        for future in futures:
+            assert [
+                src.id for src in
+                iter_bib(langsci_pub1.bibs, bibtool_output=future.result())] == expected
+
+
+@pytest.mark.skipif(not shutil.which('bibtool'), reason="bibtool command not available.")
+@pytest.mark.parametrize('pub', ['langsci_pub1', 'langsci_pub121'])
+def test_iter_bib_in_process(pub, request):
+    ps = request.getfixturevalue(pub).bibs
+
+    def srcs(**kw):
+        return [(src.id, src.genre, dict(src)) for src in iter_bib(ps, **kw)]
+
+    assert srcs(use_bibtool=False) == srcs()
+
+
+def test_iter_bib_normalization(tmp_path):
+    tmp_path.joinpath('refs.bib').write_text("""
+@string{lsp = {Language Science Press}}
+@incollection{a,
+  author = {Meier, A.},
+  title = {Chapter},
+  crossref = {b},
+  owner = {x},
+  title = {Other},
+}
+@book{b,
+  editor = {Müller, B.},
+  booktitle = {Book},
+  publisher = lsp,
+  year = 2020,
+}""", encoding='utf8')
+    srcs = {src.id: src for src in iter_bib([tmp_path / 'refs.bib'], use_bibtool=False)}
+    assert srcs['a']['title'] == 'Chapter'
+    assert srcs['a']['booktitle'] == 'Book'
+    assert srcs['a']['publisher'] == 'Language Science Press'
+    assert srcs['a']['editor'] == 'Müller, B.'
+    assert 'owner' not in srcs['a'] and 'crossref' not in srcs['a']
+    assert srcs['b']['year'] == '2020'
+
+
+def test_iter_bib_tolerant():
+    srcs = list(iter_bib([], bibtool_output="""
+@misc{,
+  title = {without key},
+}
+@book{a,
+  title = {First},
+  year = 2001,
+}
+@book{b,
+  title = {Invalid
+@book{a,
+  title = {Duplicate},
+  title = {field},
+}
+@book{c,
+  title = {Last},
+}"""))
+    assert [(src.id, src['title']) for src in srcs] == \
+        [('a', 'First'), ('a', 'Duplicate'), ('c', 'Last')]
+    assert srcs[0]['year'] == '2001'
@@ -0,0 +1,13 @@
+from linglit.util import CFG_ENV_VAR
+from linglit.langsci.cfg import texfile2language
+
+
+def test_texfile2language(tmp_path, monkeypatch):
+    assert texfile2language() is texfile2language()
+    assert all(isinstance(k, int) for k in texfile2language())
+
+    tmp_path.joinpath('langsci').mkdir()
+    tmp_path.joinpath('langsci', 'texfile_titles.tsv').write_text(
+        'Book_ID\tFilename\tLanguage\tTitle\n1\t1.tex\tAkan\tx\n2\t2.tex\t\ty', encoding='utf8')
+    monkeypatch.setenv(CFG_ENV_VAR, str(tmp_path))
+    assert texfile2language() == {1: {'1.tex': 'Akan'}}
@@ -0,0 +1,44 @@
+from linglit.langsci.manifest import Manifest, is_source_file
+
+
+def test_is_source_file():
+    assert is_source_file('chapters/a.tex')
+    assert is_source_file('Makefile')
+    assert not is_source_file('figures/a.tex')
+    assert not is_source_file('a.pdf')
+
+
+def test_Manifest(langsci_repos):
+    d = langsci_repos / '121'
+    m = Manifest.from_dir(d)
+    assert m.exists(d / 'main.tex') and m.exists('chapters/Osam.tex')
+    assert not m.exists(d / 'xyz.tex')
+    assert m.exists(d / 'chapters' / '..' / 'main.tex')
+    assert not m.exists(d / '..' / 'xyz')
+    assert m.is_dir(d / 'chapters') and not m.is_dir(d / 'main.tex')
+    assert [p.name for p in m.iterdirs()] == ['chapters']
+    assert [p.name for p in m.glob(d, '*.bib')] == ['the.bib', 'theother.bib']
+    assert [p.name for p in m.glob(d / 'chapters', '*.tex')] == [
+        'Osam.tex', 'abbreviations.tex', 'other.tex']
+    assert len(list(m.iter_named('abbreviations.tex'))) == 1
+    assert m.casefold(d / 'chapters' / 'osam.tex') == d / 'chapters' / 'Osam.tex'
+    assert m.casefold(d / 'chapters' / 'x.tex') == d / 'chapters' / 'x.tex'
+
+
+def test_Manifest_from_filelist(tmp_path):
+    m = Manifest.from_filelist(tmp_path, {'tree': [
+        {'path': 'chapters', 'type': 'tree'},
+        {'path': 'chapters/1.tex', 'type': 'blob'},
+        {'path': 'figures/a.tex', 'type': 'blob'},
+        {'path': 'main.tex', 'type': 'blob'},
+    ]})
+    # Listed files are only reported if they have been fetched:
+    assert not m.exists(tmp_path / 'chapters' / '1.tex') and not m.glob(tmp_path, '*.tex')
+    tmp_path.joinpath('chapters').mkdir()
+    tmp_path.joinpath('chapters', '1.tex').write_text('', encoding='utf8')
+    tmp_path.joinpath('main.tex').write_text('', encoding='utf8')
+    assert m.exists(tmp_path / 'chapters' / '1.tex')
+    assert [p.name for p in m.glob(tmp_path, '*.tex')] == ['main.tex']
+    assert list(m.iter_named('1.tex'))
+    assert not m.exists(tmp_path / 'figures' / 'a.tex')
+    assert [p.name for p in m.iterdirs()] == ['chapters']
@@ -14,6 +14,44 @@ def test_Publication_examples(langsci_pub1, langsci_pub121):
     assert langsci_pub1.examples
 
 
+def test_Publication_release(langsci_pub121):
+    langsci_pub121._refs = ['ref']
+    langsci_pub121.bibtool_output = 'future'
+    _ = langsci_pub121.gloss_abbreviations, langsci_pub121.includes
+    langsci_pub121.release()
+    assert langsci_pub121._refs is None and langsci_pub121.bibtool_output is None
+    assert langsci_pub121._includes is None and langsci_pub121._bibs is None
+    assert not {'gloss_abbreviations', 'manifest'}.intersection(langsci_pub121.__dict__)
+
+
+def test_Publication_stream_references(langsci_pub121, mocker):
+    from clldutils.source import Source
+
+    mocker.patch(
+        'linglit.langsci.publication.iter_bib',
+        mocker.Mock(side_effect=lambda *args, **kw: iter([Source('book', 'x', title='t')])))
+    # Streaming references doesn't keep them in memory ...
+    assert len(list(langsci_pub121.stream_references())) == 1
+    assert langsci_pub121._refs is None
+    # ... but computing the references does:
+    assert len(langsci_pub121.references) == 1
+    assert langsci_pub121._refs
+
+
+@pytest.mark.parametrize('attrs', [['cited_references'], ['examples', 'references', 'cited']])
+def test_Publication_parse_references_once(langsci_repos, mocker, attrs):
+    from linglit.langsci import Repository
+    from linglit.langsci.bibtex import LangsciSource
+
+    iter_bib = mocker.patch(
+        'linglit.langsci.publication.iter_bib',
+        mocker.Mock(side_effect=lambda *args, **kw: iter([LangsciSource('book', 'x')])))
+    pub = Repository(langsci_repos)['121']
+    for name in attrs:
+        getattr(pub, name)
+    assert iter_bib.call_count == 1
+
+
 def test_Publication_main(tmp_path, mocker):
     tmp_path.joinpath('Makefile').write_text('\nxelatex the\n', encoding='utf8')
     tmp_path.joinpath('the.tex').write_text('\\yes{}')
@@ -37,3 +75,93 @@ def test_Publication_main(tmp_path, mocker):
 
     shutil.move(str(tmp_path / 'Makefile'), str(tmp_path / 'nested'))
     assert Publication(mocker.Mock(), tmp_path).main.parent.name == 'nested'
+
+
+def test_includes_and_bib(langsci_repos, mocker):
+    from linglit.langsci import publication
+
+    d = langsci_repos / '121'
+    res = publication.includes_and_bib(d, d / 'main.tex', 'chapters', False)
+    assert [p.name for p in res[0]] == ['Osam.tex', 'other.tex']
+    assert [p.name for p in res[1]] == ['the.bib']
+
+    mocker.patch('linglit.langsci.publication.iter_commands', mocker.Mock(side_effect=ValueError))
+    assert publication.includes_and_bib(d, d / 'main.tex', 'chapters', False) == res
+
+
+def test_includes_and_bib_cache(langsci_repos, tmp_path):
+    from linglit.langsci import publication
+
+    d = tmp_path / '121'
+    shutil.copytree(str(langsci_repos / '121'), str(d))
+    assert len(publication.includes_and_bib(d, d / 'main.tex', 'chapters', False)[0]) == 2
+    # Changes of included files invalidate the cache, ...
+    d.joinpath('backmatter.tex').write_text('\\include{chapters/abbreviations}', encoding='utf8')
+    assert len(publication.includes_and_bib(d, d / 'main.tex', 'chapters', False)[0]) == 3
+    # ... as well as new files:
+    d.joinpath('y-include.tex').write_text('\\include{chapters/x}', encoding='utf8')
+    d.joinpath('chapters', 'x.tex').write_text('', encoding='utf8')
+    assert len(publication.includes_and_bib(d, d / 'main.tex', 'chapters', False)[0]) == 4
+
+
+def test_Publication_read_tex(langsci_pub121, mocker):
+    from linglit.langsci import publication
+
+    cache = mocker.patch('linglit.langsci.publication.TEX_CACHE', publication.LRUCache(10 ** 7))
+    p = langsci_pub121.main
+    assert langsci_pub121.read_tex(p, with_input=False) != langsci_pub121.read_tex(p)
+    assert langsci_pub121.read_tex(p) == langsci_pub121.read_tex(p)
+    assert cache.stats['hits'] == 2 and len(cache) == 2
+
+
+def test_Publication_read_tex_inputs(tmp_path, langsci_pub121, mocker):
+    from linglit.langsci import publication
+
+    cache = mocker.patch('linglit.langsci.publication.TEX_CACHE', publication.LRUCache(10 ** 7))
+    read_bytes = mocker.spy(publication.texfixes.storage, 'read_bytes')
+    tmp_path.joinpath('main.tex').write_text('\\input{part}\n', encoding='utf8')
+    tmp_path.joinpath('part.tex').write_text('abc', encoding='utf8')
+    assert 'abc' in langsci_pub121.read_tex(tmp_path / 'main.tex')
+    assert read_bytes.call_count == 2
+    # Cache hits do not read the files:
+    assert 'abc' in langsci_pub121.read_tex(tmp_path / 'main.tex')
+    assert read_bytes.call_count == 2 and cache.stats['hits'] == 1
+    # Modified input files invalidate the cached TeX:
+    tmp_path.joinpath('part.tex').write_text('xyz!', encoding='utf8')
+    assert 'xyz' in langsci_pub121.read_tex(tmp_path / 'main.tex')
+
+
+def test_Publication_iter_cited(langsci_pub121, mocker):
+    from linglit.langsci.bibtex import LangsciSource
+
+    mocker.patch.object(
+        Publication,
+        'iter_references',
+        lambda self: iter([LangsciSource('book', 'ref'), LangsciSource('book', 'ref2')]))
+    assert set(langsci_pub121.iter_cited()) == {'ref', 'ref2'}
+
+
+def test_Publication_fingerprint(langsci_pub121, langsci_repos, mocker):
+    from linglit.langsci import Repository
+
+    assert langsci_repos / '121' / 'backmatter.tex' in list(langsci_pub121.iter_input_paths())
+    assert langsci_pub121.fingerprint == Repository(langsci_repos)['121'].fingerprint
+    pub = Repository(langsci_repos)['121']
+    pub.record.objectlanguage = 'other'
+    assert pub.fingerprint != langsci_pub121.fingerprint
+    pub = Repository(langsci_repos)['121']
+    mocker.patch(
+        'linglit.langsci.cfg.texfile2language', lambda: {121: {'Osam.tex': 'Osam'}})
+    assert pub.fingerprint != langsci_pub121.fingerprint
+
+
+def test_Publication_fingerprint_inputs(langsci_repos, tmp_path):
+    from linglit.langsci import Repository
+
+    shutil.copytree(langsci_repos, tmp_path / 'langsci')
+    p = tmp_path / 'langsci' / '1' / 'chapters' / '1-include.tex'
+    pub = Repository(tmp_path / 'langsci')['1']
+    assert p in list(pub.iter_input_paths())
+    fingerprint = pub.fingerprint
+    p.write_text(p.read_text(encoding='utf8') + '\n', encoding='utf8')
+    assert Repository(tmp_path / 'langsci')['1'].fingerprint != fingerprint
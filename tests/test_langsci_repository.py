@@ -107,3 +107,45 @@ def test_branch_and_tree(mocker):
 
     res = branch_and_tree('3', None)
     assert res[0] == 'main'
+
+
+def test_Repository_manifest(tmp_repo):
+    jsonlib.dump(
+        {'1': ['main', {'tree': [{'path': 'main.tex', 'type': 'blob'}]}]},
+        tmp_repo.path('files.json'))
+    assert tmp_repo.manifest(tmp_repo.path('1')).verify
+    tmp_repo.path('1').mkdir()
+    tmp_repo.path('1', 'main.tex').write_text('', encoding='utf8')
+    assert tmp_repo.manifest(tmp_repo.path('1')).exists(tmp_repo.path('1', 'main.tex'))
+    assert not tmp_repo.manifest(tmp_repo.path('2')).exists(tmp_repo.path('2', 'main.tex'))
+
+
+def test_Repository_iter_publications_bibtool_workers(repo, mocker):
+    mocker.patch('linglit.langsci.bibtex.run_bibtool', lambda text, verbose=False: text)
+    pubs = list(repo.iter_publications(bibtool_workers=1))
+    assert [pub.id for pub in pubs] == [pub.id for pub in repo.iter_publications()]
+    assert all(pub.bibtool_output.done() for pub in pubs if pub.bibs)
+    assert pubs[0].references
+
+    mocker.patch(
+        'linglit.langsci.publication.includes_and_bib', mocker.Mock(side_effect=AssertionError))
+    pubs = list(repo.iter_publications(bibtool_workers=1))
+    assert pubs and all(pub.bibtool_output is None for pub in pubs)
+
+
+def test_Repository_pack(tmp_path, langsci_repos):
+    from linglit.langsci.bibtex import iter_bib
+
+    shutil.copytree(langsci_repos, tmp_path / 'langsci')
+    repo = Repository(tmp_path / 'langsci')
+
+    def data(pub):
+        return (
+            pub.main, pub.includes, pub.bibs, pub.fingerprint, pub.gloss_abbreviations,
+            [src.id for src in iter_bib(pub.bibs, use_bibtool=False)])
+
+    pubs = [data(pub) for pub in repo.iter_publications()]
+    repo.pack('tar.gz')
+    repo.pack('zip')
+    assert sorted(p.name for p in repo.dir.iterdir()) == ['1.zip', '121.zip', 'catalog.tsv']
+    assert [data(pub) for pub in repo.iter_publications()] == pubs
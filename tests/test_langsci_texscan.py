@@ -0,0 +1,48 @@
+import pytest
+
+from linglit.langsci.latex import to_text
+from linglit.langsci.texfixes import read_tex
+from linglit.langsci.texscan import iter_commands, iter_cite_keys
+
+
+def test_iter_commands(tmp_path):
+    tmp_path.joinpath('chapters.tex').write_text('\\include{chapters/b}\n', encoding='utf8')
+    tex = r"""\include{chapters/a} \includegraphics{x.png}
+% \include{chapters/commented}
+\input{chapters}
+\addbibresource[label=x]{ the.bib }
+\bibliography{a,b}"""
+    assert list(iter_commands(tmp_path / 'main.tex', tex=tex)) == [
+        ('include', 'chapters/a'),
+        ('include', 'chapters/b'),
+        ('addbibresource', 'the.bib'),
+        ('bibliography', 'a,b'),
+    ]
+    assert list(iter_commands(None, tex=tex, names=('bibliography',))) == [
+        ('bibliography', 'a,b')]
+
+
+@pytest.mark.parametrize(
+    'tex,keys',
+    [
+        (r'\cite{a, b} {\em x}', ['a', 'b']),
+        (r'\cite[{[}1]{X–Y}[x]', ['x--y']),
+        (r'\langinfo{lang}{fam}{Ref}', ['ref']),
+        (r'\fatcit{a}{b}\scite{c}{d}', ['a', 'd']),
+        (r'\footnote{see \nocite{fn}} % \cite{no}', ['fn']),
+        (r'\cite', []),
+        (r'\cite[p.~{\textbf{3}}]{h}', ['h']),
+        (r'\cite[{\em see} {{x}}][12]{g}', ['g']),
+        (r'\\% comment \cite{m}', []),
+        (r'50\% \cite{n}', ['n']),
+    ]
+)
+def test_iter_cite_keys(tex, keys):
+    assert list(iter_cite_keys(tex)) == keys
+
+
+def test_iter_cite_keys_like_to_text(langsci_repos):
+    for p in langsci_repos.glob('**/*.tex'):
+        tex = read_tex(p)
+        assert list(iter_cite_keys(tex)) == [
+            k for line in tex.split(r'\\') for k, _ in to_text(line)[2]]
@@ -0,0 +1,43 @@
+import pytest
+
+from linglit.base import Example
+from linglit.db import Database
+from linglit.glossa import Repository
+from linglit.search import index_terms, fts_query, search
+
+
+def test_index_terms():
+    ex = Example(
+        ID='1',
+        Primary_Text='ab c',
+        Analyzed_Word=['a-b', 'c'],
+        Gloss=['dog-1SG.ERG', 'see'],
+        Translated_Text='the dog sees',
+        Language_Name=None,
+        Comment=None,
+        Source=[])
+    assert index_terms(ex) == ('ab c', 'a b c', 'dog 1SG ERG see', '1SG ERG', 'the dog sees')
+
+
+@pytest.mark.parametrize(
+    'kw,query',
+    [
+        (dict(gloss='ERG'), 'categories:"ERG"'),
+        (dict(gloss='dog', text='a "b'), 'primary_text:"a ""b" AND glosses:"dog"'),
+        (dict(morpheme='x', translation='y', query='a OR b'),
+         'morphemes:"x" AND translation:"y" AND (a OR b)'),
+    ]
+)
+def test_fts_query(kw, query):
+    assert fts_query(**kw) == query
+
+
+def test_search(tmp_path, glossa_repos):
+    db = Database(tmp_path / 'db.sqlite')
+    db.upsert(Repository(glossa_repos)['6371'])
+    assert len(list(search(db))) == 42
+    assert len(list(search(db, limit=2))) == 2
+    res = list(search(db, gloss='REP', language='daww1239'))
+    assert res and all('REP' in ' '.join(ex.Gloss) for ex in res)
+    assert not list(search(db, gloss='REP', language='abcd1234'))
+    assert res[0].Source[0][0].startswith('glossa6371')
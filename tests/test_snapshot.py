@@ -0,0 +1,43 @@
+import pytest
+
+from linglit import load_snapshot
+from linglit.glossa import Repository
+from linglit.snapshot import write_snapshot, ExampleView
+
+
+def test_snapshot(tmp_path, glossa_repos):
+    pubs = list(Repository(glossa_repos).iter_publications())
+    write_snapshot(pubs, tmp_path / 'snapshot')
+    with load_snapshot(tmp_path / 'snapshot') as snapshot:
+        assert [p.id for p in snapshot.iter_publications()] == [p.id for p in pubs]
+        assert next(snapshot.iter_publications()).provider == 'glossa'
+        examples = list(snapshot.iter_examples())
+        expected = [ex for pub in pubs for ex in pub.examples]
+        assert len(examples) == len(expected)
+        for view, ex in zip(examples, expected):
+            assert view.ID == ex.ID
+            assert view.Gloss == ex.Gloss
+            assert view.Source == ex.Source
+            assert str(view) == str(ex)
+            assert view.Abbreviations_ID == ex.Abbreviations_ID
+            assert view.Abbreviations is ex.Abbreviations  # Tables are interned.
+        assert examples[0].Publication_ID == pubs[0].id
+        # Each abbreviation table is stored once:
+        assert set(snapshot.abbreviations) == {ex.Abbreviations_ID for ex in expected} - {None}
+        sources = list(snapshot.iter_sources())
+        assert len(sources) == sum(len(p.references) for p in pubs)
+        assert len([src for src in sources if src.cited]) == \
+            sum(len(p.cited_references) for p in pubs)
+        assert sum(src.cited for src in sources) == \
+            sum(n for p in pubs for sid, n in p.cited.items() if sid in p.references)
+        with pytest.raises(AttributeError):
+            _ = examples[0].unknown
+        with pytest.raises(AttributeError):
+            _ = ExampleView.__new__(ExampleView).ID  # As for unpickled instances.
+
+
+@pytest.mark.parametrize('content', [b'x' * 100, b'x', b''])
+def test_snapshot_invalid(tmp_path, content):
+    tmp_path.joinpath('test').write_bytes(content)
+    with pytest.raises(ValueError):
+        load_snapshot(tmp_path / 'test')
@@ -0,0 +1,88 @@
+import pytest
+
+from linglit.storage import (
+    ARCHIVE_FORMATS, compress, decompress, exists, size, signature, read_bytes, read_text,
+    iter_files, write_bytes, pack)
+
+
+def test_compressed(tmp_path):
+    p = tmp_path / 'test.xml'
+    assert not exists(p)
+    with pytest.raises(FileNotFoundError):
+        read_bytes(p)
+
+    assert write_bytes(p, 'äöü'.encode('utf8'), compression='gz').name == 'test.xml.gz'
+    assert not p.exists() and exists(p)
+    assert read_text(p) == 'äöü'
+    assert size(p) == 6
+    sig = signature(p)
+    write_bytes(p, b'abc', compression='gz')
+    assert sig != signature(p) and signature(tmp_path / 'x') is None
+
+
+def test_compressed_zst(tmp_path):
+    pytest.importorskip('zstandard')
+    p = tmp_path / 'test.xml'
+    write_bytes(p, b'abc', compression='zst')
+    assert read_bytes(p) == b'abc'
+
+
+@pytest.mark.parametrize('fmt', ARCHIVE_FORMATS)
+def test_pack(tmp_path, fmt):
+    d = tmp_path / 'book'
+    d.joinpath('chapters').mkdir(parents=True)
+    d.joinpath('main.tex').write_text('main', encoding='utf8')
+    d.joinpath('chapters', '1.tex').write_text('chapter', encoding='utf8')
+    assert pack(d, fmt).name == 'book.{}'.format(fmt)
+    assert not d.exists()
+    assert sorted(iter_files(d)) == ['chapters/1.tex', 'main.tex']
+    assert exists(d / 'chapters' / '1.tex') and not exists(d / 'chapters' / '2.tex')
+    assert read_text(d / 'chapters' / '1.tex') == 'chapter'
+    assert size(d / 'main.tex') == 4
+    assert signature(d / 'main.tex')[1] == 'main.tex'
+
+    # Updated files take precedence over the archive, and are merged into it when re-packing:
+    d.joinpath('chapters').mkdir(parents=True)
+    d.joinpath('chapters', '1.tex').write_text('updated', encoding='utf8')
+    assert read_text(d / 'chapters' / '1.tex') == 'updated'
+    assert sorted(iter_files(d)) == ['chapters/1.tex', 'main.tex']
+    pack(d, 'zip')
+    assert read_text(d / 'chapters' / '1.tex') == 'updated'
+    assert read_text(d / 'main.tex') == 'main'
+    assert [p.name for p in tmp_path.iterdir()] == ['book.zip']
+
+
+@pytest.mark.parametrize('fmt', ARCHIVE_FORMATS)
+def test_archive_changes(tmp_path, fmt):
+    import shutil
+
+    d, elsewhere = tmp_path / 'book', tmp_path / 'elsewhere'
+    d.mkdir()
+    elsewhere.mkdir()
+    for i in range(3):
+        d.joinpath('{}.tex'.format(i)).write_text(str(i), encoding='utf8')
+    archive = pack(d, fmt)
+    # Members can be read in any order:
+    assert [read_text(d / '{}.tex'.format(i)) for i in [2, 0, 1]] == ['2', '0', '1']
+
+    # Archives removed or added by other means are noticed:
+    shutil.move(str(archive), str(elsewhere / archive.name))
+    assert not exists(d / '0.tex')
+    shutil.move(str(elsewhere / archive.name), str(archive))
+    assert read_text(d / '0.tex') == '0'
+
+
+def test_unknown_formats(tmp_path):
+    d = tmp_path / 'book'
+    d.mkdir()
+    d.joinpath('main.tex').write_text('main', encoding='utf8')
+    for func, args in [
+        (compress, (b'abc', 'zip')),
+        (decompress, (b'abc', 'tar')),
+        (write_bytes, (tmp_path / 'x', b'abc', 'zip')),
+        (pack, (d, 'gz')),
+    ]:
+        with pytest.raises(ValueError):
+            func(*args)
+    # Nothing was lost or written:
+    assert d.joinpath('main.tex').exists() and [p.name for p in tmp_path.iterdir()] == ['book']
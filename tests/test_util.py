@@ -1,6 +1,6 @@
 import pytest
 
-from linglit.util import clean_translation
+from linglit.util import clean_translation, load_cache, dump_cache
 
 
 @pytest.mark.parametrize(
@@ -13,3 +13,32 @@ from linglit.util import clean_translation
 )
 def test_clean_translation(tr, res):
     assert clean_translation(tr) == res
+
+
+def test_LRUCache():
+    from linglit.util import LRUCache
+
+    cache = LRUCache(maxsize=5, sizeof=len)
+    cache['a'] = 'xx'
+    cache['b'] = 'yy'
+    assert cache.get('a') == 'xx' and 'a' in cache
+    cache['c'] = 'zz'  # Evicts 'b', the least recently used item.
+    assert cache.get('b') is None
+    assert len(cache) == 2 and cache.size == 4
+    assert cache.stats == dict(hits=1, misses=1, evictions=1)
+    cache['a'] = 'x'
+    assert cache.size == 3
+    cache['d'] = 'toolong'
+    assert 'd' not in cache
+    cache.clear()
+    assert cache.size == 0 and not len(cache)
+
+
+def test_cache_files(tmp_path):
+    p = tmp_path / 'cache.json'
+    assert load_cache(p) == {}
+    assert dump_cache(dict(a=1), p)
+    assert load_cache(p) == dict(a=1)
+    p.write_text('{"a": ', encoding='utf8')  # A truncated file.
+    assert load_cache(p) == {}
+    assert not dump_cache(dict(a=1), tmp_path / 'missing' / 'cache.json')